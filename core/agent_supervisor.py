@@ -0,0 +1,268 @@
+"""
+Agent Supervisor
+
+Runs agent CLIs as asyncio subprocesses so many of them can be driven from one
+event loop. Each agent runs in its own process group (its own console process
+group on Windows) so that a timeout or cancellation takes down the whole
+process tree, not just the CLI wrapper.
+
+Limits:
+    - max_concurrent: agents running at once across all models.
+    - model_limits: per-model caps, e.g. {"gemini-3-pro-preview": 2}.
+    - wall_timeout: maximum run time of one agent.
+    - idle_timeout: maximum time without any output.
+
+Usage:
+    async def main():
+        supervisor = AgentSupervisor(max_concurrent=16, model_limits={"gemini-3-pro-preview": 2})
+        runs = [supervisor.start(ws, "Implement feature X") for ws in workspaces]
+        for run in await asyncio.gather(*(r.wait() for r in runs)):
+            print(run.run_id, run.status, run.returncode)
+"""
+
+import os
+import signal
+import asyncio
+import itertools
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Deque, Dict, List, Optional
+import headless_gemini
+
+PENDING = "pending"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+TIMED_OUT = "timed_out"
+IDLE_TIMEOUT = "idle_timeout"
+CANCELLED = "cancelled"
+
+STREAM_LIMIT = 1 << 20 # Longest output line read in one piece
+
+_run_ids = itertools.count(1)
+
+@dataclass
+class AgentRun:
+    """Handle for one supervised agent process."""
+    cmd: List[str]
+    cwd: Path
+    model: Optional[str] = None
+    run_id: int = field(default_factory=lambda: next(_run_ids))
+    status: str = PENDING
+    pid: Optional[int] = None
+    returncode: Optional[int] = None
+    error: str = ""
+    queued_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    stdout_tail: Deque[str] = field(default_factory=lambda: deque(maxlen=200))
+    stderr_tail: Deque[str] = field(default_factory=lambda: deque(maxlen=200))
+    _task: Optional[asyncio.Task] = field(default=None, repr=False)
+
+    @property
+    def done(self) -> bool:
+        return self.status not in (PENDING, RUNNING)
+
+    @property
+    def succeeded(self) -> bool:
+        return self.status == SUCCEEDED
+
+    @property
+    def duration(self) -> Optional[float]:
+        if self.started_at is None:
+            return None
+        return (self.finished_at or time.time()) - self.started_at
+
+    async def wait(self) -> "AgentRun":
+        if self._task:
+            await asyncio.shield(self._task)
+        return self
+
+    def cancel(self):
+        """Stops the run; a running agent has its whole process tree killed."""
+        if self._task and not self._task.done():
+            self._task.cancel()
+
+class AgentSupervisor:
+    def __init__(
+        self,
+        max_concurrent: int = 8,
+        model_limits: Optional[Dict[str, int]] = None,
+        wall_timeout: Optional[float] = 900,
+        idle_timeout: Optional[float] = 300,
+        kill_grace: float = 5.0,
+        tail_lines: int = 200
+    ):
+        self.wall_timeout = wall_timeout
+        self.idle_timeout = idle_timeout
+        self.kill_grace = kill_grace
+        self.tail_lines = tail_lines
+        self.model_limits = dict(model_limits or {})
+        self._global = asyncio.Semaphore(max_concurrent)
+        self._per_model: Dict[str, asyncio.Semaphore] = {}
+        self.runs: Dict[int, AgentRun] = {}
+
+    def _model_semaphore(self, model: Optional[str]) -> Optional[asyncio.Semaphore]:
+        if model not in self.model_limits:
+            return None
+        if model not in self._per_model:
+            self._per_model[model] = asyncio.Semaphore(self.model_limits[model])
+        return self._per_model[model]
+
+    def spawn(
+        self,
+        cmd: List[str],
+        cwd: Path,
+        model: Optional[str] = None,
+        env: Optional[Dict[str, str]] = None,
+        wall_timeout: Optional[float] = None,
+        idle_timeout: Optional[float] = None,
+        on_line: Optional[Callable[[AgentRun, str, str], None]] = None
+    ) -> AgentRun:
+        """
+        Queues cmd to run under the concurrency limits. Must be called from
+        within the event loop. Timeouts default to the supervisor's.
+
+        on_line is called with (run, stream_name, line) for every output line.
+        """
+        run = AgentRun(cmd=cmd, cwd=Path(cwd), model=model)
+        run.stdout_tail = deque(maxlen=self.tail_lines)
+        run.stderr_tail = deque(maxlen=self.tail_lines)
+        run._task = asyncio.get_running_loop().create_task(self._run(
+            run, env,
+            self.wall_timeout if wall_timeout is None else wall_timeout,
+            self.idle_timeout if idle_timeout is None else idle_timeout,
+            on_line
+        ))
+        self.runs[run.run_id] = run
+        return run
+
+    def start(
+        self,
+        workspace_path: Path,
+        prompt: str,
+        model: str = "gemini-3-flash-preview",
+        auto_confirm: bool = True,
+        **kwargs
+    ) -> AgentRun:
+        """Queues a Gemini CLI run for prompt in workspace_path (see spawn for kwargs)."""
+        cmd, err = headless_gemini._build_command(prompt, model, auto_confirm)
+        if cmd is None:
+            run = AgentRun(cmd=[], cwd=Path(workspace_path), model=model, status=FAILED, error=err)
+            self.runs[run.run_id] = run
+            return run
+        return self.spawn(cmd, workspace_path, model=model, **kwargs)
+
+    async def _pump(self, reader: asyncio.StreamReader, run: AgentRun, name: str, activity: list, on_line):
+        tail = run.stdout_tail if name == 'stdout' else run.stderr_tail
+        while True:
+            try:
+                line = await reader.readline()
+            except ValueError: # Line longer than the stream limit; take it in pieces
+                line = await reader.read(STREAM_LIMIT)
+            if not line:
+                return
+            activity[0] = time.monotonic()
+            text = line.decode('utf-8', errors='replace')
+            tail.append(text)
+            if on_line:
+                on_line(run, name, text)
+
+    async def _run(self, run: AgentRun, env, wall_timeout, idle_timeout, on_line):
+        # Wait for the model's own cap first so a queued run does not hold a global slot.
+        model_sem = self._model_semaphore(run.model)
+        try:
+            if model_sem:
+                await model_sem.acquire()
+            try:
+                async with self._global:
+                    await self._execute(run, env, wall_timeout, idle_timeout, on_line)
+            finally:
+                if model_sem:
+                    model_sem.release()
+        except asyncio.CancelledError:
+            run.status = CANCELLED # Cancelled while still queued
+        finally:
+            run.finished_at = time.time()
+
+    async def _execute(self, run: AgentRun, env, wall_timeout, idle_timeout, on_line):
+        run_env = os.environ.copy()
+        if env:
+            run_env.update(env)
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                *run.cmd, cwd=str(run.cwd), env=run_env,
+                stdin=asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                limit=STREAM_LIMIT,
+                **headless_gemini.PROCESS_GROUP
+            )
+        except OSError as e:
+            run.status, run.error = FAILED, f"Agent Execution Error: {e}"
+            return
+        run.pid = proc.pid
+        run.status = RUNNING
+        run.started_at = time.time()
+
+        started = time.monotonic()
+        activity = [started]
+        readers = [
+            asyncio.create_task(self._pump(proc.stdout, run, 'stdout', activity, on_line)),
+            asyncio.create_task(self._pump(proc.stderr, run, 'stderr', activity, on_line)),
+        ]
+        exited = asyncio.create_task(proc.wait())
+        try:
+            while not exited.done():
+                now = time.monotonic()
+                deadlines = []
+                if wall_timeout:
+                    deadlines.append((started + wall_timeout, TIMED_OUT))
+                if idle_timeout:
+                    deadlines.append((activity[0] + idle_timeout, IDLE_TIMEOUT))
+                if not deadlines:
+                    await asyncio.wait({exited})
+                    break
+                deadline, reason = min(deadlines)
+                if deadline <= now:
+                    run.status = reason
+                    run.error = f"Agent killed after {now - started:.0f}s ({reason})"
+                    print(f"AgentSupervisor: Run {run.run_id} (pid {proc.pid}) {reason}, killing process tree.")
+                    await self._kill_tree(proc)
+                    break
+                await asyncio.wait({exited}, timeout=deadline - now)
+            run.returncode = await proc.wait()
+            await asyncio.wait(readers, timeout=self.kill_grace)
+            if run.status == RUNNING:
+                run.status = SUCCEEDED if run.returncode == 0 else FAILED
+        except asyncio.CancelledError:
+            run.status = CANCELLED
+            await self._kill_tree(proc)
+            run.returncode = proc.returncode
+        finally:
+            exited.cancel()
+            for reader in readers:
+                reader.cancel()
+
+    async def _kill_tree(self, proc: asyncio.subprocess.Process):
+        """Terminates the agent's whole process group, escalating to a hard kill after kill_grace."""
+        if proc.returncode is not None:
+            return
+        if os.name == 'nt':
+            await asyncio.get_running_loop().run_in_executor(None, headless_gemini.kill_process_tree, proc.pid)
+        elif headless_gemini.kill_process_tree(proc.pid, signal.SIGTERM):
+            try:
+                await asyncio.wait_for(proc.wait(), self.kill_grace)
+            except asyncio.TimeoutError:
+                pass
+            headless_gemini.kill_process_tree(proc.pid) # Also reaps children that outlived the leader
+        await proc.wait()
+
+    async def shutdown(self):
+        """Cancels every unfinished run and waits for their process trees to die."""
+        pending = [run for run in self.runs.values() if run._task and not run._task.done()]
+        for run in pending:
+            run.cancel()
+        await asyncio.gather(*(run._task for run in pending), return_exceptions=True)
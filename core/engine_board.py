@@ -0,0 +1,116 @@
+"""
+Local mirror of a Kanban board.
+
+BoardMirror keeps every task of one project in memory and polls for changes
+with an `updated_since` cursor (the largest `updated_at` seen), so an idle
+board costs a near-empty response per poll instead of the full task list.
+Servers that ignore the filter are detected and diffed by `updated_at`
+instead. Deletions are invisible to a delta query, so a full resync runs every
+`full_sync_interval` seconds. The poll interval doubles while nothing changes
+(up to `max_interval`) and drops back to `min_interval` on activity.
+
+Changes are published through engine_events:
+    task_added   {"project_id", "task"}
+    task_changed {"project_id", "task", "previous"}
+    task_removed {"project_id", "task"}
+"""
+import threading
+import time
+import engine_events
+import engine_kanban
+
+class BoardMirror:
+    def __init__(self, project_id, min_interval=1.0, max_interval=30.0, full_sync_interval=60.0, fetch=None):
+        self.project_id = project_id
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.full_sync_interval = full_sync_interval
+        self.interval = min_interval
+        self.tasks = {} # Task id -> task
+        self.index = engine_kanban.RecipientIndex() # Kept in step with self.tasks
+        self.cursor = None # Largest updated_at seen
+        self.delta_supported = None # Unknown until the first delta response
+        self._fetch = fetch or engine_kanban.get_tasks
+        self._last_full = 0.0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def snapshot(self):
+        """Copy of the mirrored tasks, safe to iterate while the mirror syncs."""
+        with self._lock:
+            return list(self.tasks.values())
+
+    def sync(self, full=False):
+        """Fetches changes once. Returns the number of changes, or None if the fetch failed."""
+        full = (full or self.cursor is None or self.delta_supported is False
+                or time.monotonic() - self._last_full >= self.full_sync_interval)
+        tasks = self._fetch(self.project_id) if full else self._fetch(self.project_id, updated_since=self.cursor)
+        if tasks is None:
+            return None
+
+        if not full:
+            # A server that ignores updated_since sends older tasks too; from now on diff full lists.
+            stale = any((t.get('updated_at') or '') < self.cursor for t in tasks)
+            if self.delta_supported is None:
+                self.delta_supported = not stale
+                if stale:
+                    print("BoardMirror: Server ignores updated_since, diffing full task lists.")
+            full = stale
+
+        events = []
+        with self._lock:
+            seen = set()
+            for task in tasks:
+                tid = task['id']
+                seen.add(tid)
+                old = self.tasks.get(tid)
+                if old is None:
+                    events.append(("task_added", {"project_id": self.project_id, "task": task}))
+                elif old.get('updated_at') != task.get('updated_at') or (task.get('updated_at') is None and old != task):
+                    events.append(("task_changed", {"project_id": self.project_id, "task": task, "previous": old}))
+                else:
+                    continue
+                self.tasks[tid] = task
+                self.index.update(task)
+                updated = task.get('updated_at')
+                if updated and (self.cursor is None or updated > self.cursor):
+                    self.cursor = updated
+            if full:
+                for tid in [tid for tid in self.tasks if tid not in seen]:
+                    self.index.remove(tid)
+                    events.append(("task_removed", {"project_id": self.project_id, "task": self.tasks.pop(tid)}))
+                self._last_full = time.monotonic()
+
+        for event_type, data in events:
+            engine_events.emit(event_type, data)
+        return len(events)
+
+    def tasks_for(self, worker_name, status=None):
+        """Mirrored tasks addressed to worker_name (see RecipientIndex.tasks_for)."""
+        with self._lock:
+            return [self.tasks[tid] for tid in self.index.tasks_for(worker_name, status)]
+
+    def _next_interval(self, changes):
+        if changes:
+            self.interval = self.min_interval
+        else:
+            self.interval = min(self.max_interval, self.interval * 2)
+        return self.interval
+
+    def run(self):
+        """Polls until stop() is called."""
+        while not self._stop.is_set():
+            changes = self.sync()
+            self._stop.wait(self._next_interval(changes))
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.run, daemon=True, name=f"board-{self.project_id}")
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join()
@@ -0,0 +1,320 @@
+"""
+Shared board poller.
+
+One daemon per host keeps a BoardMirror per project and pushes assignment
+changes to subscribed control workers, so the Kanban server sees one poller
+per project regardless of how many workers run.
+
+Transport is newline-delimited JSON over a Unix domain socket (TCP on
+localhost where AF_UNIX is unavailable). A worker sends one line:
+    {"op": "subscribe", "project_id": "...", "worker": "coder"}
+and then receives:
+    {"type": "snapshot", "tasks": {"<id>": "<title>", ...}}
+    {"type": "assigned", "task": {...}}
+    {"type": "unassigned", "task_id": "..."}
+
+Usage:
+    python core/engine_board_daemon.py          # start the daemon
+    python core/engine_worker.py coder --shared # workers subscribe to it
+"""
+import os
+import json
+import queue
+import socket
+import socketserver
+import tempfile
+import threading
+import argparse
+import engine_events
+import engine_kanban
+import engine_board
+
+DEFAULT_TCP_PORT = 61155
+SEND_QUEUE_SIZE = 1000 # Messages buffered per subscriber before it is dropped
+
+def default_address():
+    """Socket path (or (host, port) without AF_UNIX) shared by the daemon and its clients."""
+    if hasattr(socket, 'AF_UNIX'):
+        user = os.getuid() if hasattr(os, 'getuid') else os.environ.get('USERNAME', 'user')
+        return os.path.join(tempfile.gettempdir(), f"kanban-board-{user}.sock")
+    port = engine_kanban.load_config().get('board_daemon_port', DEFAULT_TCP_PORT)
+    return ("127.0.0.1", port)
+
+class _Subscriber:
+    """
+    One connected worker. Messages are queued and written by the subscriber's
+    own thread, so a worker that stops reading stalls only itself; once its
+    queue is full it is dropped.
+    """
+    def __init__(self, conn, project_id, worker, queue_size=None):
+        self.conn = conn
+        self.project_id = project_id
+        self.worker = worker
+        self.known = set()
+        self.synced = False # Deltas are only sent after the snapshot
+        self.lock = threading.Lock() # Guards known/synced so each change is queued once, in order
+        self.closed = False
+        self._queue = queue.Queue(maxsize=queue_size or SEND_QUEUE_SIZE)
+        self._writer = threading.Thread(target=self._write, daemon=True, name=f"board-sub-{worker}")
+        self._writer.start()
+
+    def send(self, message):
+        if self.closed:
+            return
+        try:
+            self._queue.put_nowait((json.dumps(message) + "\n").encode('utf-8'))
+        except queue.Full:
+            print(f"BoardDaemon: {self.worker} ({self.project_id}) is not reading, dropping it")
+            self.close()
+
+    def _write(self):
+        while True:
+            data = self._queue.get()
+            if data is None or self.closed:
+                return
+            try:
+                self.conn.sendall(data)
+            except OSError:
+                self.close() # Disconnected; its handler thread unsubscribes it
+                return
+
+    def close(self):
+        """Disconnects the worker; its handler thread then unsubscribes it."""
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            self.conn.shutdown(socket.SHUT_RDWR) # Also unblocks a writer stuck in sendall
+        except OSError:
+            pass
+        try:
+            self._queue.put_nowait(None)
+        except queue.Full:
+            pass
+
+if hasattr(socketserver, 'ThreadingUnixStreamServer'):
+    class _UnixServer(socketserver.ThreadingUnixStreamServer):
+        daemon_threads = True
+        request_queue_size = 128 # Many workers may (re)connect at once
+
+class _TCPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+    request_queue_size = 128
+
+class BoardDaemon:
+    def __init__(self, address=None, min_interval=None, max_interval=None, mirror_factory=None, send_queue_size=None):
+        cfg = engine_kanban.load_config()
+        self.address = address or default_address()
+        self.send_queue_size = send_queue_size or SEND_QUEUE_SIZE
+        self.min_interval = min_interval or cfg.get('poll_interval', 1.0)
+        self.max_interval = max_interval or cfg.get('max_poll_interval', 30.0)
+        self._mirror_factory = mirror_factory or (lambda pid: engine_board.BoardMirror(
+            pid, min_interval=self.min_interval, max_interval=self.max_interval))
+        self._mirrors = {} # Project id -> BoardMirror
+        self._subscribers = {} # Project id -> list of _Subscriber
+        self._ready = {} # Project id -> Event set once the mirror's first sync is done
+        self._lock = threading.Lock() # Guards the maps only; nothing blocking runs under it
+        self._server = None
+
+    # --- Subscriptions ---
+
+    def _subscribe(self, sub):
+        with self._lock:
+            mirror = self._mirrors.get(sub.project_id)
+            created = mirror is None
+            if created:
+                mirror = self._mirrors[sub.project_id] = self._mirror_factory(sub.project_id)
+                self._ready[sub.project_id] = threading.Event()
+            ready = self._ready[sub.project_id]
+            # Registered before the first sync, so the mirror is not dropped while it runs.
+            self._subscribers.setdefault(sub.project_id, []).append(sub)
+
+        # The first sync hits the network; it runs outside the lock so other projects keep flowing.
+        if created:
+            try:
+                mirror.sync()
+                mirror.start()
+                print(f"BoardDaemon: Polling project {sub.project_id}")
+            except BaseException:
+                with self._lock: # Subscribers waiting on this mirror give up too
+                    if self._mirrors.get(sub.project_id) is mirror:
+                        del self._mirrors[sub.project_id]
+                raise
+            finally:
+                ready.set()
+        else:
+            ready.wait()
+        with self._lock:
+            if self._mirrors.get(sub.project_id) is not mirror:
+                raise RuntimeError(f"project {sub.project_id} stopped before it was synced")
+
+        with sub.lock:
+            tasks = {t['id']: t['title'] for t in mirror.tasks_for(sub.worker, 'inprogress')}
+            sub.known = set(tasks)
+            sub.synced = True
+            sub.send({"type": "snapshot", "tasks": tasks})
+
+    def _unsubscribe(self, sub):
+        sub.close()
+        mirror = None
+        with self._lock:
+            subs = self._subscribers.get(sub.project_id, [])
+            if sub in subs:
+                subs.remove(sub)
+            if not subs and sub.project_id in self._mirrors:
+                self._subscribers.pop(sub.project_id, None)
+                self._ready.pop(sub.project_id, None)
+                mirror = self._mirrors.pop(sub.project_id)
+        if mirror:
+            mirror.stop()
+            print(f"BoardDaemon: No subscribers left for project {sub.project_id}, stopped polling")
+
+    def _on_task(self, data):
+        project_id, task = data['project_id'], data['task']
+        with self._lock:
+            mirror = self._mirrors.get(project_id)
+            subs = list(self._subscribers.get(project_id, []))
+        if not mirror: return
+        for sub in subs:
+            with sub.lock:
+                if not sub.synced:
+                    continue # Its snapshot will include this change
+                assigned = task['id'] in mirror.index.tasks_for(sub.worker, 'inprogress')
+                if assigned and task['id'] not in sub.known:
+                    sub.known.add(task['id'])
+                    sub.send({"type": "assigned", "task": task})
+                elif not assigned and task['id'] in sub.known:
+                    sub.known.discard(task['id'])
+                    sub.send({"type": "unassigned", "task_id": task['id']})
+
+    def _on_removed(self, data):
+        with self._lock:
+            subs = list(self._subscribers.get(data['project_id'], []))
+        for sub in subs:
+            with sub.lock:
+                if data['task']['id'] in sub.known:
+                    sub.known.discard(data['task']['id'])
+                    sub.send({"type": "unassigned", "task_id": data['task']['id']})
+
+    # --- Server ---
+
+    def _handler(self):
+        daemon = self
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                try:
+                    request = json.loads(self.rfile.readline() or b"{}")
+                except ValueError:
+                    return
+                if request.get('op') != 'subscribe' or not request.get('project_id') or not request.get('worker'):
+                    self.wfile.write(b'{"type": "error", "message": "expected subscribe with project_id and worker"}\n')
+                    return
+                sub = _Subscriber(self.connection, request['project_id'], request['worker'], daemon.send_queue_size)
+                try:
+                    daemon._subscribe(sub)
+                    while self.rfile.readline(): # Block until the worker disconnects
+                        pass
+                except OSError:
+                    pass
+                finally:
+                    daemon._unsubscribe(sub)
+        return Handler
+
+    def _bind(self):
+        handler = self._handler()
+        if isinstance(self.address, str):
+            if os.path.exists(self.address):
+                probe = _connect(self.address)
+                if probe is not None:
+                    probe.close()
+                    raise RuntimeError(f"A board daemon is already listening on {self.address}")
+                os.unlink(self.address) # Left behind by a daemon that died
+            return _UnixServer(self.address, handler)
+        return _TCPServer(self.address, handler)
+
+    def start(self):
+        """Binds and serves in a background thread."""
+        self._server = self._bind()
+        if not isinstance(self.address, str):
+            self.address = self._server.server_address
+        engine_events.subscribe("task_added", self._on_task)
+        engine_events.subscribe("task_changed", self._on_task)
+        engine_events.subscribe("task_removed", self._on_removed)
+        threading.Thread(target=self._server.serve_forever, daemon=True, name="board-daemon").start()
+        print(f"BoardDaemon: Listening on {self.address}")
+        return self
+
+    def stop(self):
+        engine_events.unsubscribe("task_added", self._on_task)
+        engine_events.unsubscribe("task_changed", self._on_task)
+        engine_events.unsubscribe("task_removed", self._on_removed)
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            if isinstance(self.address, str) and os.path.exists(self.address):
+                os.unlink(self.address)
+        with self._lock:
+            mirrors, self._mirrors = list(self._mirrors.values()), {}
+            subs = [sub for group in self._subscribers.values() for sub in group]
+            self._subscribers, self._ready = {}, {}
+        for sub in subs:
+            sub.close()
+        for mirror in mirrors:
+            mirror.stop()
+
+def _connect(address, timeout=2.0):
+    family = socket.AF_UNIX if isinstance(address, str) else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    # Unix sockets fail instead of waiting when the backlog is full unless connect() blocks.
+    sock.settimeout(None if isinstance(address, str) else timeout)
+    try:
+        sock.connect(address)
+    except OSError:
+        sock.close()
+        return None
+    sock.settimeout(None)
+    return sock
+
+class BoardSubscription:
+    """Worker side of the daemon protocol. Iterate to receive messages until the daemon goes away."""
+
+    def __init__(self, sock, project_id, worker):
+        self.sock = sock
+        self._file = sock.makefile('rb')
+        sock.sendall((json.dumps({"op": "subscribe", "project_id": project_id, "worker": worker}) + "\n").encode('utf-8'))
+
+    def __iter__(self):
+        for line in self._file:
+            yield json.loads(line)
+
+    def close(self):
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self._file.close()
+        self.sock.close()
+
+def subscribe(project_id, worker, address=None):
+    """Subscribes to a running daemon; None if there is none."""
+    sock = _connect(address or default_address())
+    if sock is None:
+        return None
+    return BoardSubscription(sock, project_id, worker)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Shared Kanban board poller for control workers.")
+    parser.add_argument("--address", help="Unix socket path, or host:port for TCP")
+    args = parser.parse_args()
+    address = args.address
+    if address and ":" in address and not address.startswith(os.sep):
+        host, port = address.rsplit(":", 1)
+        address = (host, int(port))
+    daemon = BoardDaemon(address=address).start()
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        print("\nBoard daemon stopped.")
+    finally:
+        daemon.stop()
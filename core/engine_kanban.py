@@ -1,9 +1,12 @@
-import urllib.request
 import urllib.parse
+import http.client
+import gzip
 import json
 import sys
 import os
 import re
+import threading
+import time
 import engine_events
 import utils_ui
 
@@ -16,71 +19,322 @@ def _get_config_file():
         shutil.copy(TEMPLATE_FILE, CONFIG_FILE)
     return CONFIG_FILE
 
-def load_config():
-    data = utils_ui.load_full_config()
-    return data.get("kanban", {})
+class KanbanError(Exception):
+    """Base class for Kanban API failures."""
 
-def save_config(updates):
-    data = utils_ui.load_full_config()
-    data.setdefault("kanban", {}).update(updates)
-    utils_ui.save_full_config(data)
+class KanbanConnectionError(KanbanError):
+    """The server could not be reached or did not answer in time."""
+
+class KanbanHTTPError(KanbanError):
+    def __init__(self, status, body=""):
+        super().__init__(f"HTTP {status}: {body[:200]}")
+        self.status = status
+        self.body = body
+
+class KanbanAPIError(KanbanError):
+    """The server answered but reported success: false (or sent invalid JSON)."""
+
+RETRY_STATUSES = {502, 503, 504}
+IDEMPOTENT_METHODS = {'GET', 'HEAD', 'PUT', 'DELETE'}
+
+class KanbanClient:
+    """
+    Kanban API client with a keep-alive connection pool.
+
+    The kanban section comes from the shared config store, which re-reads
+    config.json only when it changes on disk. Idempotent requests are retried up to
+    `retries` times with exponential backoff on connection errors and
+    502/503/504; a keep-alive connection the server already dropped is
+    replaced transparently for any method.
+    """
+
+    def __init__(self, timeout=10.0, retries=2, backoff=0.25, pool_size=4):
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.pool_size = pool_size
+        self._idle = []
+        self._lock = threading.Lock()
+
+    def config(self):
+        """The kanban config section (read-only), reloaded when config.json changes."""
+        return utils_ui.get_config_store().get("kanban", {})
+
+    def _endpoint(self):
+        cfg = self.config()
+        return cfg['ip'], int(cfg['port'])
+
+    def _acquire(self, endpoint):
+        with self._lock:
+            for i in range(len(self._idle) - 1, -1, -1):
+                if self._idle[i][0] == endpoint:
+                    return self._idle.pop(i)[1], True
+        return http.client.HTTPConnection(*endpoint, timeout=self.timeout), False
 
+    def _release(self, endpoint, conn):
+        with self._lock:
+            if len(self._idle) < self.pool_size:
+                self._idle.append((endpoint, conn))
+                return
+        conn.close()
 
+    def _send(self, endpoint, method, url, body):
+        headers = {'Content-Type': 'application/json', 'Accept-Encoding': 'gzip', 'Connection': 'keep-alive'}
+        while True:
+            conn, reused = self._acquire(endpoint)
+            try:
+                conn.request(method, url, body=body, headers=headers)
+                response = conn.getresponse()
+                payload = response.read()
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError) as e:
+                conn.close()
+                if reused:
+                    continue # The server closed an idle keep-alive connection
+                raise KanbanConnectionError(f"{method} {url}: {e}") from e
+            except (OSError, http.client.HTTPException) as e:
+                conn.close()
+                raise KanbanConnectionError(f"{method} {url}: {e}") from e
+
+            if response.will_close:
+                conn.close()
+            else:
+                self._release(endpoint, conn)
+            if response.getheader('Content-Encoding', '').lower() == 'gzip':
+                payload = gzip.decompress(payload)
+            return response.status, payload
+
+    def request(self, path, method='GET', data=None):
+        """Performs a request and returns the response's `data` field; raises KanbanError on failure."""
+        endpoint = self._endpoint()
+        url = f"/api/{path.lstrip('/')}"
+        body = json.dumps(data).encode('utf-8') if data else None
+        attempts = 1 + (self.retries if method in IDEMPOTENT_METHODS else 0)
+        for attempt in range(attempts):
+            try:
+                status, payload = self._send(endpoint, method, url, body)
+                if status in RETRY_STATUSES:
+                    raise KanbanHTTPError(status, payload.decode('utf-8', 'replace'))
+                break
+            except (KanbanConnectionError, KanbanHTTPError):
+                if attempt + 1 >= attempts:
+                    raise
+                time.sleep(self.backoff * (2 ** attempt))
+
+        if status not in (200, 201):
+            raise KanbanHTTPError(status, payload.decode('utf-8', 'replace'))
+        try:
+            res_data = json.loads(payload)
+        except ValueError as e:
+            raise KanbanAPIError(f"{method} {url}: invalid JSON response: {e}") from e
+        if not res_data.get("success"):
+            raise KanbanAPIError(f"{method} {url}: {res_data.get('message') or 'request failed'}")
+        return res_data.get("data")
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for _, conn in idle:
+            conn.close()
+
+_client = None
+_client_lock = threading.Lock()
+
+def get_client():
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = KanbanClient()
+        return _client
+
+def load_config():
+    return dict(get_client().config())
+
+def save_config(updates):
+    store = utils_ui.get_config_store()
+    kanban = store.load().get("kanban", {})
+    kanban.update(updates)
+    store.set("kanban", kanban)
 
 def get_base_url():
     cfg = load_config()
     return f"http://{cfg['ip']}:{cfg['port']}/api"
 
 def api_request(path, method='GET', data=None):
-    cfg = load_config()
-    url = f"{get_base_url()}/{path.lstrip('/')}"
-    encoded_data = json.dumps(data).encode('utf-8') if data else None
-    req = urllib.request.Request(url, data=encoded_data, method=method)
-    req.add_header('Content-Type', 'application/json')
+    """Compatibility wrapper around KanbanClient.request: returns None instead of raising."""
     try:
-        with urllib.request.urlopen(req) as response:
-            if response.status in [200, 201]:
-                res_data = json.loads(response.read())
-                if res_data.get("success"): return res_data.get("data")
-    except: pass
+        return get_client().request(path, method=method, data=data)
+    except KanbanError as e:
+        print(f"[Kanban API Error] {e}")
+    except (KeyError, ValueError) as e:
+        print(f"[Kanban Config Error] Missing or invalid kanban ip/port: {e}")
     return None
 
 def list_projects():
     return api_request("projects")
 
-def resolve_project_id(project_name_or_id):
+PROJECT_CACHE_TTL = 300 # Seconds a fetched project list is trusted
+PROJECT_MISS_REFRESH = 10 # Minimum seconds between refetches caused by unknown names
+
+_projects = {} # Project name and id -> project
+_projects_loaded_at = 0.0
+_projects_lock = threading.Lock()
+
+def invalidate_projects(_data=None):
+    """Drops the cached project list; the next resolution refetches it."""
+    global _projects_loaded_at
+    with _projects_lock:
+        _projects_loaded_at = 0.0
+
+engine_events.subscribe("project_added", invalidate_projects)
+engine_events.subscribe("project_deleted", invalidate_projects)
+
+def _refresh_projects():
+    global _projects, _projects_loaded_at
     projects = list_projects()
-    if not projects: return project_name_or_id
-    for p in projects:
-        if p['name'] == project_name_or_id or p['id'] == project_name_or_id:
-            save_config({"last_project": p['name']})
-            return p['id']
-    return project_name_or_id
-
-def get_tasks(project_id):
-    params = urllib.parse.urlencode({'project_id': project_id})
+    if projects is None: return # Keep serving the stale list while the server is unreachable
+    index = {}
+    for p in projects: # First match wins, as in a linear scan
+        index.setdefault(p['name'], p)
+        index.setdefault(p['id'], p)
+    with _projects_lock:
+        _projects, _projects_loaded_at = index, time.monotonic()
+
+def find_project(project_name_or_id):
+    """Cached lookup of a Kanban project by name or id (None if unknown)."""
+    age = time.monotonic() - _projects_loaded_at
+    if not _projects_loaded_at or age >= PROJECT_CACHE_TTL:
+        _refresh_projects()
+    elif project_name_or_id not in _projects and age >= PROJECT_MISS_REFRESH:
+        _refresh_projects() # Possibly created since the last fetch
+    return _projects.get(project_name_or_id)
+
+def resolve_project_id(project_name_or_id):
+    p = find_project(project_name_or_id)
+    if not p: return project_name_or_id
+    if load_config().get("last_project") != p['name']:
+        save_config({"last_project": p['name']})
+    return p['id']
+
+def get_tasks(project_id, updated_since=None):
+    """All tasks of a project, or only those updated after `updated_since` where the server supports it."""
+    query = {'project_id': project_id}
+    if updated_since: query['updated_since'] = updated_since
+    params = urllib.parse.urlencode(query)
     return api_request(f"tasks?{params}")
 
 def update_task(task_id, updates):
-    res = api_request(f"tasks/{task_id}", method='PUT', data=updates)
-    if res: engine_events.emit("task_updated", {"id": task_id, "updates": updates})
-    return res
+    """Queues the update in the outbox and returns at once; task_updated follows once the server accepts it."""
+    import engine_outbox # Imports this module
+    engine_outbox.get_outbox().enqueue(task_id, updates)
+    return True
 
 def extract_recipient(text):
     if not text: return None
     match = re.search(r"(?:^[-*]\s*)?Rec[ei]pient:\s*(.+)$", text, re.MULTILINE | re.IGNORECASE)
     return match.group(1).strip() if match else None
 
+def _normalize(name):
+    return " ".join(name.lower().split())
+
+class RecipientIndex:
+    """
+    Normalized recipient -> task ids, per status.
+
+    update() re-parses a task's description only when its (id, updated_at)
+    changed, so repeated polls cost a dict lookup per task. A worker matches
+    every recipient containing its name (the substring rule of
+    extract_recipient users); that match is computed over the distinct
+    recipients once and cached until they change.
+    """
+
+    def __init__(self):
+        self._entries = {} # Task id -> (updated_at, recipient, normalized recipient, status)
+        self._by_key = {} # (normalized recipient, status) -> set of task ids
+        self._recipients = {} # Normalized recipient -> number of tasks
+        self._matches = {} # Normalized worker name -> set of normalized recipients containing it
+        self._lock = threading.Lock()
+
+    def update(self, task):
+        """Indexes task (if changed) and returns its recipient."""
+        tid = task.get('id')
+        updated = task.get('updated_at')
+        with self._lock:
+            entry = self._entries.get(tid)
+            if entry and updated is not None and entry[0] == updated:
+                return entry[1]
+            recipient = extract_recipient(task.get('description', ''))
+            norm = _normalize(recipient) if recipient else None
+            status = task.get('status')
+            if entry:
+                if entry[2:] == (norm, status):
+                    self._entries[tid] = (updated, recipient, norm, status)
+                    return recipient
+                self._unlink(tid, entry)
+            self._entries[tid] = (updated, recipient, norm, status)
+            if norm is not None:
+                self._by_key.setdefault((norm, status), set()).add(tid)
+                if norm not in self._recipients:
+                    self._matches.clear()
+                self._recipients[norm] = self._recipients.get(norm, 0) + 1
+            return recipient
+
+    def _unlink(self, tid, entry):
+        _, _, norm, status = entry
+        if norm is None:
+            return
+        ids = self._by_key.get((norm, status))
+        if ids:
+            ids.discard(tid)
+            if not ids:
+                del self._by_key[(norm, status)]
+        self._recipients[norm] -= 1
+        if not self._recipients[norm]:
+            del self._recipients[norm]
+            self._matches.clear()
+
+    def remove(self, task_id):
+        with self._lock:
+            entry = self._entries.pop(task_id, None)
+            if entry:
+                self._unlink(task_id, entry)
+
+    def _matching(self, worker_name):
+        key = _normalize(worker_name)
+        matches = self._matches.get(key)
+        if matches is None:
+            matches = self._matches[key] = {r for r in self._recipients if key in r}
+        return matches
+
+    def is_for(self, task, worker_name):
+        """True if task's recipient contains worker_name."""
+        recipient = self.update(task)
+        if not recipient or not worker_name: return False
+        with self._lock:
+            return _normalize(recipient) in self._matching(worker_name)
+
+    def tasks_for(self, worker_name, status=None):
+        """Ids of the tasks addressed to worker_name, optionally only those with `status`."""
+        with self._lock:
+            recipients = self._matching(worker_name)
+            if status is not None:
+                return set().union(*(self._by_key.get((r, status), ()) for r in recipients))
+            return {tid for (r, _), ids in self._by_key.items() if r in recipients for tid in ids}
+
+_recipient_index = RecipientIndex() # Shared by format_task and get_worker_tasks without a mirror
+
+def get_recipient_index():
+    return _recipient_index
+
 def format_task(task, mode="medium", highlight_user=None):
     cfg = load_config()
     colors = cfg.get('colors', {})
     desc = task.get('description', '')
-    recipient = extract_recipient(desc)
+    recipient = _recipient_index.update(task)
     status = task.get('status', 'unknown')
     tid = task.get('id', 'N/A')
     title = task.get('title', 'No Title')
     
-    is_for_me = highlight_user and recipient and highlight_user.lower() in recipient.lower()
+    is_for_me = bool(highlight_user) and _recipient_index.is_for(task, highlight_user)
     color = colors.get('green', '') if is_for_me else ""
     reset = colors.get('reset', '') if is_for_me else ""
 
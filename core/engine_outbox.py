@@ -0,0 +1,182 @@
+"""
+Durable write-behind outbox for Kanban task updates.
+
+update_task() used to PUT synchronously and lose the update whenever the
+board was slow or restarting. Updates now go into a SQLite outbox and return
+immediately. Updates to the same task are merged into one pending row (later
+fields win). A background thread drains every due row over the keep-alive
+KanbanClient, retrying with exponential backoff, and emits task_updated only
+once the server confirmed the change. Rows survive restarts, so a crash
+between queueing and flushing loses nothing.
+
+Events:
+    task_updated       {"id", "updates"}           server accepted the update
+    task_update_failed {"id", "updates", "error"}  server rejected it (4xx); not retried
+"""
+import os
+import atexit
+import json
+import sqlite3
+import threading
+import time
+import engine_events
+import engine_kanban
+
+OUTBOX_FILE = os.path.join(os.path.dirname(__file__), "kanban_outbox.sqlite3")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    task_id      TEXT PRIMARY KEY,
+    updates      TEXT NOT NULL,
+    version      INTEGER NOT NULL DEFAULT 1,
+    attempts     INTEGER NOT NULL DEFAULT 0,
+    next_attempt REAL NOT NULL,
+    queued_at    REAL NOT NULL,
+    last_error   TEXT
+);
+"""
+
+class Outbox:
+    def __init__(self, db_path=OUTBOX_FILE, client=None, backoff=0.5, max_backoff=60.0):
+        self.db_path = db_path
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._client = client
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._wake = threading.Condition(self._lock)
+        self._running = True
+        self._flushing = False
+        self._thread = threading.Thread(target=self._loop, daemon=True, name="kanban-outbox")
+        self._thread.start()
+
+    @property
+    def client(self):
+        return self._client or engine_kanban.get_client()
+
+    def enqueue(self, task_id, updates):
+        """Queues updates for task_id, merged into anything still pending for it. Never blocks on the network."""
+        now = time.time()
+        with self._lock:
+            with self._conn:
+                row = self._conn.execute("SELECT updates FROM outbox WHERE task_id = ?", (task_id,)).fetchone()
+                if row is None:
+                    self._conn.execute(
+                        "INSERT INTO outbox (task_id, updates, next_attempt, queued_at) VALUES (?, ?, ?, ?)",
+                        (task_id, json.dumps(updates), now, now)
+                    )
+                else:
+                    merged = dict(json.loads(row[0]), **updates)
+                    # A new version makes an in-flight flush keep the row; the next attempt is immediate.
+                    self._conn.execute(
+                        "UPDATE outbox SET updates = ?, version = version + 1, next_attempt = ? WHERE task_id = ?",
+                        (json.dumps(merged), now, task_id)
+                    )
+            self._wake.notify()
+
+    def pending(self):
+        """Pending updates by task id."""
+        with self._lock:
+            rows = self._conn.execute("SELECT task_id, updates FROM outbox").fetchall()
+        return {task_id: json.loads(updates) for task_id, updates in rows}
+
+    def _due(self):
+        # Caller holds the lock. Returns (due rows, seconds until the next row is due or None).
+        now = time.time()
+        rows = self._conn.execute(
+            "SELECT task_id, updates, version, attempts FROM outbox WHERE next_attempt <= ? ORDER BY queued_at",
+            (now,)
+        ).fetchall()
+        if rows:
+            return rows, 0
+        nxt = self._conn.execute("SELECT MIN(next_attempt) FROM outbox").fetchone()[0]
+        return [], (None if nxt is None else max(0.0, nxt - now))
+
+    def _loop(self):
+        while True:
+            with self._lock:
+                rows, wait = self._due()
+                while self._running and not rows:
+                    self._flushing = False
+                    self._wake.notify_all()
+                    self._wake.wait(wait)
+                    rows, wait = self._due()
+                if not self._running:
+                    self._flushing = False
+                    self._wake.notify_all()
+                    return
+                self._flushing = True
+            for task_id, updates, version, attempts in rows:
+                self._flush_one(task_id, json.loads(updates), version, attempts)
+
+    def _flush_one(self, task_id, updates, version, attempts):
+        try:
+            self.client.request(f"tasks/{task_id}", method='PUT', data=updates)
+        except engine_kanban.KanbanHTTPError as e:
+            if 400 <= e.status < 500 and e.status != 429:
+                self._finish(task_id, version)
+                print(f"[Kanban Outbox] Update of task {task_id} rejected, dropping it: {e}")
+                engine_events.emit("task_update_failed", {"id": task_id, "updates": updates, "error": str(e)})
+                return
+            self._retry(task_id, version, attempts, e)
+            return
+        except engine_kanban.KanbanError as e:
+            self._retry(task_id, version, attempts, e)
+            return
+        except (KeyError, ValueError) as e: # Missing or invalid kanban config
+            self._retry(task_id, version, attempts, e)
+            return
+        self._finish(task_id, version)
+        engine_events.emit("task_updated", {"id": task_id, "updates": updates})
+
+    def _finish(self, task_id, version):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM outbox WHERE task_id = ? AND version = ?", (task_id, version))
+
+    def _retry(self, task_id, version, attempts, error):
+        delay = min(self.max_backoff, self.backoff * (2 ** attempts))
+        if attempts == 0:
+            print(f"[Kanban Outbox] Update of task {task_id} failed, retrying with backoff: {error}")
+        with self._lock, self._conn:
+            # Only back off the version that failed; a newer merged update is tried right away.
+            self._conn.execute(
+                "UPDATE outbox SET attempts = attempts + 1, next_attempt = ?, last_error = ? WHERE task_id = ? AND version = ?",
+                (time.time() + delay, str(error), task_id, version)
+            )
+
+    def flush(self, timeout=None):
+        """Waits until nothing is due (rows in backoff stay queued). Returns True if drained in time."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._lock:
+            self._wake.notify()
+            while True:
+                rows, _ = self._due()
+                if not rows and not self._flushing:
+                    return True
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._wake.wait(remaining if remaining is not None else 0.5)
+
+    def close(self, timeout=5.0):
+        """Tries to flush for up to `timeout` seconds, then stops; unsent updates stay on disk."""
+        self.flush(timeout)
+        with self._lock:
+            self._running = False
+            self._wake.notify_all()
+        self._thread.join()
+        self._conn.close()
+
+_outbox = None
+_outbox_lock = threading.Lock()
+
+def get_outbox():
+    global _outbox
+    with _outbox_lock:
+        if _outbox is None:
+            _outbox = Outbox()
+            atexit.register(_outbox.close)
+        return _outbox
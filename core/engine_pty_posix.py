@@ -0,0 +1,177 @@
+"""POSIX PTY backend (Linux, macOS) built on os.openpty. Use engine_pty.PTY."""
+import codecs
+import errno
+import fcntl
+import os
+import select
+import shlex
+import shutil
+import signal
+import struct
+import subprocess
+import sys
+import termios
+import threading
+import time
+from engine_scrollback import Scrollback
+
+READ_SIZE = 65536
+
+def _set_winsize(fd, cols, rows):
+    fcntl.ioctl(fd, termios.TIOCSWINSZ, struct.pack("HHHH", rows, cols, 0, 0))
+
+# Exec'd in the new session before the command: adopts the slave on fd 0 as the controlling
+# terminal, then execs the command in the same process. Unlike a preexec_fn, no Python code
+# runs between fork and exec, which is not safe while other threads hold locks.
+_ACQUIRE_TTY = [sys.executable, "-S", "-c",
+    "import fcntl, os, sys, termios; fcntl.ioctl(0, termios.TIOCSCTTY, 0); os.execvp(sys.argv[1], sys.argv[1:])"]
+
+class PTY:
+    def __init__(self, cols=120, rows=30, scrollback_bytes=4 * 1024 * 1024, spill_path=None, reactor=None, screen=None):
+        self.cols = cols
+        self.rows = rows
+        self.master_fd = None
+        self.process = None
+        self.pid = None
+        self.output_thread = None
+        self.on_output = None # Callback(text)
+        self.scrollback = Scrollback(max_bytes=scrollback_bytes, spill_path=spill_path)
+        self.screen = screen # Optional engine_vt.Screen kept in sync with the output
+        if screen and screen.on_reply is None:
+            screen.on_reply = self.write # Answer cursor-position and device queries
+        self.running = False
+        self.reactor = reactor # Shared engine_pty_reactor.PTYReactor instead of a reader thread
+        self._decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+
+    def spawn(self, command_line, cwd=None, env=None):
+        if isinstance(command_line, str):
+            command_line = shlex.split(command_line)
+
+        run_env = os.environ.copy()
+        run_env.setdefault("TERM", "xterm-256color")
+        if env:
+            run_env.update(env)
+
+        # The shim would only report a missing command on the terminal; fail here like Popen does.
+        if os.sep not in command_line[0] and not shutil.which(command_line[0], path=run_env.get("PATH")):
+            raise FileNotFoundError(errno.ENOENT, "No such file or directory", command_line[0])
+
+        master_fd, slave_fd = os.openpty()
+        try:
+            _set_winsize(slave_fd, self.cols, self.rows)
+            # New session, so the child is its own process group and close() can signal all of it.
+            self.process = subprocess.Popen(
+                _ACQUIRE_TTY + command_line,
+                stdin=slave_fd, stdout=slave_fd, stderr=slave_fd,
+                cwd=cwd, env=run_env,
+                start_new_session=True
+            )
+        except Exception:
+            os.close(master_fd)
+            raise
+        finally:
+            os.close(slave_fd)
+
+        os.set_blocking(master_fd, False)
+        self.master_fd = master_fd
+        self.pid = self.process.pid
+        self.running = True
+
+        if self.reactor:
+            self.reactor.register(self)
+        else:
+            # Start output reader thread
+            self.output_thread = threading.Thread(target=self._read_loop, daemon=True)
+            self.output_thread.start()
+
+        return self.pid
+
+    def _handle_output(self, data):
+        # Incremental decoding keeps multi-byte characters split across reads intact.
+        text = self._decoder.decode(data)
+        if not text:
+            return
+        try:
+            self.scrollback.append(text)
+            if self.screen:
+                self.screen.feed(text)
+            if self.on_output:
+                self.on_output(text)
+        except Exception as e:
+            print(f"PTY Read Error: {e}")
+
+    def _handle_eof(self):
+        self.running = False
+
+    def _read_loop(self):
+        while self.running:
+            try:
+                ready, _, _ = select.select([self.master_fd], [], [], 0.1)
+                if not ready:
+                    continue
+                data = os.read(self.master_fd, READ_SIZE)
+            except BlockingIOError:
+                continue
+            except (OSError, ValueError): # EIO once the child side is gone, EBADF after close()
+                break
+            if not data:
+                break
+            self._handle_output(data)
+
+        self._handle_eof()
+
+    @property
+    def buffer(self):
+        """Retained output (at most scrollback_bytes); see self.scrollback for line access."""
+        return self.scrollback.text()
+
+    def write(self, text):
+        if not self.running: return
+        data = memoryview(text.encode('utf-8'))
+        while data:
+            try:
+                written = os.write(self.master_fd, data)
+                data = data[written:]
+            except BlockingIOError:
+                select.select([], [self.master_fd], [], 1.0)
+            except OSError:
+                return
+
+    def resize(self, cols, rows):
+        self.cols, self.rows = cols, rows
+        if self.master_fd is not None:
+            # The kernel delivers SIGWINCH to the foreground process group.
+            _set_winsize(self.master_fd, cols, rows)
+        if self.screen:
+            self.screen.resize(cols, rows)
+
+    def _signal_group(self, sig):
+        try:
+            os.killpg(self.pid, sig)
+        except (ProcessLookupError, PermissionError):
+            pass
+
+    def close(self, grace=1.0):
+        self.running = False
+        if self.reactor and self.master_fd is not None:
+            self.reactor.unregister(self)
+        if self.process:
+            if self.process.poll() is None:
+                # Hang up like a closed terminal would, then escalate.
+                self._signal_group(signal.SIGHUP)
+                self._signal_group(signal.SIGCONT)
+                deadline = time.monotonic() + grace
+                while self.process.poll() is None and time.monotonic() < deadline:
+                    time.sleep(0.02)
+            self._signal_group(signal.SIGKILL) # Also takes down children that ignored SIGHUP
+            self.process.wait()
+
+        if self.output_thread and self.output_thread is not threading.current_thread():
+            self.output_thread.join(timeout=1.0)
+
+        if self.master_fd is not None:
+            try: os.close(self.master_fd)
+            except OSError as e:
+                if e.errno != errno.EBADF: raise
+            self.master_fd = None
+        self.scrollback.close()
@@ -0,0 +1,150 @@
+"""
+One-thread reactor for many POSIX PTY sessions.
+
+Instead of one reader thread per PTY, sessions created with
+PTY(reactor=...) have their master fd serviced by a single selector loop
+(epoll on Linux, kqueue on macOS). Each wakeup drains every ready fd with
+large reads and delivers one output callback per session.
+
+Usage:
+    reactor = PTYReactor()
+    sessions = [PTY(reactor=reactor) for _ in range(30)]
+    for pty in sessions:
+        pty.spawn(["gemini", "-y"])
+    ...
+    reactor.close()
+
+The ConPTY backend reads through blocking pipe handles, which cannot be
+multiplexed this way, so on Windows each PTY keeps its own reader thread.
+"""
+import os
+import selectors
+import threading
+
+READ_SIZE = 65536
+MAX_READS_PER_WAKEUP = 4 # Per session, so one chatty session cannot starve the others
+
+class PTYReactor:
+    def __init__(self, read_size=READ_SIZE):
+        self.read_size = read_size
+        self._selector = selectors.DefaultSelector()
+        self._wake_r, self._wake_w = os.pipe()
+        os.set_blocking(self._wake_r, False)
+        os.set_blocking(self._wake_w, False)
+        self._selector.register(self._wake_r, selectors.EVENT_READ, None)
+        self._ops = [] # (action, pty, done_event) applied by the reactor thread
+        self._batch = {} # pty -> output read during the current wakeup
+        self._lock = threading.Lock()
+        self._running = True
+        self._thread = threading.Thread(target=self._loop, daemon=True, name="pty-reactor")
+        self._thread.start()
+
+    @property
+    def session_count(self):
+        return len(self._selector.get_map()) - 1
+
+    def register(self, pty):
+        """Starts servicing pty.master_fd; output goes to pty._handle_output."""
+        self._submit('add', pty)
+
+    def unregister(self, pty):
+        """Stops servicing pty. Returns once the reactor no longer touches its fd."""
+        self._submit('remove', pty)
+
+    def _submit(self, action, pty):
+        if threading.current_thread() is self._thread:
+            self._apply(action, pty) # From inside a callback: the selector is ours already
+            return
+        done = threading.Event()
+        with self._lock:
+            if not self._running:
+                return
+            self._ops.append((action, pty, done))
+        self._wake()
+        done.wait()
+
+    def _wake(self):
+        try:
+            os.write(self._wake_w, b'\0')
+        except BlockingIOError:
+            pass # A wakeup is already pending
+
+    def _apply(self, action, pty):
+        if action == 'add':
+            self._selector.register(pty.master_fd, selectors.EVENT_READ, pty)
+        else:
+            self._batch.pop(pty, None) # Unregistered sessions get no further callbacks
+            try:
+                self._selector.unregister(pty.master_fd)
+            except (KeyError, ValueError):
+                pass
+
+    def _drain_ops(self):
+        try:
+            while os.read(self._wake_r, 4096):
+                pass
+        except BlockingIOError:
+            pass
+        with self._lock:
+            ops, self._ops = self._ops, []
+        for action, pty, done in ops:
+            try:
+                self._apply(action, pty)
+            except Exception as e:
+                print(f"PTYReactor: Failed to {action} session: {e}")
+        return [done for _, _, done in ops]
+
+    def _loop(self):
+        while self._running:
+            self._batch = batch = {}
+            closed = []
+            acks = []
+            for key, _ in self._selector.select():
+                if key.data is None:
+                    acks += self._drain_ops()
+                    continue
+                if self._selector.get_map().get(key.fd) is not key:
+                    continue # Unregistered earlier in this wakeup
+                pty = key.data
+                chunks = []
+                for _ in range(MAX_READS_PER_WAKEUP):
+                    try:
+                        data = os.read(key.fd, self.read_size)
+                    except BlockingIOError:
+                        break
+                    except OSError: # EIO once the child side is gone
+                        data = b""
+                    if not data:
+                        closed.append(pty)
+                        break
+                    chunks.append(data)
+                    if len(data) < self.read_size:
+                        break
+                if chunks:
+                    batch[pty] = b"".join(chunks)
+
+            for pty in list(batch):
+                if pty in batch:
+                    pty._handle_output(batch[pty])
+            for pty in closed:
+                self._apply('remove', pty)
+                pty._handle_eof()
+            # Only now is it safe for unregister() callers to close their fds.
+            for done in acks:
+                done.set()
+
+        with self._lock:
+            ops, self._ops = self._ops, []
+        for _, _, done in ops:
+            done.set()
+
+    def close(self):
+        """Stops the reactor thread. Registered sessions stop receiving output."""
+        with self._lock:
+            self._running = False
+        self._wake()
+        if threading.current_thread() is not self._thread:
+            self._thread.join()
+        self._selector.close()
+        os.close(self._wake_r)
+        os.close(self._wake_w)
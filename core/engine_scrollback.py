@@ -0,0 +1,125 @@
+"""
+Memory-capped scrollback for PTY output.
+
+Output is stored as UTF-8 in one bytearray. Once it holds more than
+max_bytes (+ a slack of max_bytes / 4, so trimming is amortized), the oldest
+bytes are dropped, or appended to spill_path when one is given. Offsets are
+absolute (bytes since the session started) and line numbers count every line
+ever written, so callers can keep stable positions while data is evicted.
+"""
+import bisect
+import threading
+from typing import Optional
+
+class Scrollback:
+    def __init__(self, max_bytes: int = 4 * 1024 * 1024, spill_path: Optional[str] = None):
+        self.max_bytes = max_bytes
+        self.spill_path = spill_path
+        self._slack = max(max_bytes // 4, 4096)
+        self._data = bytearray()
+        self._start = 0 # Absolute offset of _data[0]
+        self._starts = [0] # Absolute offsets of line starts, from _head on
+        self._head = 0
+        self._first_line = 0 # Line number of _starts[_head]
+        self._lock = threading.Lock()
+        self._spill = open(spill_path, 'wb') if spill_path else None
+
+    @property
+    def start_offset(self) -> int:
+        """Absolute offset of the oldest byte still held in memory."""
+        return self._start
+
+    @property
+    def end_offset(self) -> int:
+        """Total bytes written so far."""
+        return self._start + len(self._data)
+
+    @property
+    def line_count(self) -> int:
+        """Lines written so far; a trailing partial line counts."""
+        with self._lock:
+            count = self._first_line + len(self._starts) - self._head
+            return count - 1 if self._starts[-1] == self.end_offset else count
+
+    def __len__(self):
+        return len(self._data)
+
+    def append(self, text):
+        if isinstance(text, str):
+            text = text.encode('utf-8')
+        if not text:
+            return
+        with self._lock:
+            base = self.end_offset
+            i = text.find(b'\n')
+            while i != -1:
+                self._starts.append(base + i + 1)
+                i = text.find(b'\n', i + 1)
+            self._data += text
+            if len(self._data) > self.max_bytes + self._slack:
+                self._trim(len(self._data) - self.max_bytes)
+
+    def _trim(self, n: int):
+        # Never cut inside a multi-byte character.
+        while n < len(self._data) and (self._data[n] & 0xC0) == 0x80:
+            n += 1
+        if self._spill:
+            self._spill.write(self._data[:n])
+            self._spill.flush()
+        del self._data[:n]
+        self._start += n
+
+        # Drop line starts that were evicted; the line cut in half keeps its
+        # number and now starts at the new start offset.
+        keep = bisect.bisect_right(self._starts, self._start, self._head) - 1
+        self._first_line += keep - self._head
+        self._head = keep
+        self._starts[keep] = self._start
+        if self._head > 1024 and self._head > len(self._starts) // 2:
+            del self._starts[:self._head]
+            self._head = 0
+
+    def read(self, start: int = 0, end: Optional[int] = None) -> str:
+        """Text between two absolute offsets. Evicted ranges come from the spill file, or are skipped without one."""
+        with self._lock:
+            end = self.end_offset if end is None else min(end, self.end_offset)
+            prefix = b""
+            if start < self._start and self.spill_path:
+                with open(self.spill_path, 'rb') as f:
+                    f.seek(start)
+                    prefix = f.read(min(end, self._start) - start)
+            start = max(start, self._start)
+            data = prefix + bytes(self._data[start - self._start:max(start, end) - self._start])
+        return data.decode('utf-8', errors='replace')
+
+    def text(self) -> str:
+        """Everything still held in memory."""
+        with self._lock:
+            return self._data.decode('utf-8', errors='replace')
+
+    def _line_offset(self, line: int) -> int:
+        index = self._head + line - self._first_line
+        if index < self._head:
+            return self._start
+        if index >= len(self._starts):
+            return self.end_offset
+        return self._starts[index]
+
+    def lines(self, first: int, last: Optional[int] = None) -> str:
+        """Text of lines first..last-1 by absolute line number (clipped to what is retained)."""
+        with self._lock:
+            start = self._line_offset(first)
+            end = self.end_offset if last is None else self._line_offset(last)
+        return self.read(start, end)
+
+    def last_lines(self, n: int) -> str:
+        """The last n lines, including a trailing partial line."""
+        if n <= 0:
+            return ""
+        return self.lines(max(0, self.line_count - n))
+
+    def close(self):
+        """Closes the spill file; retained and spilled output stay readable."""
+        if self._spill:
+            self._spill.close()
+            self._spill = None
@@ -0,0 +1,362 @@
+"""
+Headless VT100/xterm screen model.
+
+Screen.feed() parses terminal output incrementally (escape sequences may be
+split across calls) and keeps the visible grid, a bounded scrollback of lines
+that scrolled off the top, and the set of rows changed since the last
+take_dirty(). Only text is modeled: colors and other SGR attributes are
+dropped, which is all monitors need to tell what an agent is showing.
+
+Usage:
+    pty = PTY(screen=Screen(120, 30))
+    ...
+    for y in pty.screen.take_dirty():
+        print(y, pty.screen.line(y))
+"""
+import re
+from collections import deque
+from typing import Callable, List, Optional
+
+_GROUND, _ESC, _CSI, _STRING, _SKIP_ONE = range(5)
+_CONTROL = re.compile(r'[\x00-\x1f\x7f]')
+_TAB = 8
+
+class Screen:
+    def __init__(self, cols: int = 120, rows: int = 30, scrollback: int = 1000,
+                 on_reply: Optional[Callable[[str], None]] = None):
+        self.cols = cols
+        self.rows = rows
+        self.scrollback = deque(maxlen=scrollback)
+        self.on_reply = on_reply # Receives answers to status queries (DSR, DA) for the program
+        self.title = ""
+        self._state = _GROUND
+        self._seq = ""
+        self._reset()
+
+    def _blank(self) -> List[str]:
+        return [' '] * self.cols
+
+    def _reset(self):
+        self._main = [self._blank() for _ in range(self.rows)]
+        self._alt = None
+        self._grid = self._main
+        self.x = self.y = 0
+        self._wrap_pending = False
+        self.top, self.bottom = 0, self.rows - 1
+        self.autowrap = True
+        self.cursor_visible = True
+        self._saved = (0, 0)
+        self._dirty = set(range(self.rows))
+
+    # --- Queries ---
+
+    @property
+    def alt_screen(self) -> bool:
+        return self._grid is not self._main
+
+    @property
+    def cursor(self):
+        return self.x, self.y
+
+    def line(self, y: int) -> str:
+        return ''.join(self._grid[y]).rstrip()
+
+    def display(self) -> List[str]:
+        """Visible rows, trailing spaces stripped."""
+        return [''.join(row).rstrip() for row in self._grid]
+
+    def text(self) -> str:
+        """Visible screen as one string, without trailing blank rows."""
+        return '\n'.join(self.display()).rstrip('\n')
+
+    def take_dirty(self) -> List[int]:
+        """Rows changed since the previous call."""
+        dirty, self._dirty = sorted(self._dirty), set()
+        return dirty
+
+    # --- Input ---
+
+    def feed(self, data: str):
+        i, n = 0, len(data)
+        while i < n:
+            if self._state == _GROUND:
+                m = _CONTROL.search(data, i)
+                end = m.start() if m else n
+                if end > i:
+                    self._print(data, i, end)
+                    i = end
+                    continue
+                self._control(data[i])
+            else:
+                self._step(data[i])
+            i += 1
+
+    def _step(self, ch: str):
+        state = self._state
+        if state == _ESC:
+            self._state = _GROUND
+            if ch == '[':
+                self._state, self._seq = _CSI, ""
+            elif ch in ']PX^_':
+                self._state, self._seq = _STRING, ch
+            elif ch in '()*+#%':
+                self._state = _SKIP_ONE # Charset designation / DEC line attributes
+            else:
+                self._esc(ch)
+        elif state == _CSI:
+            if '\x40' <= ch <= '\x7e':
+                self._state = _GROUND
+                self._csi(self._seq, ch)
+            elif ch == '\x1b':
+                self._state = _ESC # Sequence aborted
+            elif ch < ' ':
+                self._control(ch)
+            else:
+                self._seq += ch
+        elif state == _STRING:
+            if ch == '\x07' or ch == '\x1b': # BEL or the ESC of ESC \\
+                self._string(self._seq)
+                self._state = _ESC if ch == '\x1b' else _GROUND
+            else:
+                self._seq += ch
+        elif state == _SKIP_ONE:
+            self._state = _GROUND
+
+    def _print(self, data: str, i: int, end: int):
+        while i < end:
+            if self._wrap_pending:
+                self._wrap_pending = False
+                if self.autowrap:
+                    self.x = 0
+                    self._linefeed()
+            row = self._grid[self.y]
+            n = min(self.cols - self.x, end - i)
+            row[self.x:self.x + n] = data[i:i + n]
+            self._dirty.add(self.y)
+            i += n
+            self.x += n
+            if self.x >= self.cols:
+                self.x = self.cols - 1
+                self._wrap_pending = self.autowrap
+
+    def _control(self, ch: str):
+        if ch == '\x1b':
+            self._state = _ESC
+        elif ch == '\r':
+            self.x = 0
+            self._wrap_pending = False
+        elif ch in '\n\x0b\x0c':
+            self._linefeed()
+        elif ch == '\b':
+            self.x = max(0, self.x - 1)
+            self._wrap_pending = False
+        elif ch == '\t':
+            self.x = min(self.cols - 1, (self.x // _TAB + 1) * _TAB)
+        # BEL, SO/SI and the rest have no effect on the text
+
+    def _esc(self, ch: str):
+        if ch == '7':
+            self._saved = (self.x, self.y)
+        elif ch == '8':
+            self.x, self.y = self._saved
+            self._wrap_pending = False
+        elif ch == 'D':
+            self._linefeed()
+        elif ch == 'E':
+            self.x = 0
+            self._linefeed()
+        elif ch == 'M':
+            if self.y == self.top:
+                self._scroll_down(1)
+            elif self.y > 0:
+                self.y -= 1
+        elif ch == 'c':
+            self._reset()
+
+    def _string(self, seq: str):
+        # OSC 0 / 2: window title; DCS, APC, PM and SOS strings are ignored.
+        if seq[:1] == ']':
+            kind, _, value = seq[1:].partition(';')
+            if kind in ('0', '2'):
+                self.title = value
+
+    def _reply(self, text: str):
+        if self.on_reply:
+            self.on_reply(text)
+
+    def _csi(self, seq: str, final: str):
+        private = seq[:1] in ('?', '>', '=', '<')
+        prefix = seq[0] if private else ''
+        body = seq[1:] if private else seq
+        params = []
+        for part in body.rstrip(' !"#$%&\'()*+,-./').split(';'):
+            part = part.split(':')[0]
+            params.append(int(part) if part.isdigit() else 0)
+        p0 = params[0] if params else 0
+        n = p0 or 1
+
+        if prefix and final not in 'hlc':
+            return
+        self._wrap_pending = False
+        if final == 'A':
+            self.y = max(self.top if self.y >= self.top else 0, self.y - n)
+        elif final == 'B' or final == 'e':
+            self.y = min(self.bottom if self.y <= self.bottom else self.rows - 1, self.y + n)
+        elif final == 'C' or final == 'a':
+            self.x = min(self.cols - 1, self.x + n)
+        elif final == 'D':
+            self.x = max(0, self.x - n)
+        elif final == 'E':
+            self.x, self.y = 0, min(self.rows - 1, self.y + n)
+        elif final == 'F':
+            self.x, self.y = 0, max(0, self.y - n)
+        elif final == 'G' or final == '`':
+            self.x = min(self.cols - 1, n - 1)
+        elif final == 'd':
+            self.y = min(self.rows - 1, n - 1)
+        elif final == 'H' or final == 'f':
+            row = params[0] if params else 0
+            col = params[1] if len(params) > 1 else 0
+            self.y = min(self.rows - 1, max(row, 1) - 1)
+            self.x = min(self.cols - 1, max(col, 1) - 1)
+        elif final == 'J':
+            self._erase_display(p0)
+        elif final == 'K':
+            self._erase_line(p0)
+        elif final == 'X':
+            self._grid[self.y][self.x:self.x + n] = [' '] * min(n, self.cols - self.x)
+            self._dirty.add(self.y)
+        elif final == 'P':
+            row = self._grid[self.y]
+            del row[self.x:self.x + n]
+            row.extend([' '] * (self.cols - len(row)))
+            self._dirty.add(self.y)
+        elif final == '@':
+            row = self._grid[self.y]
+            row[self.x:self.x] = [' '] * n
+            del row[self.cols:]
+            self._dirty.add(self.y)
+        elif final == 'L':
+            if self.top <= self.y <= self.bottom:
+                self._scroll_down(n, self.y)
+        elif final == 'M':
+            if self.top <= self.y <= self.bottom:
+                self._scroll_up(n, self.y)
+        elif final == 'S':
+            self._scroll_up(n)
+        elif final == 'T':
+            self._scroll_down(n)
+        elif final == 'r':
+            top = (params[0] if params else 0) or 1
+            bottom = (params[1] if len(params) > 1 else 0) or self.rows
+            if top < bottom <= self.rows:
+                self.top, self.bottom = top - 1, bottom - 1
+                self.x = self.y = 0
+        elif final == 's':
+            self._saved = (self.x, self.y)
+        elif final == 'u':
+            self.x, self.y = self._saved
+        elif final == 'n':
+            if p0 == 6:
+                self._reply(f"\x1b[{self.y + 1};{self.x + 1}R")
+            elif p0 == 5:
+                self._reply("\x1b[0n")
+        elif final == 'c':
+            if prefix == '':
+                self._reply("\x1b[?1;2c")
+        elif final in 'hl' and prefix == '?':
+            for mode in params:
+                self._set_mode(mode, final == 'h')
+
+    def _set_mode(self, mode: int, on: bool):
+        if mode == 25:
+            self.cursor_visible = on
+        elif mode == 7:
+            self.autowrap = on
+        elif mode in (47, 1047, 1049):
+            if mode == 1049 and on:
+                self._saved = (self.x, self.y)
+            if on and not self.alt_screen:
+                self._alt = [self._blank() for _ in range(self.rows)]
+                self._grid = self._alt
+            elif not on and self.alt_screen:
+                self._grid, self._alt = self._main, None
+            if mode == 1049 and not on:
+                self.x, self.y = self._saved
+            self._dirty.update(range(self.rows))
+
+    # --- Editing primitives ---
+
+    def _linefeed(self):
+        self._wrap_pending = False
+        if self.y == self.bottom:
+            self._scroll_up(1)
+        elif self.y < self.rows - 1:
+            self.y += 1
+
+    def _scroll_up(self, n: int, top: Optional[int] = None):
+        top = self.top if top is None else top
+        n = min(n, self.bottom - top + 1)
+        for _ in range(n):
+            line = self._grid.pop(top)
+            if top == 0 and not self.alt_screen:
+                self.scrollback.append(''.join(line).rstrip())
+            self._grid.insert(self.bottom, self._blank())
+        self._dirty.update(range(top, self.bottom + 1))
+
+    def _scroll_down(self, n: int, top: Optional[int] = None):
+        top = self.top if top is None else top
+        n = min(n, self.bottom - top + 1)
+        for _ in range(n):
+            self._grid.pop(self.bottom)
+            self._grid.insert(top, self._blank())
+        self._dirty.update(range(top, self.bottom + 1))
+
+    def _erase_line(self, mode: int, y: Optional[int] = None):
+        y = self.y if y is None else y
+        row = self._grid[y]
+        if mode == 0:
+            row[self.x:] = [' '] * (self.cols - self.x)
+        elif mode == 1:
+            row[:self.x + 1] = [' '] * (self.x + 1)
+        else:
+            row[:] = self._blank()
+        self._dirty.add(y)
+
+    def _erase_display(self, mode: int):
+        if mode == 0:
+            self._erase_line(0)
+            rows = range(self.y + 1, self.rows)
+        elif mode == 1:
+            self._erase_line(1)
+            rows = range(0, self.y)
+        else:
+            rows = range(self.rows)
+            if mode == 3:
+                self.scrollback.clear()
+        for y in rows:
+            self._grid[y] = self._blank()
+        self._dirty.update(rows)
+
+    def resize(self, cols: int, rows: int):
+        for grid in filter(None, (self._main, self._alt)):
+            for row in grid:
+                del row[cols:]
+                row.extend([' '] * (cols - len(row)))
+            # Shrinking drops rows from the top while the cursor would fall off, then from the bottom.
+            while len(grid) > rows:
+                if self.y > 0 and grid is self._grid:
+                    line = grid.pop(0)
+                    if grid is self._main:
+                        self.scrollback.append(''.join(line).rstrip())
+                    self.y -= 1
+                else:
+                    grid.pop()
+            while len(grid) < rows:
+                grid.append([' '] * cols)
+        self.cols, self.rows = cols, rows
+        self.top, self.bottom = 0, rows - 1
+        self.x = min(self.x, cols - 1)
+        self.y = min(self.y, rows - 1)
+        self._wrap_pending = False
+        self._dirty = set(range(rows))
@@ -1,45 +1,91 @@
-import sys
-import time
 import argparse
+import engine_events
 import engine_kanban
+import engine_board
+import engine_board_daemon
 
-def get_worker_tasks(project_id, worker_name):
+def get_worker_tasks(project_id, worker_name, mirror=None):
+    """In-progress tasks addressed to worker_name; with a BoardMirror this is an index lookup, no fetch."""
+    if mirror is not None:
+        return {task['id']: task['title'] for task in mirror.tasks_for(worker_name, 'inprogress')}
     tasks = engine_kanban.get_tasks(project_id)
     if tasks is None: return {}
-    worker_tasks = {}
+    index = engine_kanban.get_recipient_index()
+    by_id = {}
     for task in tasks:
-        recipient = engine_kanban.extract_recipient(task.get('description', ''))
-        if recipient and worker_name.lower() in recipient.lower():
-            if task.get('status') == 'inprogress':
-                worker_tasks[task['id']] = task['title']
-    return worker_tasks
+        index.update(task)
+        by_id[task['id']] = task
+    return {tid: by_id[tid]['title'] for tid in index.tasks_for(worker_name, 'inprogress') if tid in by_id}
 
-def run_control_worker(worker_name, project_name=None):
+def _run_shared(subscription, worker_name):
+    """Follows assignment deltas pushed by the board daemon. Returns False if the daemon went away."""
+    try:
+        for message in subscription:
+            if message['type'] == 'assigned':
+                print(f"New tasks for {worker_name}: {[message['task']['title']]}")
+            elif message['type'] == 'error':
+                print(f"Board daemon error: {message.get('message')}")
+                return False
+        return False
+    except (OSError, ValueError):
+        return False
+    finally:
+        subscription.close()
+
+def run_control_worker(worker_name, project_name=None, shared=False):
     cfg = engine_kanban.load_config()
     project_name = project_name or cfg.get('last_project')
     project_id = engine_kanban.resolve_project_id(project_name)
     interval = cfg.get('poll_interval', 1.0)
     
     print(f"Control Worker active for '{worker_name}' on project '{project_name}'...")
+
+    if shared:
+        subscription = engine_board_daemon.subscribe(project_id, worker_name)
+        if subscription is None:
+            print("No board daemon running, polling the board directly.")
+        else:
+            try:
+                if not _run_shared(subscription, worker_name):
+                    print("Lost connection to the board daemon, polling the board directly.")
+            except KeyboardInterrupt:
+                print("\nWorker stopped.")
+                return
     
-    known_assignments = get_worker_tasks(project_id, worker_name)
-    known_ids = set(known_assignments.keys())
-    
+    mirror = engine_board.BoardMirror(project_id, min_interval=interval, max_interval=cfg.get('max_poll_interval', 30.0))
+    mirror.sync()
+    known_ids = set(get_worker_tasks(project_id, worker_name, mirror))
+
+    def on_task(data):
+        task = data['task']
+        if data['project_id'] != project_id: return
+        if task['id'] in mirror.index.tasks_for(worker_name, 'inprogress'):
+            if task['id'] not in known_ids:
+                known_ids.add(task['id'])
+                print(f"New tasks for {worker_name}: {[task['title']]}")
+        else:
+            known_ids.discard(task['id'])
+
+    def on_removed(data):
+        if data['project_id'] == project_id:
+            known_ids.discard(data['task']['id'])
+
+    engine_events.subscribe("task_added", on_task)
+    engine_events.subscribe("task_changed", on_task)
+    engine_events.subscribe("task_removed", on_removed)
     try:
-        while True:
-            time.sleep(interval)
-            current_assignments = get_worker_tasks(project_id, worker_name)
-            current_ids = set(current_assignments.keys())
-            new_ids = current_ids - known_ids
-            if new_ids:
-                print(f"New tasks for {worker_name}: {[current_assignments[tid] for tid in new_ids]}")
-            known_ids = current_ids
+        mirror.run()
     except KeyboardInterrupt:
         print("\nWorker stopped.")
+    finally:
+        engine_events.unsubscribe("task_added", on_task)
+        engine_events.unsubscribe("task_changed", on_task)
+        engine_events.unsubscribe("task_removed", on_removed)
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Kanban Worker.")
     parser.add_argument("worker_name", help="Name of the worker")
     parser.add_argument("--project", help="Project name or ID")
+    parser.add_argument("--shared", action="store_true", help="Receive assignments from the shared board daemon (engine_board_daemon.py) instead of polling")
     args = parser.parse_args()
-    run_control_worker(args.worker_name, args.project)
+    run_control_worker(args.worker_name, args.project, shared=args.shared)
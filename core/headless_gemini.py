@@ -7,17 +7,55 @@ the Gemini CLI as a non-interactive, background worker. It is designed to take
 a specific prompt and execute it within a target workspace directory, capturing 
 output and enforcing timeouts.
 
+Long runs can be streamed: `AgentStream` yields output lines as they arrive,
+tees them to a log file and keeps only a bounded tail in memory.
+
 Usage:
     python core/headless_gemini.py -w /path/to/project -p "Implement feature X"
+    python core/headless_gemini.py -w /path/to/project -p "..." --stream --log run.log
 """
 
 import os
 import sys
+import time
+import queue
 import argparse
 import subprocess
 import shutil
+import signal
+import threading
+from collections import deque
 from pathlib import Path
-from typing import Tuple, Optional, Dict
+from typing import Tuple, Optional, Dict, List, Callable, Iterator
+
+def _build_command(prompt: str, model: str, auto_confirm: bool) -> Tuple[Optional[List[str]], str]:
+    """
+    Resolves the Gemini CLI and builds its argument list.
+
+    Returns:
+        (command_list, "") on success or (None, error_message) if the CLI is missing.
+    """
+    # Resolve absolute path to avoid Windows issues
+    gemini_path = shutil.which("gemini")
+
+    if not gemini_path:
+        # Fallback check for Windows npm roaming path
+        alt_path = Path(os.environ.get("APPDATA", "")) / "npm" / "gemini.cmd"
+        if alt_path.exists():
+            gemini_path = str(alt_path)
+        else:
+            return None, "Error: 'gemini' command not found. Ensure the Gemini CLI is installed and in your PATH."
+
+    # Build the command
+    cmd = [gemini_path]
+    if auto_confirm:
+        cmd.append("-y")
+    if model:
+        cmd.extend(["--model", model])
+
+    # Ensure string limit safety by passing the prompt cleanly
+    cmd.extend(["-p", prompt.strip()])
+    return cmd, ""
 
 def invoke_agent(
     workspace_path: Path, 
@@ -45,27 +83,9 @@ def invoke_agent(
         err = f"Error: Workspace path does not exist or is not a directory: {workspace_path}"
         return False, "", err
 
-    # Resolve absolute path to avoid Windows issues
-    gemini_path = shutil.which("gemini")
-    
-    if not gemini_path:
-        # Fallback check for Windows npm roaming path
-        alt_path = Path(os.environ.get("APPDATA", "")) / "npm" / "gemini.cmd"
-        if alt_path.exists():
-            gemini_path = str(alt_path)
-        else:
-            err = "Error: 'gemini' command not found. Ensure the Gemini CLI is installed and in your PATH."
-            return False, "", err
-
-    # Build the command
-    cmd = [gemini_path]
-    if auto_confirm:
-        cmd.append("-y")
-    if model:
-        cmd.extend(["--model", model])
-        
-    # Ensure string limit safety by passing the prompt cleanly
-    cmd.extend(["-p", prompt.strip()])
+    cmd, err = _build_command(prompt, model, auto_confirm)
+    if cmd is None:
+        return False, "", err
 
     # Prepare environment
     run_env = os.environ.copy()
@@ -74,7 +94,7 @@ def invoke_agent(
 
     try:
         # We use shell=True on Windows for .cmd files if needed
-        use_shell = os.name == 'nt' and gemini_path.lower().endswith('.cmd')
+        use_shell = os.name == 'nt' and cmd[0].lower().endswith('.cmd')
         
         result = subprocess.run(
             cmd, 
@@ -99,6 +119,200 @@ def invoke_agent(
     except Exception as e:
         return False, "", f"Agent Execution Error: {str(e)}"
 
+KILL_DRAIN = 1.0 # Seconds of output still read after the agent was killed
+
+# Popen arguments that start the agent in its own process group (console process group on
+# Windows), so kill_process_tree can take down the CLI together with everything it spawned.
+if os.name == 'nt':
+    PROCESS_GROUP = {'creationflags': subprocess.CREATE_NEW_PROCESS_GROUP}
+else:
+    PROCESS_GROUP = {'start_new_session': True}
+
+def kill_process_tree(pid: int, sig: int = None) -> bool:
+    """
+    Sends sig (default SIGKILL) to the process group of pid, started with PROCESS_GROUP.
+    Windows has no signals: the tree is always force-killed. False if the group is gone.
+    """
+    if os.name == 'nt':
+        return subprocess.run(['taskkill', '/T', '/F', '/PID', str(pid)], capture_output=True).returncode == 0
+    try:
+        os.killpg(pid, signal.SIGKILL if sig is None else sig)
+    except ProcessLookupError:
+        return False
+    return True
+
+class AgentStream:
+    """
+    Runs the Gemini CLI and yields its output while it runs.
+
+    Iterating yields (stream_name, line) tuples, where stream_name is
+    'stdout' or 'stderr', as soon as each line is printed. Every line is
+    appended to `log_path` if given, and only the last `tail_lines` lines of
+    each stream are kept in memory. After iteration, `returncode`,
+    `timed_out` and `stopped` describe how the run ended.
+
+    Example:
+        stream = AgentStream(workspace, "Fix the bug", log_path=Path("agent.log"))
+        for name, line in stream:
+            if "DONE_CODING" in line:
+                stream.stop()
+    """
+
+    def __init__(
+        self,
+        workspace_path: Path,
+        prompt: str,
+        model: str = "gemini-3-flash-preview",
+        auto_confirm: bool = True,
+        timeout: Optional[int] = 900,
+        env: Optional[Dict[str, str]] = None,
+        log_path: Optional[Path] = None,
+        tail_lines: int = 200
+    ):
+        self.workspace_path = workspace_path
+        self.prompt = prompt
+        self.model = model
+        self.auto_confirm = auto_confirm
+        self.timeout = timeout
+        self.env = env
+        self.log_path = log_path
+        self.stdout_tail = deque(maxlen=tail_lines)
+        self.stderr_tail = deque(maxlen=tail_lines)
+        self.returncode: Optional[int] = None
+        self.timed_out = False
+        self.stopped = False
+        self.error = ""
+        self._process: Optional[subprocess.Popen] = None
+        self._drain_until: Optional[float] = None # Set once the agent is killed
+
+    def _pump(self, pipe, name: str, lines: queue.Queue):
+        try:
+            for line in iter(pipe.readline, ''):
+                lines.put((name, line))
+        finally:
+            pipe.close()
+            lines.put((name, None))
+
+    def _kill(self):
+        # The CLI runs in its own process group: kill the group, so no grandchild keeps the pipes open.
+        # Output still buffered is drained for KILL_DRAIN seconds at most.
+        if self._drain_until is None:
+            self._drain_until = time.monotonic() + KILL_DRAIN
+        if self._process is None or self._process.poll() is not None:
+            return
+        kill_process_tree(self._process.pid)
+
+    def stop(self):
+        """Terminates the agent early (e.g. once a completion marker was seen)."""
+        self.stopped = True
+        self._kill()
+
+    def __iter__(self) -> Iterator[Tuple[str, str]]:
+        if not self.workspace_path.exists() or not self.workspace_path.is_dir():
+            self.error = f"Error: Workspace path does not exist or is not a directory: {self.workspace_path}"
+            return
+        cmd, self.error = _build_command(self.prompt, self.model, self.auto_confirm)
+        if cmd is None:
+            return
+
+        run_env = os.environ.copy()
+        if self.env:
+            run_env.update(self.env)
+
+        try:
+            self._process = subprocess.Popen(
+                cmd,
+                cwd=str(self.workspace_path),
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+                encoding='utf-8',
+                errors='replace',
+                bufsize=1,
+                env=run_env,
+                shell=os.name == 'nt' and cmd[0].lower().endswith('.cmd'),
+                **PROCESS_GROUP
+            )
+        except Exception as e:
+            self.error = f"Agent Execution Error: {str(e)}"
+            return
+
+        lines: queue.Queue = queue.Queue()
+        for pipe, name in ((self._process.stdout, 'stdout'), (self._process.stderr, 'stderr')):
+            threading.Thread(target=self._pump, args=(pipe, name, lines), daemon=True).start()
+
+        deadline = time.monotonic() + self.timeout if self.timeout else None
+        log = open(self.log_path, 'a', encoding='utf-8') if self.log_path else None
+        open_streams = 2
+        try:
+            while open_streams:
+                if self._drain_until is not None:
+                    deadline = self._drain_until
+                    if time.monotonic() >= deadline:
+                        break # Killed; stop waiting for pipes a stray process may still hold
+                remaining = deadline - time.monotonic() if deadline else None
+                if remaining is not None and remaining <= 0:
+                    self.timed_out = True
+                    self._kill()
+                    continue
+                try:
+                    name, line = lines.get(timeout=remaining)
+                except queue.Empty:
+                    continue
+                if line is None:
+                    open_streams -= 1
+                    continue
+                (self.stdout_tail if name == 'stdout' else self.stderr_tail).append(line)
+                if log:
+                    log.write(line)
+                    log.flush()
+                yield name, line
+        finally:
+            if log:
+                log.close()
+            if self._process.poll() is None:
+                self._kill()
+            self.returncode = self._process.wait()
+
+    @property
+    def succeeded(self) -> bool:
+        return self.stopped or (self.returncode == 0 and not self.timed_out)
+
+def invoke_agent_streaming(
+    workspace_path: Path,
+    prompt: str,
+    model: str = "gemini-3-flash-preview",
+    auto_confirm: bool = True,
+    timeout: Optional[int] = 900,
+    env: Optional[Dict[str, str]] = None,
+    log_path: Optional[Path] = None,
+    tail_lines: int = 200,
+    on_line: Optional[Callable[[str, str], bool]] = None
+) -> Tuple[bool, str, str]:
+    """
+    Streaming counterpart of invoke_agent.
+
+    Args:
+        log_path: File every output line is appended to as it arrives.
+        tail_lines: Number of trailing lines per stream kept for the return value.
+        on_line: Called with (stream_name, line) for each line; returning True
+                 stops the agent early and counts the run as successful.
+
+    Returns:
+        (success_boolean, stdout_tail, stderr_tail)
+    """
+    stream = AgentStream(workspace_path, prompt, model, auto_confirm, timeout, env, log_path, tail_lines)
+    for name, line in stream:
+        if on_line and on_line(name, line):
+            stream.stop()
+
+    stderr = "".join(stream.stderr_tail)
+    if stream.error:
+        return False, "", stream.error
+    if stream.timed_out:
+        stderr = f"Agent execution timed out after {timeout} seconds.\n{stderr}"
+    return stream.succeeded, "".join(stream.stdout_tail), stderr
+
 def main():
     parser = argparse.ArgumentParser(description="Run Gemini CLI as a headless worker.")
     parser.add_argument("-w", "--workspace", required=True, type=str, help="Target workspace directory.")
@@ -106,6 +320,8 @@ def main():
     parser.add_argument("-m", "--model", type=str, default="gemini-3-flash-preview", help="Model to use.")
     parser.add_argument("--no-confirm", action="store_true", help="Disable the auto-confirm (-y) flag.")
     parser.add_argument("-t", "--timeout", type=int, default=900, help="Timeout in seconds (default 900).")
+    parser.add_argument("--stream", action="store_true", help="Print agent output live instead of after it exits.")
+    parser.add_argument("--log", type=str, help="Append streamed output to this file.")
 
     args = parser.parse_args()
     
@@ -115,18 +331,33 @@ def main():
     print(f"Model:     {args.model}")
     print(f"Prompt:    {args.prompt[:100]}{'...' if len(args.prompt) > 100 else ''}\n", flush=True)
 
-    success, stdout, stderr = invoke_agent(
-        workspace_path=workspace, 
-        prompt=args.prompt, 
-        model=args.model, 
-        auto_confirm=not args.no_confirm,
-        timeout=args.timeout
-    )
-    
-    if stdout:
-        print("\n--- STDOUT ---\n" + stdout)
-    if stderr:
-        print("\n--- STDERR ---\n" + stderr, file=sys.stderr)
+    if args.stream:
+        def echo(name, line):
+            print(line, end="", file=sys.stderr if name == 'stderr' else sys.stdout, flush=True)
+        success, _, stderr = invoke_agent_streaming(
+            workspace_path=workspace,
+            prompt=args.prompt,
+            model=args.model,
+            auto_confirm=not args.no_confirm,
+            timeout=args.timeout,
+            log_path=Path(args.log) if args.log else None,
+            on_line=echo
+        )
+        if not success and stderr:
+            print("\n--- STDERR (tail) ---\n" + stderr, file=sys.stderr)
+    else:
+        success, stdout, stderr = invoke_agent(
+            workspace_path=workspace,
+            prompt=args.prompt,
+            model=args.model,
+            auto_confirm=not args.no_confirm,
+            timeout=args.timeout
+        )
+
+        if stdout:
+            print("\n--- STDOUT ---\n" + stdout)
+        if stderr:
+            print("\n--- STDERR ---\n" + stderr, file=sys.stderr)
 
     if success:
         print(f"\n--- Agent Finished Successfully ---")
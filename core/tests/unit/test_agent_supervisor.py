@@ -0,0 +1,101 @@
+import unittest
+import sys
+import os
+import time
+import asyncio
+import tempfile
+import shutil
+from pathlib import Path
+
+# Add core to sys.path (core modules import each other by bare name)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+import agent_supervisor
+from agent_supervisor import AgentSupervisor
+
+def python(code):
+    return [sys.executable, "-c", code]
+
+@unittest.skipIf(os.name == 'nt', "uses POSIX process groups")
+class TestAgentSupervisorUnit(unittest.TestCase):
+    def setUp(self):
+        self.workspace = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        shutil.rmtree(self.workspace)
+
+    def test_runs_and_captures_output(self):
+        async def scenario():
+            supervisor = AgentSupervisor()
+            ok = supervisor.spawn(python("print('hello'); import sys; print('oops', file=sys.stderr)"), self.workspace)
+            bad = supervisor.spawn(python("raise SystemExit(3)"), self.workspace)
+            return await ok.wait(), await bad.wait()
+        ok, bad = asyncio.run(scenario())
+        self.assertEqual(ok.status, agent_supervisor.SUCCEEDED)
+        self.assertEqual(list(ok.stdout_tail), ["hello\n"])
+        self.assertEqual(list(ok.stderr_tail), ["oops\n"])
+        self.assertEqual((bad.status, bad.returncode), (agent_supervisor.FAILED, 3))
+
+    def test_per_model_limit(self):
+        """Two runs of a model capped at 1 never overlap; another model runs alongside."""
+        async def scenario():
+            supervisor = AgentSupervisor(max_concurrent=4, model_limits={"pro": 1})
+            sleep = python("import time; time.sleep(0.5)")
+            runs = [supervisor.spawn(sleep, self.workspace, model=m) for m in ("pro", "pro", "flash")]
+            return await asyncio.gather(*(r.wait() for r in runs))
+        first, second, other = asyncio.run(scenario())
+        self.assertGreaterEqual(second.started_at, first.finished_at - 0.05)
+        self.assertLess(other.started_at, first.finished_at)
+
+    def test_wall_and_idle_timeouts_kill_process_tree(self):
+        pid_file = self.workspace / "grandchild.pid"
+        # The CLI spawns a grandchild that would outlive a plain kill of the leader.
+        tree = python(
+            "import subprocess, sys, time\n"
+            f"p = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(60)'])\n"
+            f"open({str(pid_file)!r}, 'w').write(str(p.pid))\n"
+            "while True:\n    print('tick', flush=True); time.sleep(0.1)\n"
+        )
+        async def scenario():
+            supervisor = AgentSupervisor(kill_grace=1)
+            wall = supervisor.spawn(tree, self.workspace, wall_timeout=1)
+            idle = supervisor.spawn(python("import time; time.sleep(60)"), self.workspace, idle_timeout=0.5)
+            return await wall.wait(), await idle.wait()
+        started = time.monotonic()
+        wall, idle = asyncio.run(scenario())
+        self.assertLess(time.monotonic() - started, 10)
+        self.assertEqual(wall.status, agent_supervisor.TIMED_OUT)
+        self.assertEqual(idle.status, agent_supervisor.IDLE_TIMEOUT)
+        grandchild = int(pid_file.read_text())
+        time.sleep(0.2)
+        self.assertFalse(self._alive(grandchild))
+
+    def _alive(self, pid):
+        # A killed orphan may linger as a zombie until init reaps it.
+        if os.path.isdir("/proc"):
+            try:
+                with open(f"/proc/{pid}/stat") as f:
+                    return f.read().rsplit(')', 1)[1].split()[0] != 'Z'
+            except FileNotFoundError:
+                return False
+        try:
+            os.kill(pid, 0)
+            return True
+        except ProcessLookupError:
+            return False
+
+    def test_cancel_running_and_queued(self):
+        async def scenario():
+            supervisor = AgentSupervisor(max_concurrent=1)
+            running = supervisor.spawn(python("import time; time.sleep(60)"), self.workspace)
+            queued = supervisor.spawn(python("print('never')"), self.workspace)
+            await asyncio.sleep(0.3)
+            await supervisor.shutdown()
+            return running, queued
+        running, queued = asyncio.run(scenario())
+        self.assertEqual(running.status, agent_supervisor.CANCELLED)
+        self.assertIsNotNone(running.returncode)
+        self.assertEqual(queued.status, agent_supervisor.CANCELLED)
+        self.assertIsNone(queued.pid)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,142 @@
+import unittest
+import sys
+import os
+import json
+import shutil
+import tempfile
+import threading
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+# Add core to sys.path (core modules import each other by bare name)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+import engine_events
+import engine_kanban
+import engine_worker
+from engine_board import BoardMirror
+
+TASK_COUNT = 10000
+
+class MockBoard(BaseHTTPRequestHandler):
+    """Serves GET /api/tasks for one project, honoring updated_since when `delta` is set."""
+    protocol_version = "HTTP/1.1"
+    def log_message(self, *args): pass
+
+    def do_GET(self):
+        query = urllib.parse.parse_qs(urllib.parse.urlparse(self.path).query)
+        since = query.get('updated_since', [None])[0]
+        board = self.server.board
+        with board.lock:
+            tasks = list(board.tasks.values())
+        if since and board.delta:
+            tasks = [t for t in tasks if t['updated_at'] > since]
+        payload = json.dumps({"success": True, "data": tasks}).encode()
+        board.bytes_sent.append(len(payload))
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+class Board:
+    def __init__(self, count, delta=True):
+        self.lock = threading.Lock()
+        self.delta = delta
+        self.clock = 0
+        self.bytes_sent = []
+        self.tasks = {}
+        for i in range(count):
+            self.put({"id": f"t{i}", "title": f"Task {i}", "status": "todo",
+                      "description": f"Recipient: worker{i % 50}"})
+
+    def put(self, task):
+        with self.lock:
+            self.clock += 1
+            task = dict(task, updated_at=f"2026-01-01T00:00:{self.clock:012d}")
+            self.tasks[task['id']] = task
+
+class TestBoardMirrorUnit(unittest.TestCase):
+    def setUp(self):
+        self.events = []
+        for kind in ("task_added", "task_changed", "task_removed"):
+            handler = lambda data, kind=kind: self.events.append((kind, data['task']['id']))
+            engine_events.subscribe(kind, handler)
+            self.addCleanup(engine_events.unsubscribe, kind, handler)
+
+    def _serve(self, board):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), MockBoard)
+        server.board = board
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        test_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, test_dir)
+        config_path = os.path.join(test_dir, "config.json")
+        with open(config_path, "w") as f:
+            json.dump({"kanban": {"ip": "127.0.0.1", "port": server.server_address[1]}}, f)
+        patcher = patch('utils_ui.get_config_path', return_value=config_path)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        client = engine_kanban.KanbanClient()
+        self.addCleanup(client.close)
+        patcher = patch('engine_kanban.get_client', return_value=client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _kinds(self):
+        return [kind for kind, _ in self.events]
+
+    def test_delta_sync_against_10k_tasks(self):
+        board = Board(TASK_COUNT)
+        self._serve(board)
+        mirror = BoardMirror("p1", full_sync_interval=3600)
+
+        self.assertEqual(mirror.sync(), TASK_COUNT)
+        self.assertEqual(self._kinds(), ["task_added"] * TASK_COUNT)
+        full_size = board.bytes_sent[-1]
+
+        self.events.clear()
+        for _ in range(20):
+            self.assertEqual(mirror.sync(), 0)
+        self.assertTrue(mirror.delta_supported)
+        self.assertLess(max(board.bytes_sent[-20:]), 100)
+
+        board.put(dict(board.tasks["t42"], status="inprogress"))
+        board.put({"id": "new", "title": "New", "status": "todo", "description": ""})
+        self.assertEqual(mirror.sync(), 2)
+        self.assertEqual(sorted(self.events), [("task_added", "new"), ("task_changed", "t42")])
+        self.assertEqual(mirror.tasks["t42"]["status"], "inprogress")
+        self.assertEqual(engine_worker.get_worker_tasks("p1", "Worker42", mirror), {"t42": "Task 42"})
+        self.assertEqual(len(mirror.tasks_for("worker42")), TASK_COUNT // 50)
+        self.assertLess(board.bytes_sent[-1], full_size / 1000)
+
+        # Deletions only show up in a full resync.
+        self.events.clear()
+        with board.lock:
+            del board.tasks["t7"]
+        self.assertEqual(mirror.sync(), 0)
+        self.assertEqual(mirror.sync(full=True), 1)
+        self.assertEqual(self.events, [("task_removed", "t7")])
+        self.assertEqual(len(mirror.tasks), TASK_COUNT)
+
+    def test_server_without_delta_support(self):
+        board = Board(TASK_COUNT, delta=False)
+        self._serve(board)
+        mirror = BoardMirror("p1")
+        mirror.sync()
+        self.events.clear()
+        board.put(dict(board.tasks["t1"], title="Renamed"))
+        with board.lock:
+            del board.tasks["t2"]
+        self.assertEqual(mirror.sync(), 2)
+        self.assertFalse(mirror.delta_supported)
+        self.assertEqual(sorted(self.events), [("task_changed", "t1"), ("task_removed", "t2")])
+
+    def test_adaptive_interval(self):
+        mirror = BoardMirror("p1", min_interval=1, max_interval=8, fetch=lambda *a, **k: [])
+        self.assertEqual([mirror._next_interval(0) for _ in range(5)], [2, 4, 8, 8, 8])
+        self.assertEqual(mirror._next_interval(3), 1)
+        self.assertEqual(mirror._next_interval(None), 2)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,126 @@
+import unittest
+import sys
+import os
+import json
+import socket
+import shutil
+import tempfile
+import threading
+import time
+
+# Add core to sys.path (core modules import each other by bare name)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+import engine_board
+import engine_board_daemon
+
+class TestBoardDaemonUnit(unittest.TestCase):
+    def setUp(self):
+        self.lock = threading.Lock()
+        self.clock = 0
+        self.fetches = []
+        self.tasks = {}
+        for i in range(100):
+            self._put(f"t{i}", f"worker{i % 10}", "inprogress" if i < 10 else "todo")
+
+        def fetch(project_id, updated_since=None):
+            with self.lock:
+                self.fetches.append(project_id)
+                return [t for t in self.tasks.values() if not updated_since or t['updated_at'] > updated_since]
+        factory = lambda pid: engine_board.BoardMirror(pid, min_interval=0.02, max_interval=0.02, fetch=fetch)
+
+        self.test_dir = tempfile.mkdtemp()
+        if hasattr(socket, 'AF_UNIX'):
+            address = os.path.join(self.test_dir, "board.sock")
+        else:
+            address = ("127.0.0.1", 0)
+        self.daemon = engine_board_daemon.BoardDaemon(address=address, mirror_factory=factory).start()
+
+    def tearDown(self):
+        self.daemon.stop()
+        shutil.rmtree(self.test_dir)
+
+    def _put(self, tid, recipient, status, title=None):
+        with self.lock:
+            self.clock += 1
+            self.tasks[tid] = {"id": tid, "title": title or f"Task {tid}", "status": status,
+                               "description": f"Recipient: {recipient}", "updated_at": f"{self.clock:012d}"}
+
+    def _read(self, sub, timeout=5):
+        sub.sock.settimeout(timeout)
+        return json.loads(sub._file.readline())
+
+    def test_one_poller_fans_out_to_many_workers(self):
+        subs = [engine_board_daemon.subscribe("p1", f"worker{i}", self.daemon.address) for i in range(10)]
+        for i, sub in enumerate(subs):
+            self.assertEqual(self._read(sub), {"type": "snapshot", "tasks": {f"t{i}": f"Task t{i}"}})
+        self.assertEqual(len(self.daemon._mirrors), 1)
+
+        self._put("t13", "worker3", "inprogress") # Newly assigned to worker3
+        self._put("t3", "worker3", "done") # Finished
+        messages = [self._read(subs[3]), self._read(subs[3])]
+        self.assertIn({"type": "unassigned", "task_id": "t3"}, messages)
+        self.assertIn("t13", [m["task"]["id"] for m in messages if m["type"] == "assigned"])
+
+        # Polling rate is independent of the number of workers.
+        with self.lock:
+            self.fetches.clear()
+        time.sleep(0.3)
+        with self.lock:
+            polls = len(self.fetches)
+        self.assertLessEqual(polls, 0.3 / 0.02 + 2)
+
+        for sub in subs:
+            sub.close()
+        deadline = time.monotonic() + 5
+        while self.daemon._mirrors and time.monotonic() < deadline:
+            time.sleep(0.02)
+        self.assertEqual(self.daemon._mirrors, {})
+
+    def test_stalled_worker_is_dropped_without_blocking_others(self):
+        self.daemon.send_queue_size = 4
+        stalled = engine_board_daemon.subscribe("p1", "worker1", self.daemon.address) # Never reads
+        active = engine_board_daemon.subscribe("p1", "worker2", self.daemon.address)
+        self._read(active)
+        big = "x" * 100_000 # A few of these fill the socket buffer
+        deadline = time.monotonic() + 10
+        dropped = False
+        n = 0
+        while not dropped and time.monotonic() < deadline:
+            self._put("t1", "worker1", "inprogress" if n % 2 else "todo", title=f"{big}{n}")
+            n += 1
+            time.sleep(0.03)
+            with self.daemon._lock:
+                dropped = not any(s.worker == "worker1" for s in self.daemon._subscribers.get("p1", []))
+        self.assertTrue(dropped)
+
+        # The other worker still gets its changes, and new workers can subscribe.
+        self._put("t22", "worker2", "inprogress")
+        self.assertEqual(self._read(active)["task"]["id"], "t22")
+        late = engine_board_daemon.subscribe("p1", "worker5", self.daemon.address)
+        self.assertEqual(self._read(late), {"type": "snapshot", "tasks": {"t5": "Task t5"}})
+        for sub in (stalled, active, late):
+            sub.close()
+
+    def test_first_sync_runs_outside_the_lock(self):
+        gate = threading.Event()
+        def slow_fetch(project_id, updated_since=None):
+            gate.wait(5)
+            return []
+        fast_factory = self.daemon._mirror_factory
+        self.daemon._mirror_factory = lambda pid: (engine_board.BoardMirror(pid, min_interval=0.02, max_interval=0.02, fetch=slow_fetch)
+                                                  if pid == "slow" else fast_factory(pid))
+        slow = engine_board_daemon.subscribe("slow", "worker0", self.daemon.address)
+        time.sleep(0.1) # Its first sync is now blocked
+        fast = engine_board_daemon.subscribe("p1", "worker0", self.daemon.address)
+        self.assertEqual(self._read(fast, timeout=2)["type"], "snapshot")
+        gate.set()
+        self.assertEqual(self._read(slow), {"type": "snapshot", "tasks": {}})
+        for sub in (slow, fast):
+            sub.close()
+
+    def test_no_daemon_returns_none(self):
+        missing = os.path.join(self.test_dir, "missing.sock") if hasattr(socket, 'AF_UNIX') else ("127.0.0.1", 1)
+        self.assertIsNone(engine_board_daemon.subscribe("p1", "worker0", missing))
+
+if __name__ == "__main__":
+    unittest.main()
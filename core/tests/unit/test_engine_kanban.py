@@ -0,0 +1,179 @@
+import unittest
+import sys
+import os
+import gzip
+import json
+import shutil
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+# Add core to sys.path (core modules import each other by bare name)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+import engine_kanban
+from engine_kanban import KanbanClient, KanbanAPIError, KanbanHTTPError, KanbanConnectionError
+
+class FakeKanban(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1" # Keep-alive
+    connections = set()
+    failures = []
+    def log_message(self, *args): pass
+
+    def _reply(self, status, body, gzipped=False):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        if gzipped:
+            payload = gzip.compress(payload)
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        FakeKanban.connections.add(self.client_address)
+        if self.path == "/api/flaky" and FakeKanban.failures:
+            return self._reply(FakeKanban.failures.pop(), {"success": False})
+        if self.path == "/api/broken":
+            return self._reply(200, {"success": False, "message": "no such project"})
+        gz = "gzip" in self.headers.get("Accept-Encoding", "")
+        self._reply(200, {"success": True, "data": {"path": self.path}}, gzipped=gz)
+
+    def do_PUT(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self._reply(200, {"success": True, "data": body})
+
+class TestKanbanClientUnit(unittest.TestCase):
+    def setUp(self):
+        FakeKanban.connections = set()
+        FakeKanban.failures = []
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), FakeKanban)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.test_dir = tempfile.mkdtemp()
+        self.config_path = os.path.join(self.test_dir, "config.json")
+        self._write_config(self.server.server_address[1])
+        patcher = patch('utils_ui.get_config_path', return_value=self.config_path)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.client = KanbanClient(timeout=2, backoff=0.01)
+
+    def tearDown(self):
+        self.client.close()
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.test_dir)
+
+    def _write_config(self, port):
+        with open(self.config_path, "w") as f:
+            json.dump({"kanban": {"ip": "127.0.0.1", "port": port}}, f)
+
+    def test_keep_alive_and_gzip(self):
+        for i in range(20):
+            self.assertEqual(self.client.request(f"tasks?n={i}"), {"path": f"/api/tasks?n={i}"})
+        self.assertEqual(self.client.request("tasks/1", method="PUT", data={"status": "done"}), {"status": "done"})
+        self.assertEqual(len(FakeKanban.connections), 1)
+
+    def test_retries_transient_errors(self):
+        FakeKanban.failures = [503, 502]
+        self.assertEqual(self.client.request("flaky"), {"path": "/api/flaky"})
+        FakeKanban.failures = [503, 503, 503]
+        with self.assertRaises(KanbanHTTPError) as ctx:
+            self.client.request("flaky")
+        self.assertEqual(ctx.exception.status, 503)
+
+    def test_typed_errors_and_compat_wrapper(self):
+        with self.assertRaises(KanbanAPIError):
+            self.client.request("broken")
+        with patch('engine_kanban.get_client', return_value=self.client):
+            self.assertIsNone(engine_kanban.api_request("broken"))
+            self.assertEqual(engine_kanban.api_request("projects"), {"path": "/api/projects"})
+
+    def test_config_reloaded_on_change(self):
+        self.client.request("projects")
+        port = self.server.server_address[1]
+        self._write_config(1) # Nothing listens on port 1
+        with self.assertRaises(KanbanConnectionError):
+            self.client.request("projects")
+        self._write_config(port)
+        self.assertEqual(self.client.request("projects"), {"path": "/api/projects"})
+
+class TestRecipientIndexUnit(unittest.TestCase):
+    def _task(self, tid, recipient, status="inprogress", updated="1"):
+        return {"id": tid, "title": f"Task {tid}", "status": status, "updated_at": updated,
+                "description": f"Some text\n- Recipient: {recipient}\nMore"}
+
+    def test_parses_only_changed_tasks(self):
+        index = engine_kanban.RecipientIndex()
+        tasks = [self._task(f"t{i}", f"Worker {i % 3}") for i in range(30)]
+        with patch('engine_kanban.extract_recipient', wraps=engine_kanban.extract_recipient) as parse:
+            for _ in range(5):
+                for task in tasks:
+                    index.update(task)
+            self.assertEqual(parse.call_count, 30)
+            index.update(self._task("t0", "Worker 2", updated="2"))
+            self.assertEqual(parse.call_count, 31)
+        self.assertEqual(index.tasks_for("worker 2", "inprogress"), {f"t{i}" for i in range(30) if i % 3 == 2} | {"t0"})
+
+    def test_substring_match_status_and_removal(self):
+        index = engine_kanban.RecipientIndex()
+        index.update(self._task("a", "Coder-Alpha"))
+        index.update(self._task("b", "coder-beta", status="todo"))
+        index.update(self._task("c", "Reviewer"))
+        self.assertEqual(index.tasks_for("CODER"), {"a", "b"})
+        self.assertEqual(index.tasks_for("coder", "inprogress"), {"a"})
+        index.update(self._task("b", "coder-beta", status="inprogress", updated="2"))
+        self.assertEqual(index.tasks_for("coder", "inprogress"), {"a", "b"})
+        index.remove("a")
+        self.assertEqual(index.tasks_for("coder", "inprogress"), {"b"})
+        self.assertTrue(index.is_for(self._task("c", "Reviewer"), "review"))
+        self.assertFalse(index.is_for(self._task("c", "Reviewer"), "coder"))
+
+    def test_format_task_highlight(self):
+        task = self._task("a", "Coder-Alpha")
+        with patch('engine_kanban.load_config', return_value={"colors": {"green": "<G>", "reset": "</G>"}}):
+            self.assertIn("<G>", engine_kanban.format_task(task, highlight_user="alpha"))
+            self.assertNotIn("<G>", engine_kanban.format_task(task, highlight_user="beta"))
+
+class TestResolveProjectUnit(unittest.TestCase):
+    PROJECTS = [{"id": "p-1", "name": "alpha"}, {"id": "p-2", "name": "beta"}]
+
+    def setUp(self):
+        engine_kanban.invalidate_projects()
+        self.fetches = 0
+        def list_projects():
+            self.fetches += 1
+            return self.PROJECTS
+        self.saved = []
+        self.config = {"last_project": "alpha"}
+        for name, fake in (('list_projects', list_projects),
+                           ('load_config', lambda: dict(self.config)),
+                           ('save_config', self.saved.append)):
+            patcher = patch(f'engine_kanban.{name}', side_effect=fake)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_cached_and_saves_only_changes(self):
+        for _ in range(50):
+            self.assertEqual(engine_kanban.resolve_project_id("alpha"), "p-1")
+        self.assertEqual(engine_kanban.resolve_project_id("p-2"), "p-2")
+        self.assertEqual(self.fetches, 1)
+        self.assertEqual(self.saved, [{"last_project": "beta"}])
+
+    def test_invalidated_by_project_events(self):
+        engine_kanban.resolve_project_id("alpha")
+        engine_kanban.engine_events.emit("project_added", {"name": "gamma"})
+        engine_kanban.resolve_project_id("alpha")
+        engine_kanban.engine_events.emit("project_deleted", "gamma")
+        engine_kanban.resolve_project_id("alpha")
+        self.assertEqual(self.fetches, 3)
+
+    def test_unknown_name_refetches_at_most_periodically(self):
+        self.assertEqual(engine_kanban.resolve_project_id("gamma"), "gamma")
+        self.assertEqual(engine_kanban.resolve_project_id("gamma"), "gamma")
+        self.assertEqual(self.fetches, 1)
+        with patch('engine_kanban.time.monotonic', return_value=engine_kanban._projects_loaded_at + engine_kanban.PROJECT_MISS_REFRESH):
+            engine_kanban.resolve_project_id("gamma")
+        self.assertEqual(self.fetches, 2)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+import unittest
+import sys
+import os
+import json
+import shutil
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+# Add core to sys.path (core modules import each other by bare name)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+import engine_events
+import engine_kanban
+from engine_kanban import KanbanClient
+from engine_outbox import Outbox
+
+class FakeKanban(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    puts = [] # (task id, body) accepted
+    failures = [] # Statuses to answer with before accepting
+    gate = None # Event the handler waits on before answering
+    def log_message(self, *args): pass
+
+    def do_PUT(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        if FakeKanban.gate is not None:
+            FakeKanban.gate.wait(5)
+        if FakeKanban.failures:
+            status, result = FakeKanban.failures.pop(0), {"success": False, "message": "nope"}
+        else:
+            FakeKanban.puts.append((self.path.rsplit("/", 1)[-1], body))
+            status, result = 200, {"success": True, "data": body}
+        payload = json.dumps(result).encode()
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+class TestOutboxUnit(unittest.TestCase):
+    def setUp(self):
+        FakeKanban.puts, FakeKanban.failures, FakeKanban.gate = [], [], None
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), FakeKanban)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.test_dir = tempfile.mkdtemp()
+        config_path = os.path.join(self.test_dir, "config.json")
+        with open(config_path, "w") as f:
+            json.dump({"kanban": {"ip": "127.0.0.1", "port": self.server.server_address[1]}}, f)
+        patcher = patch('utils_ui.get_config_path', return_value=config_path)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.client = KanbanClient(timeout=2, retries=0)
+        self.db_path = os.path.join(self.test_dir, "outbox.sqlite3")
+        self.outbox = Outbox(self.db_path, client=self.client, backoff=0.05, max_backoff=0.2)
+        self.events = []
+        for name in ("task_updated", "task_update_failed"):
+            handler = lambda data, name=name: self.events.append((name, data))
+            engine_events.subscribe(name, handler)
+            self.addCleanup(engine_events.unsubscribe, name, handler)
+
+    def tearDown(self):
+        if FakeKanban.gate is not None:
+            FakeKanban.gate.set()
+        self.outbox.close(timeout=1)
+        self.client.close()
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.test_dir)
+
+    def test_merges_pending_updates(self):
+        FakeKanban.gate = threading.Event()
+        self.outbox.enqueue("a", {"status": "inprogress"})
+        time.sleep(0.1) # The first PUT is now in flight and blocked
+        self.outbox.enqueue("a", {"status": "done"})
+        self.outbox.enqueue("a", {"description": "finished"})
+        self.assertEqual(self.outbox.pending(), {"a": {"status": "done", "description": "finished"}})
+        FakeKanban.gate.set()
+        self.assertTrue(self.outbox.flush(5))
+        # The in-flight version went out, then one merged PUT for everything queued behind it.
+        self.assertEqual([body for _, body in FakeKanban.puts],
+                         [{"status": "inprogress"}, {"status": "done", "description": "finished"}])
+        self.assertEqual(self.outbox.pending(), {})
+
+    def test_retries_and_emits_after_confirmation(self):
+        FakeKanban.failures = [503, 500]
+        self.outbox.enqueue("b", {"status": "done"})
+        deadline = time.time() + 5
+        while self.outbox.pending() and time.time() < deadline:
+            time.sleep(0.02)
+        self.assertEqual(FakeKanban.puts, [("b", {"status": "done"})])
+        self.assertEqual(self.events, [("task_updated", {"id": "b", "updates": {"status": "done"}})])
+
+    def test_client_error_is_dropped(self):
+        FakeKanban.failures = [404]
+        self.outbox.enqueue("c", {"status": "done"})
+        self.assertTrue(self.outbox.flush(5))
+        self.assertEqual(self.outbox.pending(), {})
+        self.assertEqual([name for name, _ in self.events], ["task_update_failed"])
+
+    def test_survives_restart_and_never_blocks(self):
+        self.server.shutdown() # Board unreachable
+        self.server.server_close()
+        start = time.perf_counter()
+        for i in range(50):
+            self.outbox.enqueue(str(i), {"status": "done"})
+        self.assertLess(time.perf_counter() - start, 1.0)
+        self.outbox.close(timeout=0.1)
+        self.outbox = Outbox(self.db_path, client=self.client)
+        self.assertEqual(len(self.outbox.pending()), 50)
+
+    def test_update_task_enqueues(self):
+        with patch('engine_outbox.get_outbox', return_value=self.outbox):
+            self.assertTrue(engine_kanban.update_task("d", {"status": "done"}))
+        self.assertTrue(self.outbox.flush(5))
+        self.assertEqual(FakeKanban.puts, [("d", {"status": "done"})])
+
+if __name__ == '__main__':
+    unittest.main()
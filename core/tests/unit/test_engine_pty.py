@@ -0,0 +1,137 @@
+import unittest
+import sys
+import os
+import time
+import threading
+import tempfile
+import shutil
+
+# Add core to sys.path (core modules import each other by bare name)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+@unittest.skipIf(os.name == 'nt', "covers the POSIX backend")
+class TestEnginePtyPosixUnit(unittest.TestCase):
+    def setUp(self):
+        import engine_pty
+        self.pty = engine_pty.PTY(cols=100, rows=40)
+        self.output = []
+        self.pty.on_output = self.output.append
+
+    def tearDown(self):
+        self.pty.close()
+
+    def _wait_for(self, text, timeout=5):
+        deadline = time.monotonic() + timeout
+        while text not in self.pty.buffer and time.monotonic() < deadline:
+            time.sleep(0.02)
+        self.assertIn(text, self.pty.buffer)
+
+    def test_spawn_is_a_tty_with_size(self):
+        self.pty.spawn([sys.executable, "-c",
+            "import os, sys; print('tty', sys.stdin.isatty(), os.get_terminal_size(0))"])
+        self._wait_for("tty True os.terminal_size(columns=100, lines=40)")
+        self.assertEqual("".join(self.output), self.pty.buffer)
+
+    def test_spawn_gets_a_controlling_terminal(self):
+        self.pty.spawn([sys.executable, "-c",
+            "import os; os.close(os.open('/dev/tty', os.O_RDWR)); print('ctty', os.tcgetpgrp(0) == os.getpgrp() == os.getpid())"])
+        self._wait_for("ctty True")
+
+    def test_spawn_of_a_missing_command_raises(self):
+        with self.assertRaises(FileNotFoundError):
+            self.pty.spawn(["no-such-command-kanban"])
+
+    def test_write_and_resize(self):
+        self.pty.spawn([sys.executable, "-c",
+            "import os\n"
+            "line = input()\n"
+            "print('got', line)\n"
+            "input()\n"
+            "print('size', os.get_terminal_size(0))\n"])
+        self.pty.write("hello\n")
+        self._wait_for("got hello")
+        self.pty.resize(80, 24)
+        self.pty.write("\n")
+        self._wait_for("size os.terminal_size(columns=80, lines=24)")
+
+    def test_screen_follows_output(self):
+        from engine_vt import Screen
+        self.pty.close()
+        import engine_pty
+        self.pty = engine_pty.PTY(cols=30, rows=5, screen=Screen(30, 5))
+        self.pty.spawn([sys.executable, "-c",
+            "import sys\n"
+            "for i in range(5): sys.stdout.write(f'\\rstep {i}\\x1b[K'); sys.stdout.flush()\n"
+            "print('\\nfinished')\n"])
+        self._wait_for("finished")
+        time.sleep(0.1)
+        self.assertEqual(self.pty.screen.text(), "step 4\nfinished")
+
+    def test_close_kills_process_group(self):
+        workdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, workdir)
+        pid_file = os.path.join(workdir, "child.pid")
+        self.pty.spawn([sys.executable, "-c",
+            "import subprocess, sys, signal, time\n"
+            "signal.signal(signal.SIGHUP, signal.SIG_IGN)\n"
+            "child = subprocess.Popen([sys.executable, '-c', 'import signal, time; signal.signal(signal.SIGHUP, signal.SIG_IGN); time.sleep(60)'])\n"
+            f"open({pid_file!r}, 'w').write(str(child.pid))\n"
+            "print('ready', flush=True)\n"
+            "time.sleep(60)\n"])
+        self._wait_for("ready")
+        process = self.pty.process
+        started = time.monotonic()
+        self.pty.close(grace=0.3)
+        self.assertLess(time.monotonic() - started, 5)
+        self.assertIsNotNone(process.poll())
+        child = int(open(pid_file).read())
+        time.sleep(0.2)
+        if os.path.isdir("/proc") and os.path.exists(f"/proc/{child}/stat"):
+            with open(f"/proc/{child}/stat") as f:
+                self.assertEqual(f.read().rsplit(')', 1)[1].split()[0], 'Z')
+
+@unittest.skipIf(os.name == 'nt', "the reactor is POSIX only")
+class TestPtyReactorUnit(unittest.TestCase):
+    def setUp(self):
+        import engine_pty
+        self.engine_pty = engine_pty
+        self.reactor = engine_pty.PTYReactor()
+
+    def tearDown(self):
+        self.reactor.close()
+
+    def test_many_sessions_share_one_thread(self):
+        threads_before = threading.active_count()
+        sessions = []
+        for i in range(20):
+            pty = self.engine_pty.PTY(reactor=self.reactor)
+            pty.spawn([sys.executable, "-c", f"import sys; sys.stdout.write('x' * 200000 + ' session {i} done'); sys.stdout.flush()"])
+            sessions.append(pty)
+        self.assertEqual(threading.active_count(), threads_before)
+        self.assertEqual(self.reactor.session_count, 20)
+
+        deadline = time.monotonic() + 10
+        while any(p.running for p in sessions) and time.monotonic() < deadline:
+            time.sleep(0.05)
+        for i, pty in enumerate(sessions):
+            self.assertFalse(pty.running)
+            self.assertEqual(len(pty.buffer), 200000 + len(f" session {i} done"))
+            self.assertTrue(pty.buffer.endswith(f" session {i} done"))
+            pty.close()
+        self.assertEqual(self.reactor.session_count, 0)
+
+    def test_interactive_session_and_close(self):
+        pty = self.engine_pty.PTY(reactor=self.reactor)
+        chunks = []
+        pty.on_output = chunks.append
+        pty.spawn([sys.executable, "-c", "print('echo', input())"])
+        pty.write("hi\n")
+        deadline = time.monotonic() + 5
+        while "echo hi" not in pty.buffer and time.monotonic() < deadline:
+            time.sleep(0.02)
+        self.assertIn("echo hi", "".join(chunks))
+        pty.close()
+        self.assertEqual(self.reactor.session_count, 0)
+
+if __name__ == "__main__":
+    unittest.main()
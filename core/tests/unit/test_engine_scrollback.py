@@ -0,0 +1,59 @@
+import unittest
+import sys
+import os
+import tempfile
+import shutil
+
+# Add core to sys.path (core modules import each other by bare name)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from engine_scrollback import Scrollback
+
+class TestScrollbackUnit(unittest.TestCase):
+    def test_last_lines_and_line_ranges(self):
+        sb = Scrollback()
+        sb.append("one\ntwo\nthr")
+        sb.append("ee\nfour")
+        self.assertEqual(sb.line_count, 4)
+        self.assertEqual(sb.last_lines(2), "three\nfour")
+        self.assertEqual(sb.lines(1, 3), "two\nthree\n")
+        sb.append("\n")
+        self.assertEqual(sb.line_count, 4)
+        self.assertEqual(sb.last_lines(1), "four\n")
+        self.assertEqual(sb.last_lines(10), "one\ntwo\nthree\nfour\n")
+
+    def test_memory_stays_capped(self):
+        sb = Scrollback(max_bytes=10000)
+        for i in range(100000):
+            sb.append(f"line {i}\n")
+            self.assertLessEqual(len(sb), 10000 + sb._slack)
+        self.assertEqual(sb.line_count, 100000)
+        self.assertEqual(sb.last_lines(2), "line 99998\nline 99999\n")
+        self.assertEqual(sb.lines(99990, 99991), "line 99990\n")
+        self.assertEqual(sb.end_offset, sum(len(f"line {i}\n") for i in range(100000)))
+        # Evicted lines are gone without a spill file, and the index was compacted.
+        self.assertEqual(sb.lines(0, 1), "")
+        self.assertLess(len(sb._starts), 5000)
+
+    def test_trim_keeps_utf8_characters_whole(self):
+        sb = Scrollback(max_bytes=4096)
+        for _ in range(3000):
+            sb.append("żółw ")
+        self.assertTrue(sb.text().startswith(("ż", "ó", "ł", "w", " ")))
+        self.assertNotIn("�", sb.text())
+
+    def test_spill_to_disk(self):
+        workdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, workdir)
+        spill = os.path.join(workdir, "session.log")
+        sb = Scrollback(max_bytes=4096, spill_path=spill)
+        expected = "".join(f"line {i}\n" for i in range(5000))
+        for i in range(5000):
+            sb.append(f"line {i}\n")
+        self.assertGreater(sb.start_offset, 0)
+        self.assertEqual(sb.read(0), expected)
+        sb.close()
+        with open(spill, encoding='utf-8') as f:
+            self.assertEqual(f.read() + sb.text(), expected)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import unittest
+import sys
+import os
+
+# Add core to sys.path (core modules import each other by bare name)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from engine_vt import Screen
+
+class TestScreenUnit(unittest.TestCase):
+    def test_wrap_and_scrollback(self):
+        screen = Screen(cols=10, rows=3, scrollback=2)
+        screen.feed("0123456789abc\r\nline2\r\nline3\r\nline4")
+        self.assertEqual(screen.display(), ["line2", "line3", "line4"])
+        self.assertEqual(list(screen.scrollback), ["0123456789", "abc"])
+        self.assertEqual(screen.cursor, (5, 2))
+
+    def test_progress_redraw_leaves_only_final_state(self):
+        screen = Screen(cols=40, rows=5)
+        for pct in range(0, 101, 10):
+            screen.feed(f"\rProgress {pct}%\x1b[K")
+        screen.feed("\r\n\x1b[1;32mDONE\x1b[0m")
+        self.assertEqual(screen.text(), "Progress 100%\nDONE")
+
+    def test_cursor_addressing_and_erase(self):
+        screen = Screen(cols=20, rows=4)
+        screen.feed("aaaa\r\nbbbb\r\ncccc\r\ndddd")
+        screen.feed("\x1b[2;3HXY\x1b[3;1H\x1b[2K\x1b[4;2H\x1b[1K")
+        self.assertEqual(screen.display(), ["aaaa", "bbXY", "", "  dd"])
+        screen.feed("\x1b[1;1H\x1b[P\x1b[2@")
+        self.assertEqual(screen.line(0), "  aaa")
+        screen.feed("\x1b[2J")
+        self.assertEqual(screen.text(), "")
+
+    def test_escape_split_across_feeds(self):
+        screen = Screen(cols=20, rows=2)
+        for ch in "hello\x1b[1;3Hxx\x1b]0;agent title\x07!":
+            screen.feed(ch)
+        self.assertEqual(screen.line(0), "hexx!")
+        self.assertEqual(screen.title, "agent title")
+
+    def test_alt_screen_restores_main(self):
+        screen = Screen(cols=20, rows=3)
+        screen.feed("shell prompt $ ")
+        screen.feed("\x1b[?1049h\x1b[H\x1b[2Jfull screen app")
+        self.assertTrue(screen.alt_screen)
+        self.assertEqual(screen.text(), "full screen app")
+        screen.feed("\x1b[?1049l")
+        self.assertFalse(screen.alt_screen)
+        self.assertEqual(screen.text(), "shell prompt $")
+        self.assertEqual(screen.cursor, (15, 0))
+
+    def test_scroll_region(self):
+        screen = Screen(cols=10, rows=4)
+        screen.feed("header\r\n1\r\n2\r\nfooter")
+        screen.feed("\x1b[2;3r\x1b[3;1H\n3")
+        self.assertEqual(screen.display(), ["header", "2", "3", "footer"])
+        self.assertEqual(list(screen.scrollback), [])
+
+    def test_dirty_rows_and_replies(self):
+        replies = []
+        screen = Screen(cols=10, rows=5, on_reply=replies.append)
+        screen.take_dirty()
+        screen.feed("\x1b[3;4Hx\x1b[6n")
+        self.assertEqual(screen.take_dirty(), [2])
+        self.assertEqual(screen.take_dirty(), [])
+        self.assertEqual(replies, ["\x1b[3;5R"])
+
+    def test_resize(self):
+        screen = Screen(cols=10, rows=4)
+        screen.feed("a\r\nb\r\nc\r\nd")
+        screen.resize(5, 2)
+        self.assertEqual(screen.display(), ["c", "d"])
+        self.assertEqual(list(screen.scrollback), ["a", "b"])
+        screen.resize(8, 3)
+        self.assertEqual(screen.display(), ["c", "d", ""])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,9 @@
 import unittest
+import time
 import sys
 import os
+import shutil
+import tempfile
 from unittest.mock import patch, MagicMock
 from pathlib import Path
 
@@ -47,5 +50,77 @@ class TestHeadlessGeminiUnit(unittest.TestCase):
         self.assertIn("-p", cmd)
         self.assertIn(prompt, cmd)
 
+FAKE_GEMINI = """#!/usr/bin/env python3
+import subprocess, sys, time
+if sys.argv[-1].startswith("bg"): # Leave a grandchild holding stdout/stderr
+    subprocess.Popen(["sleep", "20"])
+    sys.argv[-1] = sys.argv[-1][2:]
+for i in range(50):
+    print(f"line {i}", flush=True)
+print("warning", file=sys.stderr, flush=True)
+print("DONE_CODING", flush=True)
+time.sleep(float(sys.argv[-1]) if sys.argv[-1].replace('.', '', 1).isdigit() else 0)
+"""
+
+@unittest.skipIf(os.name == 'nt', "fake CLI is a POSIX script")
+class TestHeadlessGeminiStreamingUnit(unittest.TestCase):
+    """Runs the streaming API against a fake gemini executable."""
+
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.fake = self.test_dir / "gemini"
+        self.fake.write_text(FAKE_GEMINI)
+        self.fake.chmod(0o755)
+        patcher = patch('shutil.which', return_value=str(self.fake))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_streams_lines_with_bounded_tail_and_log(self):
+        log = self.test_dir / "agent.log"
+        seen = []
+        success, stdout, stderr = headless_gemini.invoke_agent_streaming(
+            workspace_path=self.test_dir, prompt="0", tail_lines=5, log_path=log,
+            on_line=lambda name, line: seen.append((name, line)) and False
+        )
+        self.assertTrue(success)
+        self.assertEqual(len(seen), 52)
+        self.assertEqual(stdout.splitlines(), ["line 46", "line 47", "line 48", "line 49", "DONE_CODING"])
+        self.assertEqual(stderr, "warning\n")
+        self.assertEqual(len(log.read_text().splitlines()), 52)
+
+    def test_callback_stops_agent_early(self):
+        """The fake CLI sleeps after the marker; stopping on it must not wait that out."""
+        success, stdout, _ = headless_gemini.invoke_agent_streaming(
+            workspace_path=self.test_dir, prompt="30",
+            on_line=lambda name, line: "DONE_CODING" in line
+        )
+        self.assertTrue(success)
+        self.assertTrue(stdout.endswith("DONE_CODING\n"))
+
+    def test_timeout_kills_agent(self):
+        success, _, stderr = headless_gemini.invoke_agent_streaming(
+            workspace_path=self.test_dir, prompt="30", timeout=1
+        )
+        self.assertFalse(success)
+        self.assertIn("timed out", stderr)
+
+    def test_grandchild_does_not_hold_up_timeout_or_stop(self):
+        start = time.monotonic()
+        success, _, _ = headless_gemini.invoke_agent_streaming(
+            workspace_path=self.test_dir, prompt="bg30", timeout=1
+        )
+        self.assertFalse(success)
+        start_stop = time.monotonic()
+        self.assertLess(start_stop - start, 5)
+        success, _, _ = headless_gemini.invoke_agent_streaming(
+            workspace_path=self.test_dir, prompt="bg30",
+            on_line=lambda name, line: "DONE_CODING" in line
+        )
+        self.assertTrue(success)
+        self.assertLess(time.monotonic() - start_stop, 5)
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,123 @@
+import unittest
+import sys
+import os
+import json
+import shutil
+import subprocess
+import tempfile
+import time
+from unittest.mock import patch
+
+# Add core to sys.path (core modules import each other by bare name)
+CORE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, CORE_DIR)
+import utils_ui
+from utils_ui import ConfigStore
+
+class TestConfigStoreUnit(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.test_dir, "config.json")
+        self._write({"kanban": {"ip": "127.0.0.1", "port": 1}, "projects": [{"name": "a"}]})
+        self.store = ConfigStore(self.path, write_delay=0.05)
+
+    def tearDown(self):
+        self.store.flush()
+        shutil.rmtree(self.test_dir)
+
+    def _write(self, doc):
+        with open(self.path, "w") as f:
+            json.dump(doc, f)
+
+    def _read(self):
+        with open(self.path) as f:
+            return json.load(f)
+
+    def test_views_are_cached_and_read_only(self):
+        view = self.store.view()
+        with patch('builtins.open', side_effect=AssertionError("re-read an unchanged file")):
+            self.assertIs(self.store.view(), view)
+        with self.assertRaises(TypeError):
+            view["kanban"]["port"] = 2
+        self.assertEqual(view["projects"][0]["name"], "a")
+        copy = self.store.load()
+        copy["kanban"]["port"] = 2
+        self.assertEqual(self.store.get("kanban")["port"], 1)
+
+    def test_reloads_when_file_changes(self):
+        self.store.view()
+        self._write({"kanban": {"ip": "127.0.0.1", "port": 22222}})
+        self.assertEqual(self.store.get("kanban")["port"], 22222)
+        self.assertIsNone(self.store.get("projects"))
+
+    def test_writes_are_coalesced(self):
+        real_replace = os.replace
+        with patch('os.replace', side_effect=real_replace) as replace:
+            for i in range(20):
+                doc = self.store.load()
+                doc["counter"] = i
+                self.store.replace(doc)
+            self.assertEqual(self.store.get("counter"), 19) # Visible before it is written
+            self.assertTrue(self.store.flush())
+        self.assertEqual(replace.call_count, 1)
+        self.assertEqual(self._read()["counter"], 19)
+
+    def test_keeps_keys_changed_by_other_processes(self):
+        self.store.view()
+        self.store.set("last_project", "alpha")
+        # Another process rewrites the file before our write goes out.
+        self._write({"kanban": {"ip": "10.0.0.1", "port": 1}, "projects": []})
+        self.assertTrue(self.store.flush())
+        self.assertEqual(self._read(), {"kanban": {"ip": "10.0.0.1", "port": 1}, "projects": [], "last_project": "alpha"})
+
+    def test_concurrent_processes(self):
+        script = (
+            "import sys; sys.path.insert(0, sys.argv[1]); import utils_ui\n"
+            "store = utils_ui.ConfigStore(sys.argv[2], write_delay=0)\n"
+            "for i in range(20):\n"
+            "    store.set(sys.argv[3], i)\n"
+            "    store.flush()\n"
+        )
+        procs = [subprocess.Popen([sys.executable, "-c", script, CORE_DIR, self.path, f"worker{n}"]) for n in range(4)]
+        for p in procs:
+            self.assertEqual(p.wait(30), 0)
+        doc = self._read()
+        self.assertEqual([doc[f"worker{n}"] for n in range(4)], [19] * 4)
+        self.assertEqual(doc["projects"], [{"name": "a"}])
+
+    def test_failed_write_is_retried(self):
+        real_dump = json.dump
+        attempts = []
+        def flaky_dump(*args, **kwargs):
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise OSError("disk full")
+            return real_dump(*args, **kwargs)
+        with patch('utils_ui.WRITE_RETRY_DELAY', 0.05), patch('utils_ui.json.dump', side_effect=flaky_dump):
+            self.store.set("last_project", "alpha")
+            deadline = time.monotonic() + 5
+            while self._read().get("last_project") != "alpha" and time.monotonic() < deadline:
+                time.sleep(0.02)
+        self.assertEqual(self._read()["last_project"], "alpha")
+        self.assertEqual(len(attempts), 2)
+
+    def test_full_config_helpers(self):
+        with patch('utils_ui.get_config_path', return_value=self.path):
+            data = utils_ui.load_full_config()
+            data["projects"].append({"name": "b"})
+            self.assertTrue(utils_ui.save_full_config(data))
+            self.assertEqual(len(utils_ui.load_full_config()["projects"]), 2)
+            self.assertTrue(utils_ui.flush_config())
+        self.assertEqual(len(self._read()["projects"]), 2)
+
+    def test_save_full_config_reports_a_failed_write(self):
+        with patch('utils_ui.get_config_path', return_value=self.path):
+            data = utils_ui.load_full_config()
+            data["projects"] = []
+            with patch('utils_ui.json.dump', side_effect=OSError("disk full")):
+                self.assertFalse(utils_ui.save_full_config(data))
+            self.assertTrue(utils_ui.flush_config())
+        self.assertEqual(self._read()["projects"], [])
+
+if __name__ == '__main__':
+    unittest.main()
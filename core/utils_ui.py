@@ -1,10 +1,15 @@
 import os
+import copy
 import json
+import atexit
 import threading
 import time
+import types
 
-# Global lock to prevent concurrent file access within the same process
-_config_lock = threading.Lock()
+if os.name == 'nt':
+    import msvcrt
+else:
+    import fcntl
 
 def get_config_path():
     cfg_path = os.path.join(os.path.dirname(__file__), "config.json")
@@ -15,41 +20,217 @@ def get_config_path():
         shutil.copy(template_path, cfg_path)
     return cfg_path
 
-def load_full_config():
-    cfg_path = get_config_path()
-    with _config_lock:
-        if os.path.exists(cfg_path):
+_DELETED = object()
+WRITE_RETRY_DELAY = 5.0 # Seconds before a failed write is retried
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return types.MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+class _FileLock:
+    """Exclusive lock shared with other orchestrator processes (flock / msvcrt)."""
+    def __init__(self, path):
+        self.path = path
+        self._f = None
+
+    def __enter__(self):
+        self._f = open(self.path, 'a+')
+        if os.name == 'nt':
+            while True:
+                try:
+                    self._f.seek(0)
+                    msvcrt.locking(self._f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError: # LK_LOCK gives up after ~10s
+                    continue
+        else:
+            fcntl.flock(self._f.fileno(), fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        try:
+            if os.name == 'nt':
+                self._f.seek(0)
+                msvcrt.locking(self._f.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(self._f.fileno(), fcntl.LOCK_UN)
+        finally:
+            self._f.close()
+
+class ConfigStore:
+    """
+    Cached config.json. Reads cost one stat() while the file is unchanged and
+    hand out the same read-only view. Writes are applied in memory at once and
+    written out after `write_delay` seconds, so a burst of saves is one write;
+    a failed write keeps the changes pending and is retried.
+    The write re-reads the file under a cross-process lock and only replaces
+    the top-level keys changed here, so other processes' edits survive.
+    """
+    def __init__(self, path, write_delay=0.2):
+        self.path = path
+        self.write_delay = write_delay
+        self._lock = threading.RLock()
+        self._doc = None
+        self._view = None
+        self._stamp = None
+        self._dirty = {} # Top-level key -> value (or _DELETED) not yet written
+        self._timer = None
+
+    def _stat(self):
+        try:
+            st = os.stat(self.path)
+            return (st.st_mtime_ns, st.st_size, st.st_ino)
+        except OSError:
+            return None
+
+    def _read(self):
+        try:
+            with open(self.path, 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            print(f"[utils_ui Load Error] {e}")
+            return None
+
+    def _apply_dirty(self, doc):
+        for key, value in self._dirty.items():
+            if value is _DELETED:
+                doc.pop(key, None)
+            else:
+                doc[key] = copy.deepcopy(value)
+
+    def _revalidate(self):
+        stamp = self._stat()
+        if self._doc is not None and stamp == self._stamp:
+            return
+        doc = self._read()
+        if doc is None: # Unparseable, e.g. mid-edit: keep serving the last good copy
+            if self._doc is not None:
+                return
+            doc = {}
+        self._apply_dirty(doc)
+        self._doc, self._view, self._stamp = doc, None, stamp
+
+    def view(self):
+        """Read-only view of the whole config (dicts become mappings, lists tuples)."""
+        with self._lock:
+            self._revalidate()
+            if self._view is None:
+                self._view = _freeze(self._doc)
+            return self._view
+
+    def get(self, key, default=None):
+        return self.view().get(key, default)
+
+    def load(self):
+        """Mutable deep copy of the config."""
+        with self._lock:
+            self._revalidate()
+            return copy.deepcopy(self._doc)
+
+    def _set(self, key, value):
+        if value is _DELETED:
+            self._doc.pop(key, None)
+        else:
+            self._doc[key] = value
+        self._dirty[key] = value
+        self._view = None
+
+    def set(self, key, value):
+        with self._lock:
+            self._revalidate()
+            self._set(key, copy.deepcopy(value))
+            self._schedule()
+
+    def replace(self, config):
+        """Makes the config equal to `config`, recording only the top-level keys that differ."""
+        with self._lock:
+            self._revalidate()
+            changed = False
+            for key in list(self._doc):
+                if key not in config:
+                    self._set(key, _DELETED)
+                    changed = True
+            for key, value in config.items():
+                if key not in self._doc or self._doc[key] != value:
+                    self._set(key, copy.deepcopy(value))
+                    changed = True
+            if changed:
+                self._schedule()
+
+    def _schedule(self, delay=None):
+        if self._timer is None:
+            self._timer = threading.Timer(self.write_delay if delay is None else delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        """Writes pending changes now. Returns False if the write failed (changes stay pending and are retried)."""
+        with self._lock:
+            if self._timer is not None:
+                if self._timer is not threading.current_thread():
+                    self._timer.cancel()
+                self._timer = None
+            if not self._dirty:
+                return True
+            temp_path = self.path + ".tmp"
             try:
-                with open(cfg_path, 'r') as f:
-                    return json.load(f)
+                with _FileLock(self.path + ".lock"):
+                    doc = self._read()
+                    if doc is None:
+                        doc = copy.deepcopy(self._doc)
+                    self._apply_dirty(doc)
+                    with open(temp_path, 'w') as f:
+                        json.dump(doc, f, indent=4)
+                    # Retry loop for Windows file contention
+                    for i in range(5):
+                        try:
+                            os.replace(temp_path, self.path)
+                            break
+                        except PermissionError:
+                            time.sleep(0.1)
+                    else:
+                        raise PermissionError(f"Could not replace {self.path} after 5 attempts")
+                    self._stamp = self._stat()
             except Exception as e:
-                print(f"[utils_ui Load Error] {e}")
-    return {}
+                print(f"[Config Save Error] {e}")
+                if os.path.exists(temp_path):
+                    try: os.remove(temp_path)
+                    except: pass
+                self._schedule(max(self.write_delay, WRITE_RETRY_DELAY))
+                return False
+            self._dirty.clear()
+            self._doc, self._view = doc, None
+            return True
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+def get_config_store():
+    path = get_config_path()
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None:
+            store = _stores[path] = ConfigStore(path)
+        return store
+
+def flush_config():
+    with _stores_lock:
+        stores = list(_stores.values())
+    return all([store.flush() for store in stores])
+
+atexit.register(flush_config)
+
+def load_full_config():
+    """Mutable copy of config.json; use get_config_store().view() for read-only access."""
+    return get_config_store().load()
 
 def save_full_config(config):
-    cfg_path = get_config_path()
-    temp_path = cfg_path + ".tmp"
-    
-    with _config_lock:
-        try:
-            with open(temp_path, 'w') as f:
-                json.dump(config, f, indent=4)
-            
-            # Retry loop for Windows file contention
-            for i in range(5):
-                try:
-                    if os.path.exists(cfg_path):
-                        os.replace(temp_path, cfg_path)
-                    else:
-                        os.rename(temp_path, cfg_path)
-                    return True
-                except PermissionError:
-                    time.sleep(0.1)
-            raise PermissionError(f"Could not replace {cfg_path} after 5 attempts")
-            
-        except Exception as e:
-            print(f"[Config Save Error] {e}")
-            if os.path.exists(temp_path):
-                try: os.remove(temp_path)
-                except: pass
-            return False
\ No newline at end of file
+    """Writes config to config.json now. Returns False if the write failed (it is retried in the background)."""
+    store = get_config_store()
+    store.replace(config)
+    return store.flush()
@@ -1,17 +1,117 @@
-from typing import Dict, List, Callable, Type
-from events import Event
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Deque, Dict, List, Callable, Optional, Tuple, Type
+from events import Event, TaskFailed
+
+class _Dispatcher:
+    """Delivers events to one subscriber object from its own thread pool.
+
+    All of the subscriber's callbacks share the dispatcher, so events with the
+    same request_id reach it one at a time and in emit order, whatever their
+    type; events for different tasks run in parallel up to `workers`.
+    At most `queue_size` events may be waiting, after which emit() blocks.
+    """
+
+    def __init__(self, bus: 'EventBus', name: str, workers: int, queue_size: int):
+        self.bus = bus
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"bus-{name}")
+        self._slots = threading.BoundedSemaphore(queue_size)
+        self._queues: Dict[Any, Deque[Tuple[Callable, Event]]] = {}
+        self._lock = threading.Lock()
+        self._outstanding = 0 # Queued or running events
+        self._drained = threading.Condition(self._lock)
+
+    def put(self, callback: Callable, event: Event):
+        self._slots.acquire()
+        key = getattr(event, 'request_id', None)
+        with self._lock:
+            self._outstanding += 1
+            if key in self._queues:
+                # A runner is already draining this task's events.
+                self._queues[key].append((callback, event))
+                return
+            self._queues[key] = deque([(callback, event)])
+        self._executor.submit(self._drain, key)
+
+    def _drain(self, key):
+        while True:
+            with self._lock:
+                queue = self._queues[key]
+                if not queue:
+                    del self._queues[key]
+                    return
+                callback, event = queue.popleft()
+            try:
+                callback(event)
+            except Exception as e:
+                self.bus._report_failure(event, callback, e)
+            finally:
+                self._slots.release()
+                with self._lock:
+                    self._outstanding -= 1
+                    if not self._outstanding:
+                        self._drained.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        with self._lock:
+            return self._drained.wait_for(lambda: not self._outstanding, timeout)
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
 
 class EventBus:
-    def __init__(self):
+    def __init__(self, async_dispatch: bool = False, workers: int = 8, queue_size: int = 256):
         self._listeners: Dict[Type[Event], List[Callable]] = {}
+        self.async_dispatch = async_dispatch
+        self.workers = workers
+        self.queue_size = queue_size
+        # Keyed by the subscriber object (the instance behind a bound method, else the function).
+        self._dispatchers: Dict[int, _Dispatcher] = {}
+        self._routes: Dict[Type[Event], List[Tuple[_Dispatcher, Callable]]] = {}
 
     def subscribe(self, event_type: Type[Event], callback: Callable):
         if event_type not in self._listeners:
             self._listeners[event_type] = []
         self._listeners[event_type].append(callback)
+        if self.async_dispatch:
+            owner = getattr(callback, '__self__', callback)
+            dispatcher = self._dispatchers.get(id(owner))
+            if dispatcher is None:
+                name = type(owner).__name__ if owner is not callback else getattr(callback, '__qualname__', repr(callback))
+                dispatcher = self._dispatchers[id(owner)] = _Dispatcher(self, name, self.workers, self.queue_size)
+            self._routes.setdefault(event_type, []).append((dispatcher, callback))
 
     def emit(self, event: Event):
         event_type = type(event)
-        if event_type in self._listeners:
+        if self.async_dispatch:
+            for dispatcher, callback in self._routes.get(event_type, []):
+                dispatcher.put(callback, event)
+        elif event_type in self._listeners:
             for callback in self._listeners[event_type]:
                 callback(event)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Waits until every emitted event has been handled (async mode). Returns False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            for dispatcher in list(self._dispatchers.values()):
+                remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+                if not dispatcher.flush(remaining):
+                    return False
+            # A handler may have emitted to a dispatcher that was already checked.
+            if all(d.flush(0) for d in list(self._dispatchers.values())):
+                return True
+
+    def _report_failure(self, event: Event, callback: Callable, error: Exception):
+        name = getattr(callback, '__qualname__', repr(callback))
+        print(f"EventBus: {name} failed on {type(event).__name__}: {error}")
+        request_id: Optional[str] = getattr(event, 'request_id', None)
+        if request_id is not None and not isinstance(event, TaskFailed):
+            self.emit(TaskFailed(request_id=request_id, error=f"{name}: {error}"))
+
+    def shutdown(self, wait: bool = True):
+        """Stops the dispatcher threads (async mode only)."""
+        for dispatcher in self._dispatchers.values():
+            dispatcher.shutdown(wait=wait)
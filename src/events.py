@@ -12,6 +12,8 @@ class TaskDetected(Event):
     path: Path
 
 # Commands (Pipeline -> Handlers)
+# Every command and signal carries the request_id of the task it belongs to,
+# so several tasks can be in flight on the same bus at once.
 @dataclass
 class RequestWorkspace(Event):
     request_id: str
@@ -20,51 +22,79 @@ class RequestWorkspace(Event):
     base_workdir: Path
     source_path: Optional[Path] = None
     report_template_path: Optional[Path] = None
+    repo_url: Optional[str] = None # Lets the handler hand out a pre-warmed clone
 
 @dataclass
 class RequestGitClone(Event):
+    request_id: str
     repo_url: str
     workspace_path: Path
 
 @dataclass
 class RequestBranch(Event):
+    request_id: str
     workspace_path: Path
     base_commit: str
     feature_branch: str
 
 @dataclass
 class RequestPush(Event):
+    request_id: str
     workspace_path: Path
     feature_branch: str
 
 @dataclass
 class RequestCommit(Event):
+    request_id: str
     workspace_path: Path
     request_file: Path
     commit_message: str
+    bootstrap_ref: Optional[str] = None # Ref pointed at the new commit for O(1) lookups
 
 @dataclass
 class StartCoding(Event):
+    request_id: str
     workspace_path: Path
     context: Dict[str, Any]
+    skip_coding: bool = False # Resume straight into the reporting phase
 
 # Signals (Handlers -> Pipeline)
 @dataclass
 class WorkspaceReady(Event):
+    request_id: str
     path: Path
 
 @dataclass
 class GitReady(Event):
+    request_id: str
     workspace_path: Path
 
 @dataclass
 class BranchReady(Event):
+    request_id: str
+    workspace_path: Path
+
+@dataclass
+class CommitCompleted(Event):
+    request_id: str
     workspace_path: Path
 
+@dataclass
+class PhaseCompleted(Event):
+    request_id: str
+    phase: str # 'coding' | 'reporting'
+
 @dataclass
 class PushCompleted(Event):
+    request_id: str
     workspace_path: Path
 
 @dataclass
 class WorkCompleted(Event):
+    request_id: str
     diff: Optional[str] = None
+
+@dataclass
+class TaskFailed(Event):
+    request_id: str
+    error: str
@@ -1,3 +1,5 @@
 from .git_handler import GitHandler
 from .workspace_handler import WorkspaceHandler
 from .agent_handler import AgentHandler
+from .workspace_pool import WorkspacePool
+from .push_scheduler import PushScheduler
@@ -1,8 +1,20 @@
 import subprocess
 import os
+import sys
+import asyncio
+import threading
+from concurrent.futures import Future
 from pathlib import Path
+from typing import List, Optional
 from bus import EventBus
-from events import StartCoding, WorkCompleted
+from events import StartCoding, WorkCompleted, PhaseCompleted
+from utils.gitread import GitReader, GitReadError
+from utils.artifacts import validate_artifact
+from .push_scheduler import PushScheduler
+
+# Agents run under core's AgentSupervisor (core modules import each other by bare name).
+sys.path.append(str(Path(__file__).resolve().parents[2] / "core"))
+from agent_supervisor import AgentSupervisor, AgentRun, TIMED_OUT
 
 CODING_PROMPT_TEMPLATE = """
 # MANDATORY TASK
@@ -40,12 +52,33 @@ When report is pushed, you MUST:
 3. STOP immediately.
 """
 
+def _echo(run: AgentRun, stream: str, line: str):
+    # The agent's output is piped through the supervisor; pass it on to the console.
+    print(line, end='', file=sys.stderr if stream == 'stderr' else sys.stdout, flush=True)
+
 class AgentHandler:
-    def __init__(self, bus: EventBus):
+    def __init__(self, bus: EventBus, pusher: Optional[PushScheduler] = None, agent_timeout: Optional[float] = 1800,
+                 supervisor: Optional[AgentSupervisor] = None):
         self.bus = bus
+        self.pusher = pusher or PushScheduler()
+        self.agent_timeout = agent_timeout
+        self.supervisor = supervisor or AgentSupervisor(wall_timeout=agent_timeout, idle_timeout=None)
+        # The supervisor is asyncio-based; it runs on its own loop and handler threads wait on their runs.
+        self._loop = asyncio.new_event_loop()
+        threading.Thread(target=self._loop.run_forever, daemon=True, name="agent-supervisor").start()
         self.bus.subscribe(StartCoding, self.on_start)
 
+    def shutdown(self):
+        """Kills agents that are still running and stops the supervisor's loop."""
+        asyncio.run_coroutine_threadsafe(self.supervisor.shutdown(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
     def _get_last_commit_message(self, workspace_path: Path) -> str:
+        # Read HEAD straight from .git; only fall back to forking git if that fails.
+        try:
+            return GitReader(workspace_path).last_commit_message()
+        except (GitReadError, OSError):
+            pass
         try:
             result = subprocess.run(
                 ['git', 'log', '-1', '--pretty=%B'],
@@ -80,12 +113,25 @@ class AgentHandler:
             
         cmd = [gemini_path, "-y", "--model", "gemini-3-flash-preview", "-p", prompt.strip()]
         
-        try:
-            subprocess.run(cmd, cwd=workspace_path, check=True)
-            return True
-        except (subprocess.CalledProcessError, FileNotFoundError) as e:
-            print(f"AgentHandler: Agent execution failed: {e}")
+        # The supervisor kills the agent's whole process tree once it hits agent_timeout.
+        run = asyncio.run_coroutine_threadsafe(self._supervise(cmd, workspace_path), self._loop).result()
+        if run.status == TIMED_OUT:
+            print(f"AgentHandler: Agent timed out after {self.agent_timeout}s, process tree killed.")
             return False
+        if not run.succeeded:
+            print(f"AgentHandler: Agent execution failed: {run.error or f'exit code {run.returncode}'}")
+            return False
+        return True
+
+    async def _supervise(self, cmd: List[str], workspace_path: Path) -> AgentRun:
+        return await self.supervisor.spawn(cmd, workspace_path, on_line=_echo).wait()
+
+    def _log_push_failure(self, future: Future, signal_name: str):
+        def report(f: Future):
+            error = f.exception()
+            if error:
+                print(f"AgentHandler: Fail-safe push of {signal_name} failed: {error}")
+        future.add_done_callback(report)
 
     def _fail_safe_commit_and_push(self, workspace_path: Path, message: str, signal: str):
         """Final fail-safe to ensure work is committed and pushed."""
@@ -101,12 +147,14 @@ class AgentHandler:
             if self._get_last_commit_message(workspace_path) != signal:
                 subprocess.run(['git', 'commit', '--allow-empty', '-m', signal], cwd=workspace_path, check=True)
             
-            # 3. Push
+            # 3. Push (queued; coalesced with the other pushes of this branch)
             print(f"AgentHandler: Pushing fail-safe {signal} to remote...")
             try:
-                subprocess.run(['git', 'push'], cwd=workspace_path, check=True)
-            except subprocess.CalledProcessError:
-                subprocess.run(['git', 'push', 'origin', 'HEAD'], cwd=workspace_path, check=True)
+                branch = GitReader(workspace_path).current_branch() or 'HEAD'
+            except (GitReadError, OSError):
+                branch = 'HEAD'
+            push = self.pusher.schedule(workspace_path, branch)
+            self._log_push_failure(push, signal)
             return True
         except subprocess.CalledProcessError as e:
             print(f"AgentHandler: Fail-safe failed: {e}")
@@ -116,16 +164,20 @@ class AgentHandler:
         workspace_path = event.workspace_path
         
         # --- PHASE 1: CODING ---
-        print(f"AgentHandler: [PHASE 1] Coding task {event.context.get('id')}...")
-        self._invoke_agent(workspace_path, CODING_PROMPT_TEMPLATE)
-        
-        # Verify Phase 1: Last commit must be DONE_CODING AND workspace must be clean
-        if self._get_last_commit_message(workspace_path) != "DONE_CODING" or self._is_workspace_dirty(workspace_path):
-            print("AgentHandler: Phase 1 incomplete or dirty. Wrapping up...")
-            self._fail_safe_commit_and_push(workspace_path, "auto: wrap coding work", "DONE_CODING")
+        if event.skip_coding:
+            print(f"AgentHandler: [PHASE 1] Already completed for task {event.request_id}, resuming at reporting.")
+        else:
+            print(f"AgentHandler: [PHASE 1] Coding task {event.request_id}...")
+            self._invoke_agent(workspace_path, CODING_PROMPT_TEMPLATE)
+
+            # Verify Phase 1: Last commit must be DONE_CODING AND workspace must be clean
+            if self._get_last_commit_message(workspace_path) != "DONE_CODING" or self._is_workspace_dirty(workspace_path):
+                print("AgentHandler: Phase 1 incomplete or dirty. Wrapping up...")
+                self._fail_safe_commit_and_push(workspace_path, "auto: wrap coding work", "DONE_CODING")
+            self.bus.emit(PhaseCompleted(request_id=event.request_id, phase="coding"))
 
         # --- PHASE 2: REPORTING ---
-        print(f"AgentHandler: [PHASE 2] Reporting task {event.context.get('id')}...")
+        print(f"AgentHandler: [PHASE 2] Reporting task {event.request_id}...")
         self._invoke_agent(workspace_path, REPORT_PROMPT_TEMPLATE)
 
         # Verify Phase 2: Last commit must be DONE_REPORTING AND workspace must be clean
@@ -135,8 +187,15 @@ class AgentHandler:
 
         # Final check
         if self._get_last_commit_message(workspace_path) == "DONE_REPORTING":
+            # No artifact, no transition: the report must fill in its template.
+            report = validate_artifact(Path(workspace_path) / "implementation_report.md", "implementation_report")
+            if not report.ok:
+                print(f"AgentHandler: Report check failed for task {event.request_id}: {report}")
+                self.bus.emit(WorkCompleted(request_id=event.request_id, diff="FAILED_INVALID_REPORT"))
+                return
             print("AgentHandler: Pipeline finished successfully.")
-            self.bus.emit(WorkCompleted(diff=None))
+            self.bus.emit(PhaseCompleted(request_id=event.request_id, phase="reporting"))
+            self.bus.emit(WorkCompleted(request_id=event.request_id, diff=None))
         else:
             print("AgentHandler: Pipeline failed final signal check.")
-            self.bus.emit(WorkCompleted(diff="FAILED_PHASE_2"))
+            self.bus.emit(WorkCompleted(request_id=event.request_id, diff="FAILED_PHASE_2"))
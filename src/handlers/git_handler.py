@@ -1,17 +1,32 @@
 import subprocess
 import os
+import hashlib
+import shutil
+import threading
+import time
 from pathlib import Path
+from concurrent.futures import Future
+from typing import Dict, Optional
 from bus import EventBus
 from events import (
     RequestGitClone, GitReady, 
     RequestBranch, BranchReady,
     RequestPush, PushCompleted,
-    RequestCommit
+    RequestCommit, CommitCompleted
 )
+from utils.gitread import GitReader, GitReadError
+from .push_scheduler import PushScheduler
 
 class GitHandler:
-    def __init__(self, bus: EventBus):
+    def __init__(self, bus: EventBus, mirror_dir: Optional[Path] = None, mirror_refresh_interval: float = 300,
+                 pusher: Optional[PushScheduler] = None):
         self.bus = bus
+        self.pusher = pusher or PushScheduler()
+        # Bare mirrors shared by all workspaces of a repo (None disables the cache)
+        self.mirror_dir = mirror_dir
+        self.mirror_refresh_interval = mirror_refresh_interval
+        self._mirror_locks: Dict[str, threading.Lock] = {}
+        self._mirror_locks_guard = threading.Lock()
         self.bus.subscribe(RequestGitClone, self.on_clone)
         self.bus.subscribe(RequestBranch, self.on_branch)
         self.bus.subscribe(RequestPush, self.on_push)
@@ -24,25 +39,96 @@ class GitHandler:
     def _is_git_repo(self, repo_path: Path) -> bool:
         return (repo_path / '.git').exists()
 
+    def _current_branch(self, repo_path: Path) -> str:
+        try:
+            branch = GitReader(repo_path).current_branch()
+            if branch:
+                return branch
+        except (GitReadError, OSError):
+            pass
+        return self._run_git(['rev-parse', '--abbrev-ref', 'HEAD'], cwd=repo_path)
+
+    def _log_push_failure(self, future: Future, what: str):
+        def report(f: Future):
+            error = f.exception()
+            if error:
+                print(f"{what} failed: {error}")
+        future.add_done_callback(report)
+
     def _branch_exists(self, repo_path: Path, branch_name: str) -> bool:
         result = subprocess.run(['git', 'branch', '--list', branch_name], cwd=repo_path, capture_output=True, text=True)
         return branch_name in result.stdout
 
+    def _mirror_lock(self, repo_url: str) -> threading.Lock:
+        with self._mirror_locks_guard:
+            return self._mirror_locks.setdefault(repo_url, threading.Lock())
+
+    def _mirror_path(self, repo_url: str) -> Path:
+        name = repo_url.rstrip("/").split("/")[-1].replace(".git", "")
+        key = hashlib.sha1(repo_url.encode('utf-8')).hexdigest()[:12]
+        return self.mirror_dir / f"{name}-{key}.git"
+
+    def ensure_mirror(self, repo_url: str) -> Optional[Path]:
+        """
+        Returns an up-to-date bare mirror of repo_url, creating it on first use and
+        fetching incrementally at most once per mirror_refresh_interval.
+        Returns None if the cache is disabled or the mirror cannot be prepared.
+        """
+        if self.mirror_dir is None:
+            return None
+        mirror = self._mirror_path(repo_url)
+        with self._mirror_lock(repo_url):
+            try:
+                if not (mirror / "HEAD").exists():
+                    print(f"GitHandler: Creating mirror of {repo_url} in {mirror}...")
+                    self.mirror_dir.mkdir(parents=True, exist_ok=True)
+                    shutil.rmtree(mirror, ignore_errors=True)
+                    self._run_git(['clone', '--mirror', repo_url, str(mirror)], cwd=self.mirror_dir)
+                    # Workspaces borrow objects from the mirror, so it must never prune them.
+                    self._run_git(['config', 'gc.pruneExpire', 'never'], cwd=mirror)
+                    (mirror / "FETCH_HEAD").touch()
+                else:
+                    fetch_head = mirror / "FETCH_HEAD"
+                    last_fetch = fetch_head.stat().st_mtime if fetch_head.exists() else 0
+                    if time.time() - last_fetch >= self.mirror_refresh_interval:
+                        print(f"GitHandler: Refreshing mirror {mirror.name}...")
+                        self._run_git(['fetch', '--prune', 'origin'], cwd=mirror)
+                        fetch_head.touch()
+            except subprocess.CalledProcessError as e:
+                print(f"GitHandler: Mirror unavailable for {repo_url}, cloning directly: {e.stderr or e}")
+                return None
+        return mirror
+
+    def clone_into(self, repo_url: str, workspace_path: Path):
+        """Creates a checkout of repo_url in workspace_path, borrowing objects from the mirror if possible."""
+        mirror = self.ensure_mirror(repo_url)
+        # If directory is not empty, git clone will fail.
+        # We use git init + remote add as a workaround.
+        if os.path.exists(workspace_path) and os.listdir(workspace_path):
+            print(f"Directory {workspace_path} is not empty. Initializing manually...")
+            self._run_git(['init'], cwd=workspace_path)
+            self._run_git(['remote', 'add', 'origin', repo_url], cwd=workspace_path)
+            if mirror:
+                alternates = workspace_path / ".git" / "objects" / "info" / "alternates"
+                alternates.write_text(str((mirror / "objects").absolute()) + "\n", encoding='utf-8')
+                self._run_git(['fetch', str(mirror), '+refs/heads/*:refs/remotes/origin/*'], cwd=workspace_path)
+            else:
+                self._run_git(['fetch', 'origin'], cwd=workspace_path)
+        elif mirror:
+            print(f"Cloning {repo_url} from local mirror...")
+            # --shared records the mirror in objects/info/alternates: only the checkout is new on disk.
+            self._run_git(['clone', '--shared', str(mirror), '.'], cwd=workspace_path)
+            self._run_git(['remote', 'set-url', 'origin', repo_url], cwd=workspace_path)
+        else:
+            print(f"Cloning {repo_url}...")
+            subprocess.run(['git', 'clone', repo_url, '.'], cwd=workspace_path, check=True)
+
     def on_clone(self, event: RequestGitClone):
         if self._is_git_repo(event.workspace_path):
             print(f"Repository already exists in {event.workspace_path}, skipping clone.")
         else:
-            # If directory is not empty, git clone will fail. 
-            # We use git init + remote add as a workaround.
-            if os.path.exists(event.workspace_path) and os.listdir(event.workspace_path):
-                print(f"Directory {event.workspace_path} is not empty. Initializing manually...")
-                self._run_git(['init'], cwd=event.workspace_path)
-                self._run_git(['remote', 'add', 'origin', event.repo_url], cwd=event.workspace_path)
-                self._run_git(['fetch', 'origin'], cwd=event.workspace_path)
-            else:
-                print(f"Cloning {event.repo_url}...")
-                subprocess.run(['git', 'clone', event.repo_url, '.'], cwd=event.workspace_path, check=True)
-        self.bus.emit(GitReady(workspace_path=event.workspace_path))
+            self.clone_into(event.repo_url, event.workspace_path)
+        self.bus.emit(GitReady(request_id=event.request_id, workspace_path=event.workspace_path))
 
     def on_branch(self, event: RequestBranch):
         repo_path = event.workspace_path
@@ -71,14 +157,17 @@ class GitHandler:
                 
             self._run_git(['checkout', '-b', feature_branch, base_commit], cwd=repo_path)
             
-            # Push to origin and set upstream
+            # Record the upstream locally right away so plain `git push` works for the agent,
+            # and let the push scheduler publish the branch together with the bootstrap commit.
             print(f"Setting upstream for {feature_branch}...")
-            try:
-                self._run_git(['push', '-u', 'origin', feature_branch], cwd=repo_path)
-            except subprocess.CalledProcessError as e:
-                print(f"Initial push failed for {feature_branch}: {e}")
+            self._run_git(['config', f"branch.{feature_branch}.remote", 'origin'], cwd=repo_path)
+            self._run_git(['config', f"branch.{feature_branch}.merge", f"refs/heads/{feature_branch}"], cwd=repo_path)
+            self._log_push_failure(
+                self.pusher.schedule(repo_path, feature_branch, set_upstream=True),
+                f"Initial push for {feature_branch}"
+            )
         
-        self.bus.emit(BranchReady(workspace_path=repo_path))
+        self.bus.emit(BranchReady(request_id=event.request_id, workspace_path=repo_path))
 
     def on_commit(self, event: RequestCommit):
         print(f"Creating bootstrap commit: {event.commit_message}")
@@ -86,13 +175,19 @@ class GitHandler:
             # Add all injected files (request and report template)
             self._run_git(['add', '.'], cwd=event.workspace_path)
             self._run_git(['commit', '-m', event.commit_message], cwd=event.workspace_path)
-            # Crucial: Push the bootstrap commit immediately
+            if event.bootstrap_ref:
+                self._run_git(['update-ref', event.bootstrap_ref, 'HEAD'], cwd=event.workspace_path)
+            # Crucial: Push the bootstrap commit (coalesced with the branch's initial push)
             print("Pushing bootstrap commit...")
-            self._run_git(['push'], cwd=event.workspace_path)
+            self._log_push_failure(
+                self.pusher.schedule(event.workspace_path, self._current_branch(event.workspace_path)),
+                "Bootstrap push"
+            )
         except subprocess.CalledProcessError as e:
             print(f"Error during bootstrap commit/push: {e}")
+        self.bus.emit(CommitCompleted(request_id=event.request_id, workspace_path=event.workspace_path))
 
     def on_push(self, event: RequestPush):
         print(f"Pushing branch {event.feature_branch} to origin...")
-        self._run_git(['push', 'origin', event.feature_branch], cwd=event.workspace_path)
-        self.bus.emit(PushCompleted(workspace_path=event.workspace_path))
+        self.pusher.schedule(event.workspace_path, event.feature_branch).result()
+        self.bus.emit(PushCompleted(request_id=event.request_id, workspace_path=event.workspace_path))
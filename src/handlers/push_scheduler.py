@@ -0,0 +1,109 @@
+import subprocess
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+class _PushGroup:
+    """Branches waiting to be pushed from one workspace to one remote."""
+
+    def __init__(self, due: float):
+        self.due = due
+        self.branches: Dict[str, List[Future]] = {}
+        self.set_upstream = False
+
+class PushScheduler:
+    """
+    Coalesces pushes. Requests for the same (workspace, remote) made within
+    `window` seconds are sent as a single `git push <remote> <branch>...`;
+    repeated requests for the same branch share that push. Failed pushes are
+    retried with exponential backoff. Each request returns a Future that
+    resolves once its branch is on the remote.
+    """
+
+    def __init__(self, window: float = 2.0, max_attempts: int = 4, backoff: float = 1.0, workers: int = 4):
+        self.window = window
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self._pending: Dict[Tuple[Path, str], _PushGroup] = {}
+        self._inflight: set = set()
+        self._cond = threading.Condition()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="push")
+        self._thread = threading.Thread(target=self._loop, daemon=True, name="push-scheduler")
+        self._thread.start()
+
+    def schedule(self, workspace_path: Path, branch: str, remote: str = "origin", set_upstream: bool = False) -> Future:
+        future = Future()
+        key = (workspace_path, remote)
+        with self._cond:
+            group = self._pending.get(key)
+            if group is None:
+                group = self._pending[key] = _PushGroup(time.monotonic() + self.window)
+            group.branches.setdefault(branch, []).append(future)
+            group.set_upstream |= set_upstream
+            self._cond.notify()
+        return future
+
+    def flush(self, timeout: float = None):
+        """Sends everything pending now and waits for in-flight pushes to finish."""
+        with self._cond:
+            for group in self._pending.values():
+                group.due = 0
+            self._cond.notify()
+            self._cond.wait_for(lambda: not self._pending and not self._inflight, timeout)
+
+    def _loop(self):
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                ready = [k for k, g in self._pending.items() if g.due <= now and k not in self._inflight]
+                for key in ready:
+                    group = self._pending.pop(key)
+                    self._inflight.add(key)
+                    self._executor.submit(self._push_group, key, group)
+                waiting = [g.due for k, g in self._pending.items() if k not in self._inflight]
+                self._cond.wait(max(0.0, min(waiting) - now) if waiting else None)
+
+    def _push_group(self, key: Tuple[Path, str], group: _PushGroup):
+        workspace_path, remote = key
+        cmd = ['git', 'push']
+        if group.set_upstream:
+            cmd.append('-u')
+        cmd += [remote] + list(group.branches)
+        error = None
+        try:
+            for attempt in range(self.max_attempts):
+                try:
+                    self._run_push(cmd, workspace_path)
+                    error = None
+                    break
+                except subprocess.CalledProcessError as e:
+                    error = e
+                    if attempt + 1 < self.max_attempts:
+                        delay = self.backoff * (2 ** attempt)
+                        print(f"PushScheduler: Push of {', '.join(group.branches)} failed, retrying in {delay:.1f}s...")
+                        time.sleep(delay)
+        except BaseException as e: # e.g. the workspace was removed or git is missing: not worth retrying
+            print(f"PushScheduler: Push of {', '.join(group.branches)} failed: {e}")
+            error = e
+        finally:
+            for futures in group.branches.values():
+                for future in futures:
+                    if future.done():
+                        continue
+                    if error is None:
+                        future.set_result(True)
+                    else:
+                        future.set_exception(error)
+            with self._cond:
+                self._inflight.discard(key)
+                self._cond.notify_all()
+
+    def _run_push(self, cmd: List[str], cwd: Path):
+        print(f"PushScheduler: {' '.join(cmd)} ({cwd})")
+        subprocess.run(cmd, cwd=cwd, capture_output=True, text=True, check=True)
+
+    def shutdown(self):
+        self.flush()
+        self._executor.shutdown(wait=True)
@@ -1,19 +1,29 @@
+import os
 import shutil
 from pathlib import Path
+from typing import Optional
 from bus import EventBus
 from events import RequestWorkspace, WorkspaceReady
+from .workspace_pool import WorkspacePool
 
 class WorkspaceHandler:
-    def __init__(self, bus: EventBus):
+    def __init__(self, bus: EventBus, pool: Optional[WorkspacePool] = None):
         self.bus = bus
+        self.pool = pool
         self.bus.subscribe(RequestWorkspace, self.on_request)
 
     def on_request(self, event: RequestWorkspace):
         workspace_name = event.recipient
         workspace_path = event.base_workdir / workspace_name
         
+        claimed = None
         if workspace_path.exists():
             print(f"Using existing workspace: {workspace_path}")
+        elif self.pool and event.repo_url and (claimed := self.pool.claim(event.repo_url)):
+            # A warm workspace is already cloned and fetched; only branching is left.
+            workspace_path.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(claimed, workspace_path)
+            print(f"Claimed warm workspace {claimed.name} as {workspace_path}")
         else:
             workspace_path.mkdir(parents=True, exist_ok=True)
             print(f"Created new workspace: {workspace_path}")
@@ -30,4 +40,4 @@ class WorkspaceHandler:
             print(f"WorkspaceHandler: Copying {event.report_template_path} to {target_path}")
             shutil.copy2(event.report_template_path, target_path)
 
-        self.bus.emit(WorkspaceReady(path=workspace_path))
+        self.bus.emit(WorkspaceReady(request_id=event.request_id, path=workspace_path))
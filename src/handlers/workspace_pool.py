@@ -0,0 +1,127 @@
+import hashlib
+import shutil
+import subprocess
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+READY_MARKER = "pool-ready" # Written into .git once a workspace is fully prepared
+
+class WorkspacePool:
+    """
+    Keeps up to `size` ready-to-use workspaces per repository: cloned, fetched
+    and reset to the default branch. A background thread refills the pool and
+    refreshes idle workspaces every `refresh_interval` seconds. With `mirror`
+    (repo url -> local bare mirror, e.g. GitHandler.ensure_mirror) idle
+    workspaces are refreshed from the mirror, which is fetched once per repo.
+    """
+
+    def __init__(self, pool_dir: Path, size: int, clone: Callable[[str, Path], None], refresh_interval: float = 300,
+                 mirror: Optional[Callable[[str], Optional[Path]]] = None):
+        self.pool_dir = pool_dir
+        self.size = size
+        self.clone = clone
+        self.mirror = mirror
+        self.refresh_interval = refresh_interval
+        self._ready: Dict[str, List[Path]] = {}
+        self._refreshed: Dict[Path, float] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = threading.Thread(target=self._refill_loop, daemon=True, name="workspace-pool")
+        self._thread.start()
+
+    def _repo_dir(self, repo_url: str) -> Path:
+        name = repo_url.rstrip("/").split("/")[-1].replace(".git", "")
+        key = hashlib.sha1(repo_url.encode('utf-8')).hexdigest()[:12]
+        return self.pool_dir / f"{name}-{key}"
+
+    def warm(self, repo_url: str):
+        """Starts keeping warm workspaces for repo_url, adopting any left from a previous run."""
+        with self._lock:
+            if repo_url in self._ready:
+                return
+            ready = []
+            repo_dir = self._repo_dir(repo_url)
+            if repo_dir.exists():
+                for path in repo_dir.iterdir():
+                    if (path / ".git" / READY_MARKER).exists():
+                        ready.append(path)
+                    else:
+                        shutil.rmtree(path, ignore_errors=True) # Interrupted fill
+            self._ready[repo_url] = ready
+        self._wake.set()
+
+    def claim(self, repo_url: str) -> Optional[Path]:
+        """Takes a warm workspace for repo_url (None if none is ready) and schedules a refill."""
+        self.warm(repo_url)
+        with self._lock:
+            ready = self._ready[repo_url]
+            path = ready.pop() if ready else None
+            if path:
+                self._refreshed.pop(path, None)
+        self._wake.set()
+        if path:
+            (path / ".git" / READY_MARKER).unlink(missing_ok=True)
+        return path
+
+    def _fill_one(self, repo_url: str):
+        path = self._repo_dir(repo_url) / uuid.uuid4().hex[:8]
+        try:
+            path.mkdir(parents=True)
+            self.clone(repo_url, path)
+            (path / ".git" / READY_MARKER).touch()
+        except Exception as e:
+            print(f"WorkspacePool: Failed to prepare workspace for {repo_url}: {e}")
+            shutil.rmtree(path, ignore_errors=True)
+            return False
+        with self._lock:
+            self._ready[repo_url].append(path)
+            self._refreshed[path] = time.time()
+        return True
+
+    def _refresh(self, path: Path, mirror: Optional[Path] = None):
+        """Fetches (from the mirror if there is one) and resets a warm workspace to the remote default branch."""
+        if mirror:
+            fetch = ['git', 'fetch', '--quiet', str(mirror), '+refs/heads/*:refs/remotes/origin/*']
+        else:
+            fetch = ['git', 'fetch', '--quiet', 'origin']
+        subprocess.run(fetch, cwd=path, check=True, capture_output=True)
+        subprocess.run(['git', 'reset', '--quiet', '--hard', 'origin/HEAD'], cwd=path, check=True, capture_output=True)
+        subprocess.run(['git', 'clean', '-fdq'], cwd=path, check=True, capture_output=True)
+
+    def _refresh_stale(self, repo_url: str):
+        now = time.time()
+        with self._lock:
+            stale = [p for p in self._ready[repo_url] if now - self._refreshed.get(p, 0) >= self.refresh_interval]
+            # Take them out while refreshing so they cannot be claimed mid-reset.
+            for path in stale:
+                self._ready[repo_url].remove(path)
+        if not stale:
+            return
+        mirror = self.mirror(repo_url) if self.mirror else None # One network fetch for all of them
+        for path in stale:
+            try:
+                self._refresh(path, mirror)
+            except (subprocess.CalledProcessError, OSError) as e: # OSError: the workspace was removed from disk
+                print(f"WorkspacePool: Refresh failed for {path}, discarding it: {e}")
+                shutil.rmtree(path, ignore_errors=True)
+                continue
+            with self._lock:
+                self._ready[repo_url].append(path)
+                self._refreshed[path] = time.time()
+
+    def _refill_loop(self):
+        while True:
+            self._wake.wait(timeout=self.refresh_interval)
+            self._wake.clear()
+            with self._lock:
+                repos = list(self._ready)
+            for repo_url in repos:
+                self._refresh_stale(repo_url)
+                while True:
+                    with self._lock:
+                        missing = self.size - len(self._ready[repo_url])
+                    if missing <= 0 or not self._fill_one(repo_url):
+                        break
@@ -0,0 +1,111 @@
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# Pipeline stages in the order they complete.
+STAGES = ["detected", "workspace", "git", "branch", "bootstrap", "coding", "reporting", "pushed"]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    request_id     TEXT PRIMARY KEY,
+    source_path    TEXT,
+    workspace_path TEXT,
+    stage          TEXT NOT NULL,
+    status         TEXT NOT NULL DEFAULT 'active',
+    failed         INTEGER NOT NULL DEFAULT 0,
+    updated_at     REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS transitions (
+    request_id TEXT NOT NULL,
+    stage      TEXT NOT NULL,
+    at         REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS transitions_by_task ON transitions (request_id);
+"""
+
+class TaskLedger:
+    """Durable record of each task's last completed pipeline stage (SQLite)."""
+
+    def __init__(self, db_path: Path):
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(tasks)")}
+        if 'failed' not in columns: # Ledger written before the outcome was stored
+            self._conn.execute("ALTER TABLE tasks ADD COLUMN failed INTEGER NOT NULL DEFAULT 0")
+
+    def get(self, request_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT source_path, workspace_path, stage, status, failed FROM tasks WHERE request_id = ?",
+                (request_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            'source_path': Path(row[0]) if row[0] else None,
+            'workspace_path': Path(row[1]) if row[1] else None,
+            'stage': row[2],
+            'status': row[3],
+            'failed': bool(row[4]),
+        }
+
+    def record(self, request_id: str, stage: str, source_path: Optional[Path] = None, workspace_path: Optional[Path] = None,
+               failed: Optional[bool] = None):
+        """
+        Marks `stage` as completed. Stages never move backwards for a task.
+        `failed` stores the run's outcome once it is known (e.g. with "pushed"), so a resume finishes it the same way.
+        """
+        if stage not in STAGES:
+            raise ValueError(f"Unknown stage: {stage}")
+        now = time.time()
+        advanced = True
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT stage FROM tasks WHERE request_id = ?", (request_id,)).fetchone()
+            if row is None:
+                self._conn.execute(
+                    "INSERT INTO tasks (request_id, source_path, workspace_path, stage, failed, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                    (request_id, _str(source_path), _str(workspace_path), stage, int(bool(failed)), now)
+                )
+            else:
+                current = row[0]
+                if STAGES.index(stage) <= STAGES.index(current):
+                    stage = current
+                    advanced = False
+                self._conn.execute(
+                    # A late event for a finished task must not reopen it; a failed task being retried is active again.
+                    "UPDATE tasks SET stage = ?, status = CASE WHEN status = 'done' THEN status ELSE 'active' END, updated_at = ?,"
+                    " source_path = COALESCE(?, source_path), workspace_path = COALESCE(?, workspace_path),"
+                    " failed = COALESCE(?, failed) WHERE request_id = ?",
+                    (stage, now, _str(source_path), _str(workspace_path), None if failed is None else int(failed), request_id)
+                )
+            if advanced:
+                self._conn.execute("INSERT INTO transitions (request_id, stage, at) VALUES (?, ?, ?)", (request_id, stage, now))
+
+    def finish(self, request_id: str, status: str):
+        """Marks a task 'done' or 'failed'. Failed tasks are resumed on the next run."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE tasks SET status = ?, updated_at = ? WHERE request_id = ?",
+                (status, time.time(), request_id)
+            )
+
+    def history(self, request_id: str) -> List[str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT stage FROM transitions WHERE request_id = ? ORDER BY rowid", (request_id,)
+            ).fetchall()
+        return [r[0] for r in rows]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+def _str(path: Optional[Path]) -> Optional[str]:
+    return str(path) if path is not None else None
@@ -2,8 +2,9 @@ import argparse
 from pathlib import Path
 from bus import EventBus
 from pipeline import Pipeline
+from ledger import TaskLedger
 from monitor import Monitor
-from handlers import GitHandler, WorkspaceHandler, AgentHandler
+from handlers import GitHandler, WorkspaceHandler, AgentHandler, WorkspacePool, PushScheduler
 from events import TaskDetected
 
 def main():
@@ -12,20 +13,36 @@ def main():
     parser.add_argument("--workdir", type=str, default="workspaces", help="Base directory for workspaces")
     parser.add_argument("--push", action="store_true", help="Push the feature branch to origin")
     parser.add_argument("--watch", type=str, nargs='?', const='tasks', help="Monitor the specified directory for new requests (defaults to 'tasks')")
+    parser.add_argument("--concurrency", type=int, default=8, help="Maximum number of tasks processed at once (default 8)")
+    parser.add_argument("--ledger", type=str, help="SQLite task ledger used to resume tasks after a restart (defaults to <workdir>/ledger.sqlite3)")
+    parser.add_argument("--mirror-dir", type=str, help="Directory of shared bare mirrors used to clone workspaces (defaults to <workdir>/.mirrors)")
+    parser.add_argument("--no-mirror", action="store_true", help="Clone every workspace directly from the remote")
+    parser.add_argument("--pool-size", type=int, default=0, help="Number of pre-warmed workspaces kept per repository (default 0, disabled)")
+    parser.add_argument("--warm-repo", action="append", default=[], help="Repository URL to pre-warm at startup (repeatable)")
+    parser.add_argument("--async-bus", action="store_true", help="Dispatch events through per-handler queues instead of inline calls")
+    parser.add_argument("--agent-timeout", type=float, default=1800, help="Seconds before a hung agent is killed (default 1800)")
     
     args = parser.parse_args()
     base_workdir = Path(args.workdir).absolute()
     
     # 1. Initialize Infrastructure
-    bus = EventBus()
+    bus = EventBus(async_dispatch=args.async_bus, workers=args.concurrency)
+    ledger = TaskLedger(Path(args.ledger).absolute() if args.ledger else base_workdir / "ledger.sqlite3")
     
     # 2. Initialize Handlers
-    _git = GitHandler(bus)
-    _ws = WorkspaceHandler(bus)
-    _agent = AgentHandler(bus)
+    mirror_dir = None if args.no_mirror else (Path(args.mirror_dir).absolute() if args.mirror_dir else base_workdir / ".mirrors")
+    pusher = PushScheduler()
+    _git = GitHandler(bus, mirror_dir=mirror_dir, pusher=pusher)
+    pool = None
+    if args.pool_size > 0:
+        pool = WorkspacePool(base_workdir / ".pool", args.pool_size, clone=_git.clone_into, mirror=_git.ensure_mirror)
+        for repo_url in args.warm_repo:
+            pool.warm(repo_url)
+    _ws = WorkspaceHandler(bus, pool=pool)
+    _agent = AgentHandler(bus, pusher=pusher, agent_timeout=args.agent_timeout)
     
     # 3. Initialize Orchestrator
-    _pipeline = Pipeline(bus, base_workdir, push_on_finish=args.push)
+    _pipeline = Pipeline(bus, base_workdir, push_on_finish=args.push, concurrency=args.concurrency, ledger=ledger)
     
     # 4. Trigger Entry Point
     if args.watch:
@@ -33,6 +50,10 @@ def main():
         watch_dir = Path(args.watch).absolute()
         monitor = Monitor(bus, watch_dir)
         monitor.watch()
+        _pipeline.shutdown(wait=False)
+        bus.shutdown(wait=False)
+        _agent.shutdown()
+        pusher.shutdown()
     elif args.request_file:
         # CLI single file mode
         request_file_path = Path(args.request_file).absolute()
@@ -42,6 +63,12 @@ def main():
         
         print(f"Starting pipeline for {request_file_path}...")
         bus.emit(TaskDetected(path=request_file_path))
+        _pipeline.join()
+        bus.flush() # Let trailing events (ledger writes, logging) finish before the pools close
+        _pipeline.shutdown()
+        bus.shutdown()
+        _agent.shutdown()
+        pusher.shutdown()
     else:
         parser.print_help()
 
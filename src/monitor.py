@@ -1,32 +1,109 @@
+import os
 import time
 from pathlib import Path
+from typing import Dict, Tuple
 from bus import EventBus
 from events import TaskDetected
+from utils.inotify import Inotify
+from utils.parser import is_request
 
 class Monitor:
-    def __init__(self, bus: EventBus, watch_dir: Path):
+    def __init__(self, bus: EventBus, watch_dir: Path, debounce: float = 0.5):
         self.bus = bus
         self.watch_dir = watch_dir
+        self.debounce = debounce
         self._seen_files = set()
+        # (mtime_ns, size) of every non-request file already inspected, so it is
+        # only re-read once it changes.
+        self._index: Dict[Path, Tuple[int, int]] = {}
+        # Files modified too recently to be read safely; rechecked once settled.
+        self._settling: Dict[Path, float] = {}
+
+    def _check(self, file_path: Path, settled: bool = False):
+        """Inspects one file; `settled` means the writer is known to have closed it."""
+        if file_path in self._seen_files:
+            return
+        try:
+            st = os.stat(file_path)
+        except FileNotFoundError:
+            self._index.pop(file_path, None)
+            self._settling.pop(file_path, None)
+            return
+
+        key = (st.st_mtime_ns, st.st_size)
+        if self._index.get(file_path) == key:
+            return
+
+        # Debounce partial writes: wait until the file has been quiet for a while.
+        age = time.time() - st.st_mtime_ns / 1e9
+        if not settled and age < self.debounce:
+            self._settling[file_path] = time.monotonic() + (self.debounce - age)
+            return
+        self._settling.pop(file_path, None)
+
+        # The parser caches the header by (mtime, size), so the pipeline reuses this parse.
+        if is_request(file_path, st):
+            self._seen_files.add(file_path)
+            self._index.pop(file_path, None)
+            self.bus.emit(TaskDetected(path=file_path.absolute()))
+        else:
+            self._index[file_path] = key
+
+    def _check_settled(self):
+        now = time.monotonic()
+        for file_path, due in list(self._settling.items()):
+            if due <= now:
+                self._check(file_path)
 
     def scan(self):
         """One-time scan of the directory for new task files."""
         if not self.watch_dir.exists():
             return
 
-        for file_path in self.watch_dir.glob("*.md"):
-            if file_path not in self._seen_files:
-                # Basic check if it's an implementation request
-                if "ID: IRQ-" in file_path.read_text(encoding='utf-8'):
-                    self.bus.emit(TaskDetected(path=file_path.absolute()))
-                    self._seen_files.add(file_path)
+        present = set()
+        with os.scandir(self.watch_dir) as entries:
+            for entry in entries:
+                if entry.name.endswith(".md") and entry.is_file():
+                    file_path = self.watch_dir / entry.name
+                    present.add(file_path)
+                    self._check(file_path)
+
+        # Forget files that have disappeared
+        for file_path in list(self._index):
+            if file_path not in present:
+                del self._index[file_path]
 
     def watch(self, interval: int = 5):
-        """Continuous watch loop."""
-        print(f"Monitoring {self.watch_dir} for new tasks...")
+        """Continuous watch loop. Uses inotify where available, polling otherwise."""
+        inotify = Inotify.create(self.watch_dir) if self.watch_dir.is_dir() else None
+        mode = "inotify" if inotify else f"polling every {interval}s"
+        print(f"Monitoring {self.watch_dir} for new tasks ({mode})...")
         try:
+            self.scan()
             while True:
-                self.scan()
-                time.sleep(interval)
+                if inotify is None:
+                    time.sleep(interval)
+                    self.scan()
+                    continue
+
+                timeout = None
+                if self._settling:
+                    timeout = max(0.0, min(self._settling.values()) - time.monotonic())
+                names = inotify.read(timeout)
+                if '*gone*' in names:
+                    print(f"Monitor: {self.watch_dir} went away, falling back to polling.")
+                    inotify.close()
+                    inotify = None
+                    continue
+                if '*overflow*' in names:
+                    self.scan()
+                # inotify only reports close-after-write and rename-into, so the file is complete.
+                for name in names:
+                    if name.endswith(".md"):
+                        self._check(self.watch_dir / name, settled=True)
+                self._check_settled()
         except KeyboardInterrupt:
             print("Monitor stopped.")
+        finally:
+            if inotify is not None:
+                inotify.close()
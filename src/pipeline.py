@@ -1,69 +1,226 @@
 import shutil
 import subprocess
 import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from bus import EventBus
 from events import (
     TaskDetected, RequestWorkspace, WorkspaceReady,
     RequestGitClone, GitReady, RequestBranch, BranchReady,
-    RequestCommit, StartCoding, WorkCompleted, RequestPush
+    RequestCommit, CommitCompleted, StartCoding, PhaseCompleted,
+    WorkCompleted, RequestPush, PushCompleted, TaskFailed
 )
-from utils.parser import extract_metadata
+from ledger import TaskLedger
+from scheduler import DagScheduler, CycleError
+from utils.parser import extract_metadata, blockers, MetadataError
+from utils.gitread import GitReader, GitReadError
+from utils.artifacts import template_path
+
+BOOTSTRAP_PREFIX = "[implementation bootstrap]: "
+BOOTSTRAP_REF_PREFIX = "refs/bootstrap/"
+BOOTSTRAP_INDEX_MARKER = "kanban-bootstrap-indexed" # In .git once old bootstrap commits have refs
 
 class Pipeline:
-    def __init__(self, bus: EventBus, base_workdir: Path, push_on_finish: bool = False):
+    def __init__(self, bus: EventBus, base_workdir: Path, push_on_finish: bool = False, concurrency: int = 8,
+                 ledger: Optional[TaskLedger] = None):
         self.bus = bus
         self.base_workdir = base_workdir
         self.push_on_finish = push_on_finish
-        self._current_task: Dict[str, Any] = {}
+        self.concurrency = max(1, concurrency)
+        self.ledger = ledger
+
+        # Per-task contexts keyed by request id. A task waits in the scheduler
+        # until its blockers are done and a slot frees up, then is 'active'
+        # until WorkCompleted (or a failure).
+        self._tasks: Dict[str, Dict[str, Any]] = {}
+        self._scheduler = DagScheduler(is_done=self._done_in_ledger)
+        self._active: set = set()
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="task")
 
         # Wiring
         self.bus.subscribe(TaskDetected, self.on_task_detected)
         self.bus.subscribe(WorkspaceReady, self.on_workspace_ready)
         self.bus.subscribe(GitReady, self.on_git_ready)
         self.bus.subscribe(BranchReady, self.on_branch_ready)
+        self.bus.subscribe(CommitCompleted, self.on_commit_completed)
+        self.bus.subscribe(PhaseCompleted, self.on_phase_completed)
         self.bus.subscribe(WorkCompleted, self.on_work_completed)
+        self.bus.subscribe(PushCompleted, self.on_push_completed)
+        self.bus.subscribe(TaskFailed, self.on_task_failed)
+
+    # --- Task admission ---
+
+    def _done_in_ledger(self, request_id: str) -> bool:
+        entry = self.ledger.get(request_id) if self.ledger else None
+        return bool(entry) and entry['status'] == "done"
+
+    def _dispatch(self):
+        """Starts ready tasks, longest critical path first, while slots are free (caller holds the lock)."""
+        busy_recipients = {self._tasks[rid]['metadata']['recipient'] for rid in self._active}
+        while len(self._active) < self.concurrency:
+            # Tasks for the same recipient share a workspace directory, so they run one after another.
+            request_id = self._scheduler.take(lambda rid: self._tasks[rid]['metadata']['recipient'] not in busy_recipients)
+            if request_id is None:
+                break
+            self._active.add(request_id)
+            busy_recipients.add(self._tasks[request_id]['metadata']['recipient'])
+            self._executor.submit(self._start_task, request_id)
+
+    def _is_idle(self) -> bool:
+        # Tasks still waiting on blockers that are not queued here cannot make progress on their own.
+        return not self._active and not self._scheduler.ready_count
+
+    def _start_task(self, request_id: str):
+        # With a synchronous bus this runs the whole task; with an async bus it
+        # only kicks it off and the slot is held until WorkCompleted/TaskFailed.
+        try:
+            self._resume(request_id)
+        except Exception as e:
+            print(f"Pipeline: Task {request_id} failed: {e}")
+            self._finish_task(request_id, failed=True)
+
+    def _resume(self, request_id: str):
+        """Continues a task after its last stage recorded in the ledger."""
+        task = self._tasks[request_id]
+        entry = self.ledger.get(request_id) if self.ledger else None
+        stage = entry['stage'] if entry else None
+        if stage in (None, "detected"):
+            self._request_workspace(request_id)
+            return
+
+        workspace_path = entry['workspace_path']
+        task['workspace_path'] = workspace_path
+        print(f"Pipeline: Resuming task {request_id} after stage '{stage}'.")
+        if stage == "workspace":
+            self.on_workspace_ready(WorkspaceReady(request_id=request_id, path=workspace_path))
+        elif stage == "git":
+            self.on_git_ready(GitReady(request_id=request_id, workspace_path=workspace_path))
+        elif stage == "branch":
+            self.on_branch_ready(BranchReady(request_id=request_id, workspace_path=workspace_path))
+        elif stage in ("bootstrap", "coding"):
+            self._start_coding(request_id, skip_coding=(stage == "coding"))
+        elif stage == "reporting":
+            self.on_work_completed(WorkCompleted(request_id=request_id))
+        else:
+            self._finish_task(request_id, failed=entry['failed']) # Pushed: only the outcome is left to record
+
+    def _record(self, request_id: str, stage: str, **fields):
+        if self.ledger:
+            self.ledger.record(request_id, stage, **fields)
+
+    def _finish_task(self, request_id: str, failed: bool = False):
+        with self._lock:
+            if request_id not in self._active:
+                return
+            if self.ledger:
+                self.ledger.finish(request_id, "failed" if failed else "done")
+            self._active.discard(request_id)
+            self._tasks.pop(request_id, None)
+            if failed:
+                held = self._scheduler.fail(request_id)
+                if held:
+                    print(f"Pipeline: {', '.join(held)} stay blocked until {request_id} succeeds.")
+            else:
+                for released in self._scheduler.complete(request_id):
+                    print(f"Pipeline: Task {released} unblocked by {request_id}.")
+            self._dispatch()
+            if self._is_idle():
+                self._idle.notify_all()
+
+    def join(self, timeout: float = None) -> bool:
+        """Blocks until every detected task has finished, or waits on a blocker that is not queued."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        # With an async bus, an emitted TaskDetected may not have reached on_task_detected yet.
+        if not self.bus.flush(timeout):
+            return False
+        remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+        with self._lock:
+            return self._idle.wait_for(self._is_idle, remaining)
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
+
+    # --- Event handlers ---
 
     def on_task_detected(self, event: TaskDetected):
         print(f"Task detected: {event.path}")
-        metadata = extract_metadata(event.path)
-        self._current_task = {
-            'metadata': metadata,
-            'source_path': event.path
-        }
-        
+        try:
+            metadata = extract_metadata(event.path)
+        except MetadataError as e:
+            print(f"Pipeline: Ignoring invalid request: {e}")
+            return
+        request_id = metadata['id']
+
+        entry = self.ledger.get(request_id) if self.ledger else None
+        if entry and entry['status'] == "done":
+            print(f"Pipeline: Task {request_id} already completed (ledger). Skipping.")
+            with self._lock:
+                if self._scheduler.complete(request_id): # Tasks detected before it may be waiting on it
+                    self._dispatch()
+            return
+
+        with self._lock:
+            if request_id in self._tasks:
+                print(f"Pipeline: Task {request_id} is already queued or running. Ignoring.")
+                return
+            try:
+                ready = self._scheduler.add(request_id, blockers(metadata))
+            except CycleError as e:
+                print(f"Pipeline: Ignoring {request_id}: {e}")
+                return
+            self._tasks[request_id] = {
+                'metadata': metadata,
+                'source_path': event.path
+            }
+            self._record(request_id, "detected", source_path=event.path)
+            if not ready:
+                print(f"Pipeline: Task {request_id} waits for {', '.join(self._scheduler.blockers_of(request_id))}.")
+            self._dispatch()
+            if request_id in self._scheduler and ready:
+                print(f"Pipeline: Task {request_id} queued ({len(self._active)}/{self.concurrency} slots busy).")
+
+    def _request_workspace(self, request_id: str):
+        task = self._tasks[request_id]
+        metadata = task['metadata']
+
         repo_url = metadata['repo']
         repo_name = repo_url.split("/")[-1].replace(".git", "")
-        
-        # Determine report template path
-        report_template = Path("artifact_templates/implementation_report.md")
-        if not report_template.exists():
-             # Try absolute path if relative fails (for different execution contexts)
-             report_template = Path(__file__).parent.parent / "artifact_templates" / "implementation_report.md"
+
+        report_template = template_path("implementation_report")
 
         self.bus.emit(RequestWorkspace(
-            request_id=metadata['id'],
+            request_id=request_id,
             recipient=metadata['recipient'],
             repo_name=repo_name,
             base_workdir=self.base_workdir,
-            source_path=event.path,
-            report_template_path=report_template if report_template.exists() else None
+            source_path=task['source_path'],
+            report_template_path=report_template if report_template.exists() else None,
+            repo_url=repo_url
         ))
 
     def on_workspace_ready(self, event: WorkspaceReady):
-        self._current_task['workspace_path'] = event.path
-        metadata = self._current_task['metadata']
-        
+        task = self._tasks[event.request_id]
+        task['workspace_path'] = event.path
+        metadata = task['metadata']
+        self._record(event.request_id, "workspace", workspace_path=event.path)
+
         self.bus.emit(RequestGitClone(
+            request_id=event.request_id,
             repo_url=metadata['repo'],
             workspace_path=event.path
         ))
 
     def on_git_ready(self, event: GitReady):
-        metadata = self._current_task['metadata']
-        
+        metadata = self._tasks[event.request_id]['metadata']
+        self._record(event.request_id, "git")
+
         self.bus.emit(RequestBranch(
+            request_id=event.request_id,
             workspace_path=event.workspace_path,
             base_commit=metadata['base_commit'],
             feature_branch=metadata['feature_branch']
@@ -71,69 +228,139 @@ class Pipeline:
 
     def on_branch_ready(self, event: BranchReady):
         workspace_path = event.workspace_path
-        metadata = self._current_task['metadata']
-        source_path = self._current_task['source_path']
-        
+        task = self._tasks[event.request_id]
+        metadata = task['metadata']
+        source_path = task['source_path']
+        self._record(event.request_id, "branch")
+
         # Request Injection & Initial Commit
         repo_name = metadata['repo'].split("/")[-1].replace(".git", "")
         request_id = metadata['id']
         target_request_path = workspace_path / "implementation_request.md"
         target_report_path = workspace_path / "implementation_report.md"
-        
+
         numeric_match = re.search(r'(\d+)$', request_id)
         numeric_id = numeric_match.group(1).zfill(4) if numeric_match else "0000"
-        commit_msg = f"[implementation bootstrap]: {repo_name}-{numeric_id}"
+        commit_msg = f"{BOOTSTRAP_PREFIX}{repo_name}-{numeric_id}"
+        bootstrap_ref = f"{BOOTSTRAP_REF_PREFIX}{repo_name}-{numeric_id}"
 
         # Check if bootstrap commit exists (by message prefix)
-        print(f"Pipeline: Checking for bootstrap commit starting with '[implementation bootstrap]: {repo_name}-{numeric_id}'...")
-        log_check = subprocess.run(
-            ['git', 'log', '--grep', f"\\[implementation bootstrap\\]: {repo_name}-{numeric_id}"], 
-            cwd=workspace_path, capture_output=True, text=True
-        )
-        
-        if f"[implementation bootstrap]: {repo_name}-{numeric_id}" not in log_check.stdout:
+        print(f"Pipeline: Checking for bootstrap commit starting with '{commit_msg}'...")
+
+        if not self._has_bootstrap_commit(workspace_path, commit_msg, bootstrap_ref, metadata['base_commit']):
             print(f"Pipeline: Bootstrap commit not found. Injecting request and report template...")
             # We copy here too as a fail-safe if WorkspaceHandler was bypassed or for existing workspaces
             shutil.copy2(source_path, target_request_path)
-            
-            report_template = Path("artifact_templates/implementation_report.md")
-            if not report_template.exists():
-                report_template = Path(__file__).parent.parent / "artifact_templates" / "implementation_report.md"
+
+            report_template = template_path("implementation_report")
             if report_template.exists():
                 shutil.copy2(report_template, target_report_path)
 
             self.bus.emit(RequestCommit(
+                request_id=request_id,
                 workspace_path=workspace_path,
                 request_file=target_request_path, # Legacy field, GitHandler now adds all
-                commit_message=commit_msg
+                commit_message=commit_msg,
+                bootstrap_ref=bootstrap_ref
             ))
-            self._current_task['bootstrap_skipped'] = False
+            task['bootstrap_skipped'] = False
         else:
             print(f"Pipeline: Bootstrap commit already exists. Skipping injection.")
-            self._current_task['bootstrap_skipped'] = True
-        
+            task['bootstrap_skipped'] = True
+            self.on_commit_completed(CommitCompleted(request_id=request_id, workspace_path=workspace_path))
+
+    def _has_bootstrap_commit(self, workspace_path: Path, commit_msg: str, bootstrap_ref: str, base_commit: str = None) -> bool:
+        # Bootstrap commits are recorded under refs/bootstrap/; the commit counts only if it is
+        # on the current branch. Without such a ref (e.g. the commit was pulled in from the
+        # remote) the branch is scanned back to the base commit. Fall back to git log on anything unusual.
+        try:
+            reader = GitReader(workspace_path)
+            self._backfill_bootstrap_refs(reader, workspace_path)
+            head = reader.head()
+            if head is None:
+                return False
+            sha = reader.read_ref(bootstrap_ref)
+            if sha is not None and reader.is_ancestor(sha, head):
+                return True
+            return reader.has_commit_with_subject(commit_msg, since=base_commit, start=head)
+        except (GitReadError, OSError, subprocess.CalledProcessError):
+            pass
+        log_check = subprocess.run(
+            ['git', 'log', '--fixed-strings', '--grep', commit_msg],
+            cwd=workspace_path, capture_output=True, text=True
+        )
+        return commit_msg in log_check.stdout
+
+    def _backfill_bootstrap_refs(self, reader: GitReader, workspace_path: Path):
+        """One-time scan that gives bootstrap commits made before refs/bootstrap/ existed their ref."""
+        marker = reader.git_dir / BOOTSTRAP_INDEX_MARKER
+        if marker.exists():
+            return
+        print(f"Pipeline: Indexing existing bootstrap commits in {workspace_path} (one-time)...")
+        log = subprocess.run(
+            ['git', 'log', '--all', '--fixed-strings', '--grep', BOOTSTRAP_PREFIX, '--format=%H %s'],
+            cwd=workspace_path, capture_output=True, text=True, check=True
+        )
+        for line in log.stdout.splitlines():
+            sha, _, subject = line.partition(" ")
+            if not subject.startswith(BOOTSTRAP_PREFIX):
+                continue
+            ref = BOOTSTRAP_REF_PREFIX + subject[len(BOOTSTRAP_PREFIX):].strip()
+            if reader.read_ref(ref) is None:
+                subprocess.run(['git', 'update-ref', ref, sha], cwd=workspace_path, capture_output=True, check=True)
+        marker.touch()
+
+    def on_commit_completed(self, event: CommitCompleted):
+        self._record(event.request_id, "bootstrap")
         # Now trigger the agent
+        self._start_coding(event.request_id)
+
+    def _start_coding(self, request_id: str, skip_coding: bool = False):
+        task = self._tasks[request_id]
         print(f"Pipeline: Starting coding phase for task {request_id}...")
         self.bus.emit(StartCoding(
-            workspace_path=workspace_path,
-            context=metadata
+            request_id=request_id,
+            workspace_path=task['workspace_path'],
+            context=task['metadata'],
+            skip_coding=skip_coding
         ))
 
+    def on_phase_completed(self, event: PhaseCompleted):
+        self._record(event.request_id, event.phase)
+
     def on_work_completed(self, event: WorkCompleted):
-        print("Work completed by agent.")
-        
+        print(f"Work completed by agent for task {event.request_id}.")
+        task = self._tasks[event.request_id]
+
         if event.diff == "FAILED_NO_DONE_COMMIT":
             print("Agent failed (no DONE commit). Skipping post-work steps.")
+            self._finish_task(event.request_id, failed=True)
             return
 
         if self.push_on_finish:
-            # We ALWAYS push at the end of a successful run to ensure 
+            # We ALWAYS push at the end of a successful run to ensure
             # all agent commits are on remote, even if bootstrap was skipped.
-            metadata = self._current_task['metadata']
+            # A run that failed its final checks is pushed too, but still finishes as failed.
+            task['failed'] = bool(event.diff)
+            metadata = task['metadata']
             print(f"Pipeline: Requesting final push for branch {metadata['feature_branch']}...")
             self.bus.emit(RequestPush(
-                workspace_path=self._current_task['workspace_path'],
+                request_id=event.request_id,
+                workspace_path=task['workspace_path'],
                 feature_branch=metadata['feature_branch']
             ))
-        
-        print(f"Pipeline finished for task {self._current_task['metadata']['id']}")
+            # The task is finished once the push is confirmed.
+            return
+
+        print(f"Pipeline finished for task {event.request_id}")
+        self._finish_task(event.request_id, failed=bool(event.diff))
+
+    def on_push_completed(self, event: PushCompleted):
+        task = self._tasks.get(event.request_id, {})
+        self._record(event.request_id, "pushed", failed=task.get('failed', False))
+        print(f"Pipeline finished for task {event.request_id}")
+        self._finish_task(event.request_id, failed=task.get('failed', False))
+
+    def on_task_failed(self, event: TaskFailed):
+        print(f"Pipeline: Task {event.request_id} failed: {event.error}")
+        self._finish_task(event.request_id, failed=True)
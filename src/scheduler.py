@@ -0,0 +1,177 @@
+import heapq
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+class CycleError(ValueError):
+    """Adding a task would make the dependency graph cyclic."""
+
+class _Node:
+    __slots__ = ('task_id', 'weight', 'blockers', 'dependents', 'waiting', 'state', 'priority')
+    def __init__(self, task_id: str):
+        self.task_id = task_id
+        self.weight = 0.0
+        self.blockers: Set[str] = set()
+        self.dependents: Set[str] = set()
+        self.waiting = 0 # Blockers not done yet
+        self.state = 'unknown' # unknown (only named as a blocker) | pending | ready | running | done | failed
+        self.priority = 0.0 # Critical-path length: own weight plus the longest chain of unfinished dependents
+
+class DagScheduler:
+    """
+    Releases tasks once all their blockers are done, longest critical path first.
+
+    Tasks may arrive in any order: a blocker that has not been seen yet is kept
+    as a placeholder until it is added (or `is_done` reports it finished
+    earlier, e.g. from the ledger). Priorities and readiness are updated
+    incrementally on add() and complete(). Not thread-safe; the caller locks.
+    """
+
+    def __init__(self, is_done: Optional[Callable[[str], bool]] = None):
+        self.is_done = is_done or (lambda task_id: False)
+        self._nodes: Dict[str, _Node] = {}
+        self._ready: List[tuple] = [] # Heap of (-priority, seq, task_id); stale entries are skipped
+        self._seq = 0
+        self._ready_count = 0
+
+    def __contains__(self, task_id: str) -> bool:
+        node = self._nodes.get(task_id)
+        return node is not None and node.state in ('pending', 'ready')
+
+    @property
+    def ready_count(self) -> int:
+        return self._ready_count
+
+    @property
+    def waiting(self) -> List[str]:
+        """Tasks held back by unfinished blockers."""
+        return [n.task_id for n in self._nodes.values() if n.state == 'pending']
+
+    def state(self, task_id: str) -> Optional[str]:
+        node = self._nodes.get(task_id)
+        return node.state if node else None
+
+    def priority(self, task_id: str) -> float:
+        return self._nodes[task_id].priority
+
+    def blockers_of(self, task_id: str) -> List[str]:
+        """Unfinished blockers of a task."""
+        node = self._nodes[task_id]
+        return sorted(b for b in node.blockers if self._nodes[b].state != 'done')
+
+    def _node(self, task_id: str) -> _Node:
+        node = self._nodes.get(task_id)
+        if node is None:
+            node = self._nodes[task_id] = _Node(task_id)
+            if self.is_done(task_id):
+                node.state = 'done'
+        return node
+
+    def _push_ready(self, node: _Node):
+        if node.state != 'ready':
+            node.state = 'ready'
+            self._ready_count += 1
+        self._seq += 1
+        heapq.heappush(self._ready, (-node.priority, self._seq, node.task_id))
+
+    def _reaches(self, start: _Node, targets: Set[str]) -> bool:
+        stack, seen = [start], {start.task_id}
+        while stack:
+            for tid in stack.pop().dependents:
+                if tid in targets:
+                    return True
+                if tid not in seen:
+                    seen.add(tid)
+                    stack.append(self._nodes[tid])
+        return False
+
+    def _raise_priorities(self, node: _Node):
+        # Walk up through the blockers while their critical path grows.
+        stack = [node]
+        while stack:
+            child = stack.pop()
+            for tid in child.blockers:
+                blocker = self._nodes[tid]
+                if blocker.state in ('done', 'failed'):
+                    continue
+                candidate = blocker.weight + child.priority
+                if candidate > blocker.priority:
+                    blocker.priority = candidate
+                    if blocker.state == 'ready':
+                        self._push_ready(blocker) # Re-queued at its new priority
+                    stack.append(blocker)
+
+    def add(self, task_id: str, blockers: Iterable[str] = (), weight: float = 1.0) -> bool:
+        """Adds a task; returns True if it is ready to run now. Raises CycleError on a dependency cycle."""
+        blockers = set(blockers) - {task_id}
+        node = self._node(task_id)
+        if node.state in ('pending', 'ready', 'running'):
+            return node.state == 'ready'
+        if blockers and node.dependents and self._reaches(node, blockers):
+            raise CycleError(f"{task_id} and its blockers {sorted(blockers)} depend on each other")
+
+        for tid in node.blockers: # Re-added after a failure: forget the old edges
+            self._nodes[tid].dependents.discard(task_id)
+        node.blockers = blockers
+        node.weight = weight
+        node.waiting = 0
+        for tid in blockers:
+            blocker = self._node(tid)
+            blocker.dependents.add(task_id)
+            if blocker.state != 'done':
+                node.waiting += 1
+
+        node.priority = weight + max(
+            (self._nodes[d].priority for d in node.dependents if self._nodes[d].state not in ('done', 'failed')),
+            default=0.0)
+        node.state = 'pending'
+        self._raise_priorities(node)
+        if node.waiting == 0:
+            self._push_ready(node)
+            return True
+        return False
+
+    def take(self, accept: Callable[[str], bool] = lambda task_id: True) -> Optional[str]:
+        """Pops the highest-priority ready task that `accept`s, marking it running."""
+        skipped, found = [], None
+        while self._ready:
+            entry = heapq.heappop(self._ready)
+            node = self._nodes.get(entry[2])
+            if node is None or node.state != 'ready' or -entry[0] != node.priority:
+                continue # Stale entry
+            if accept(node.task_id):
+                found = node
+                break
+            skipped.append(entry)
+        for entry in skipped:
+            heapq.heappush(self._ready, entry)
+        if found is None:
+            return None
+        found.state = 'running'
+        self._ready_count -= 1
+        return found.task_id
+
+    def complete(self, task_id: str) -> List[str]:
+        """Marks a task done; returns the dependents that became ready."""
+        node = self._node(task_id)
+        if node.state == 'done':
+            return []
+        if node.state == 'ready':
+            self._ready_count -= 1
+        node.state = 'done'
+        released = []
+        for tid in node.dependents:
+            dependent = self._nodes[tid]
+            if dependent.state != 'pending':
+                continue
+            dependent.waiting -= 1
+            if dependent.waiting == 0:
+                self._push_ready(dependent)
+                released.append(tid)
+        return released
+
+    def fail(self, task_id: str) -> List[str]:
+        """Marks a task failed; its dependents stay blocked until it is re-added and completes. Returns them."""
+        node = self._node(task_id)
+        if node.state == 'ready':
+            self._ready_count -= 1
+        node.state = 'failed'
+        return sorted(tid for tid in node.dependents if self._nodes[tid].state == 'pending')
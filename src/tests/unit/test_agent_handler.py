@@ -0,0 +1,54 @@
+import unittest
+import sys
+import os
+import asyncio
+import shutil
+import tempfile
+from pathlib import Path
+
+# Add src to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from bus import EventBus
+from handlers.agent_handler import AgentHandler
+from agent_supervisor import SUCCEEDED, TIMED_OUT
+
+def _running(pid):
+    # An orphan that was killed may linger as a zombie until init reaps it.
+    try:
+        return Path(f"/proc/{pid}/stat").read_text().split(") ")[1][0] not in "ZX"
+    except FileNotFoundError:
+        return False
+
+@unittest.skipUnless(os.path.isdir("/proc"), "uses POSIX process groups and /proc")
+class TestAgentHandlerUnit(unittest.TestCase):
+    def setUp(self):
+        self.workspace = Path(tempfile.mkdtemp())
+        self.handler = AgentHandler(EventBus(), agent_timeout=1)
+
+    def tearDown(self):
+        self.handler.shutdown()
+        self.handler.pusher.shutdown()
+        shutil.rmtree(self.workspace)
+
+    def _run(self, code):
+        cmd = [sys.executable, "-c", code]
+        return asyncio.run_coroutine_threadsafe(self.handler._supervise(cmd, self.workspace), self.handler._loop).result()
+
+    def test_agents_run_through_the_supervisor(self):
+        run = self._run("print('working')")
+        self.assertEqual((run.status, run.returncode), (SUCCEEDED, 0))
+        self.assertEqual(list(run.stdout_tail), ["working\n"])
+
+    def test_hung_agent_is_killed_with_its_children(self):
+        pid_file = self.workspace / "child.pid"
+        run = self._run(
+            "import subprocess, sys, time\n"
+            f"child = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(60)'])\n"
+            f"open({str(pid_file)!r}, 'w').write(str(child.pid))\n"
+            "time.sleep(60)"
+        )
+        self.assertEqual(run.status, TIMED_OUT)
+        self.assertFalse(_running(int(pid_file.read_text())))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+import unittest
+import sys
+import os
+import re
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+# Add src to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from utils.artifacts import ArtifactValidator, template_path
+
+def fill_template(name):
+    """The template with every field and guidance paragraph replaced by real content."""
+    lines = []
+    in_header = False
+    for i, line in enumerate(template_path(name).read_text(encoding='utf-8').splitlines()):
+        if line.strip() == '---' or line.startswith('# Metadata'):
+            in_header = not in_header if line.strip() == '---' else True
+            lines.append(line)
+        elif line.startswith('#'):
+            in_header = False
+            lines.append(line)
+            lines.append(f"Written by the agent for line {i}.")
+        elif in_header and ':' in line:
+            key = line.split(':', 1)[0]
+            lines.append(f"{key}: value-{i}")
+        elif not line.strip():
+            lines.append(line)
+    return "\n".join(lines) + "\n"
+
+class TestArtifactValidatorUnit(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.validator = ArtifactValidator()
+        self.report = self.test_dir / "implementation_report.md"
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def _write(self, text):
+        self.report.write_text(text, encoding='utf-8')
+        # Make sure the change is visible even on coarse mtime clocks.
+        st = os.stat(self.report)
+        os.utime(self.report, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+    def test_untouched_template_is_rejected(self):
+        shutil.copy(template_path("implementation_report"), self.report)
+        result = self.validator.validate(self.report, "implementation_report")
+        self.assertFalse(result.ok)
+        self.assertIn("outcome", result.unfilled_fields)
+        self.assertIn("summary / context", result.empty_sections)
+        # Headings that only group subsections need no text of their own.
+        self.assertNotIn("guideline realization", result.empty_sections)
+
+    def test_filled_artifacts_pass(self):
+        for name in ("implementation_report", "quality_report"):
+            self._write(fill_template(name))
+            result = self.validator.validate(self.report, name)
+            self.assertTrue(result.ok, str(result))
+
+    def test_missing_and_empty(self):
+        text = fill_template("implementation_report")
+        text = text.replace("feature_branch:", "branch:")
+        text = re.sub(r"(## Performance considerations\s*\n)[^\n#]*\n", r"\1\n", text)
+        text = text.replace("# References", "# Links")
+        self._write(text)
+        result = self.validator.validate(self.report, "implementation_report")
+        self.assertEqual(result.missing_fields, ["feature_branch"])
+        self.assertEqual(result.empty_sections, ["self assessment / performance considerations"])
+        self.assertEqual(result.missing_sections, ["references"])
+        self.assertIn("missing section 'references'", str(result))
+
+    def test_incremental_revalidation(self):
+        text = fill_template("implementation_report")
+        self._write(text)
+        first = self.validator.validate(self.report, "implementation_report")
+        with patch('builtins.open', side_effect=AssertionError("re-read an unchanged file")):
+            self.assertIs(self.validator.validate(self.report, "implementation_report"), first)
+        self._write(text.replace("# References\n", "# References\nSee the design doc.\n"))
+        second = self.validator.validate(self.report, "implementation_report")
+        self.assertTrue(second.ok)
+        self.assertEqual(second.changed_sections, ["references"])
+
+    def test_headings_in_code_blocks_are_text(self):
+        text = fill_template("implementation_report").replace(
+            "# References\n", "# References\n```\n# Summary\n```\n")
+        self._write(text)
+        self.assertTrue(self.validator.validate(self.report, "implementation_report").ok)
+
+    def test_missing_artifact(self):
+        result = self.validator.validate(self.test_dir / "nope.md", "implementation_report")
+        self.assertEqual(result.problems(), ["artifact not found"])
+
+    def test_speed(self):
+        paths = []
+        for i in range(300):
+            path = self.test_dir / f"report_{i}.md"
+            path.write_text(fill_template("implementation_report"), encoding='utf-8')
+            paths.append(path)
+        start = time.perf_counter()
+        for path in paths:
+            self.assertTrue(self.validator.validate(path, "implementation_report").ok)
+        cold = time.perf_counter() - start
+        start = time.perf_counter()
+        for path in paths:
+            self.validator.validate(path, "implementation_report")
+        warm = time.perf_counter() - start
+        self.assertLess(cold, 2.0)
+        self.assertLess(warm, cold)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+import unittest
+import sys
+import os
+import shutil
+import subprocess
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+# Add src to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+import pipeline
+from bus import EventBus
+from events import RequestCommit
+from handlers.git_handler import GitHandler
+from pipeline import Pipeline, BOOTSTRAP_PREFIX, BOOTSTRAP_INDEX_MARKER
+from utils.gitread import GitReadError
+
+@unittest.skipIf(shutil.which("git") is None, "git not found in PATH")
+class TestBootstrapRefsUnit(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.repo = self.test_dir / "repo"
+        self.repo.mkdir()
+        self._git('init', '-q', '-b', 'main')
+        self._git('config', 'user.name', 'test')
+        self._git('config', 'user.email', 'test@example.com')
+        self._git('commit', '-q', '--allow-empty', '-m', 'base')
+        self.pipeline = Pipeline(EventBus(), self.test_dir)
+
+    def tearDown(self):
+        self.pipeline.shutdown()
+        shutil.rmtree(self.test_dir)
+
+    def _git(self, *args):
+        return subprocess.run(['git', *args], cwd=self.repo, capture_output=True, text=True, check=True).stdout
+
+    def _has(self, name, base="TBD"):
+        return self.pipeline._has_bootstrap_commit(self.repo, BOOTSTRAP_PREFIX + name, "refs/bootstrap/" + name, base)
+
+    def test_new_bootstrap_commit_gets_a_ref(self):
+        git = GitHandler(EventBus()) # No remote: the push fails and is only logged
+        (self.repo / "implementation_request.md").write_text("request")
+        git.on_commit(RequestCommit(request_id="IRQ-1", workspace_path=self.repo, request_file=self.repo / "implementation_request.md",
+                                    commit_message=BOOTSTRAP_PREFIX + "repo-0001", bootstrap_ref="refs/bootstrap/repo-0001"))
+        self.assertEqual(self._git('rev-parse', 'refs/bootstrap/repo-0001'), self._git('rev-parse', 'HEAD'))
+        self.assertTrue(self._has("repo-0001"))
+        self.assertFalse(self._has("repo-0002"))
+
+    def test_backfills_old_bootstrap_commits_once(self):
+        # Made before refs/bootstrap existed.
+        self._git('commit', '-q', '--allow-empty', '-m', BOOTSTRAP_PREFIX + "repo-0007")
+        old = self._git('rev-parse', 'HEAD')
+        self._git('commit', '-q', '--allow-empty', '-m', 'agent work')
+
+        self.assertTrue(self._has("repo-0007"))
+        self.assertEqual(self._git('rev-parse', 'refs/bootstrap/repo-0007'), old)
+        self.assertTrue((self.repo / ".git" / BOOTSTRAP_INDEX_MARKER).exists())
+
+        # Later checks need no git log: a bootstrap commit that reached the branch
+        # without a ref (e.g. pulled from the remote) is found in-process.
+        self._git('commit', '-q', '--allow-empty', '-m', BOOTSTRAP_PREFIX + "repo-0008")
+        real_run = subprocess.run
+        calls = []
+        def recording_run(cmd, *args, **kwargs):
+            calls.append(cmd)
+            return real_run(cmd, *args, **kwargs)
+        with patch.object(pipeline.subprocess, 'run', side_effect=recording_run):
+            self.assertTrue(self._has("repo-0007"))
+            self.assertTrue(self._has("repo-0008"))
+            self.assertFalse(self._has("repo-0009"))
+        self.assertEqual(calls, [])
+
+    def test_only_commits_on_the_current_branch_count(self):
+        self._git('checkout', '-q', '-b', 'feat/a')
+        self._git('commit', '-q', '--allow-empty', '-m', BOOTSTRAP_PREFIX + "repo-0005")
+        self._git('update-ref', 'refs/bootstrap/repo-0005', 'HEAD')
+        self.assertTrue(self._has("repo-0005"))
+        self._git('checkout', '-q', 'main')
+        self._git('checkout', '-q', '-b', 'feat/b')
+        self.assertFalse(self._has("repo-0005")) # The ref exists, but on another branch
+
+    def test_scan_stops_at_the_base_commit(self):
+        self._git('commit', '-q', '--allow-empty', '-m', BOOTSTRAP_PREFIX + "repo-0006")
+        (self.repo / ".git" / BOOTSTRAP_INDEX_MARKER).touch() # Skip the backfill: the commit has no ref
+        base = self._git('rev-parse', 'HEAD').strip()
+        self._git('commit', '-q', '--allow-empty', '-m', 'agent work')
+        self.assertTrue(self._has("repo-0006"))
+        self.assertFalse(self._has("repo-0006", base=base))
+
+    def test_falls_back_to_git_log(self):
+        self._git('commit', '-q', '--allow-empty', '-m', BOOTSTRAP_PREFIX + "repo-0003")
+        with patch.object(pipeline, 'GitReader', side_effect=GitReadError("unsupported repository")):
+            self.assertTrue(self._has("repo-0003"))
+            self.assertFalse(self._has("repo-0004"))
+
+if __name__ == "__main__":
+    unittest.main()
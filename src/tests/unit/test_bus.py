@@ -0,0 +1,125 @@
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# Add src to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from bus import EventBus
+from events import TaskDetected, TaskFailed, PhaseCompleted, WorkCompleted, RequestWorkspace
+from ledger import TaskLedger
+from pipeline import Pipeline
+
+class Recorder:
+    """Subscriber whose first handler is slow, so a later event of another type could overtake it."""
+    def __init__(self, bus):
+        self.seen = []
+        self.lock = threading.Lock()
+        bus.subscribe(PhaseCompleted, self.on_phase)
+        bus.subscribe(WorkCompleted, self.on_work)
+
+    def on_phase(self, event):
+        time.sleep(0.05)
+        with self.lock:
+            self.seen.append(("phase", event.request_id))
+
+    def on_work(self, event):
+        with self.lock:
+            self.seen.append(("work", event.request_id))
+
+class TestEventBusUnit(unittest.TestCase):
+    def test_per_task_order_across_event_types(self):
+        bus = EventBus(async_dispatch=True, workers=4)
+        recorder = Recorder(bus)
+        for rid in ("a", "b", "c"):
+            bus.emit(PhaseCompleted(request_id=rid, phase="reporting"))
+            bus.emit(WorkCompleted(request_id=rid))
+        self.assertTrue(bus.flush(5))
+        bus.shutdown()
+        for rid in ("a", "b", "c"):
+            self.assertEqual([kind for kind, r in recorder.seen if r == rid], ["phase", "work"])
+
+    def test_tasks_run_in_parallel(self):
+        bus = EventBus(async_dispatch=True, workers=4)
+        bus.subscribe(WorkCompleted, lambda e: time.sleep(0.2))
+        start = time.monotonic()
+        for rid in "abcd":
+            bus.emit(WorkCompleted(request_id=rid))
+        self.assertTrue(bus.flush(5))
+        self.assertLess(time.monotonic() - start, 0.6)
+        bus.shutdown()
+
+    def test_backpressure(self):
+        bus = EventBus(async_dispatch=True, workers=1, queue_size=2)
+        gate = threading.Event()
+        bus.subscribe(WorkCompleted, lambda e: gate.wait(5))
+        bus.emit(WorkCompleted(request_id="1"))
+        bus.emit(WorkCompleted(request_id="2"))
+        emitted = threading.Event()
+        threading.Thread(target=lambda: (bus.emit(WorkCompleted(request_id="3")), emitted.set()), daemon=True).start()
+        self.assertFalse(emitted.wait(0.2)) # Queue full: emit blocks
+        gate.set()
+        self.assertTrue(emitted.wait(5))
+        self.assertTrue(bus.flush(5))
+        bus.shutdown()
+
+    def test_handler_failure_emits_task_failed(self):
+        bus = EventBus(async_dispatch=True)
+        failed = []
+        def boom(event):
+            raise RuntimeError("boom")
+        bus.subscribe(WorkCompleted, boom)
+        bus.subscribe(TaskFailed, failed.append)
+        bus.emit(WorkCompleted(request_id="x"))
+        self.assertTrue(bus.flush(5))
+        bus.shutdown()
+        self.assertEqual(len(failed), 1)
+        self.assertIn("boom", failed[0].error)
+
+    def test_flush_times_out(self):
+        bus = EventBus(async_dispatch=True)
+        gate = threading.Event()
+        bus.subscribe(WorkCompleted, lambda e: gate.wait(5))
+        bus.emit(WorkCompleted(request_id="x"))
+        self.assertFalse(bus.flush(0.1))
+        gate.set()
+        self.assertTrue(bus.flush(5))
+        bus.shutdown()
+
+class TestAsyncPipelineUnit(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.ledger = TaskLedger(self.test_dir / "ledger.sqlite3")
+        self.bus = EventBus(async_dispatch=True)
+        self.pipeline = Pipeline(self.bus, self.test_dir, concurrency=2, ledger=self.ledger)
+        # Stand-in for the handlers: every task finishes as soon as its workspace is requested.
+        def finish(event):
+            self.bus.emit(PhaseCompleted(request_id=event.request_id, phase="reporting"))
+            self.bus.emit(WorkCompleted(request_id=event.request_id))
+        self.bus.subscribe(RequestWorkspace, finish)
+        self.request = self.test_dir / "request.md"
+        self.request.write_text("---\nid: IRQ-1\nrecipient: Coder\nrepo: repo\nbase_commit: TBD\n---\n")
+
+    def tearDown(self):
+        self.pipeline.shutdown()
+        self.bus.shutdown()
+        self.ledger.close()
+        shutil.rmtree(self.test_dir)
+
+    def test_join_waits_for_queued_task_detected(self):
+        self.bus.emit(TaskDetected(path=self.request))
+        self.assertTrue(self.pipeline.join(5))
+        self.assertEqual(self.ledger.get("IRQ-1")['status'], "done")
+
+    def test_late_stage_does_not_reopen_finished_task(self):
+        self.bus.emit(TaskDetected(path=self.request))
+        self.assertTrue(self.pipeline.join(5))
+        self.ledger.record("IRQ-1", "reporting") # A delayed write after the task finished
+        self.assertEqual(self.ledger.get("IRQ-1")['status'], "done")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import unittest
+import sys
+import os
+import shutil
+import subprocess
+import tempfile
+from pathlib import Path
+
+# Add src to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from bus import EventBus
+from handlers.git_handler import GitHandler
+
+@unittest.skipIf(shutil.which("git") is None, "git not found in PATH")
+class TestGitMirrorUnit(unittest.TestCase):
+    """A local repository stands in for the remote."""
+
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.upstream = self.test_dir / "upstream"
+        self.upstream.mkdir()
+        self._git('init', '-q', '-b', 'main')
+        self._commit("base")
+        self.repo_url = str(self.upstream)
+        self.mirror_dir = self.test_dir / "mirrors"
+        self.git = GitHandler(EventBus(), mirror_dir=self.mirror_dir, mirror_refresh_interval=3600)
+        self.commands = []
+        run_git = self.git._run_git
+        def recording_run_git(args, cwd):
+            self.commands.append(args[0])
+            return run_git(args, cwd)
+        self.git._run_git = recording_run_git
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def _git(self, *args, cwd=None):
+        return subprocess.run(
+            ['git', '-c', 'user.name=test', '-c', 'user.email=test@example.com', *args],
+            cwd=cwd or self.upstream, capture_output=True, text=True, check=True
+        ).stdout
+
+    def _commit(self, content):
+        (self.upstream / "file.txt").write_text(content)
+        self._git('add', '.')
+        self._git('commit', '-q', '-m', content)
+
+    def _workspace(self, name, files=()):
+        path = self.test_dir / name
+        path.mkdir()
+        for f in files:
+            (path / f).write_text("existing")
+        return path
+
+    def _alternates(self, workspace):
+        alternates = workspace / ".git" / "objects" / "info" / "alternates"
+        return alternates.read_text().strip() if alternates.exists() else None
+
+    def test_workspaces_borrow_objects_from_one_mirror(self):
+        first, second = self._workspace("ws1"), self._workspace("ws2")
+        self.git.clone_into(self.repo_url, first)
+        self.git.clone_into(self.repo_url, second)
+        self.assertEqual(self.commands.count('clone'), 3) # One mirror, then a --shared clone per workspace
+
+        mirror = self.git.ensure_mirror(self.repo_url)
+        for ws in (first, second):
+            self.assertEqual((ws / "file.txt").read_text(), "base")
+            self.assertEqual(Path(self._alternates(ws)).resolve(), (mirror / "objects").resolve())
+            # Pushes still go to the real remote, not to the mirror.
+            self.assertEqual(self._git('remote', 'get-url', 'origin', cwd=ws).strip(), self.repo_url)
+            self.assertEqual(list((ws / ".git" / "objects" / "pack").glob("*.pack")), [])
+        self.assertEqual(self._git('config', 'gc.pruneExpire', cwd=mirror).strip(), "never")
+
+    def test_non_empty_workspace_uses_the_mirror(self):
+        ws = self._workspace("ws", files=["implementation_request.md"])
+        self.git.clone_into(self.repo_url, ws)
+        self.assertIsNotNone(self._alternates(ws))
+        self.assertEqual(self._git('rev-parse', 'origin/main', cwd=ws), self._git('rev-parse', 'HEAD'))
+        self.assertEqual(self._git('remote', 'get-url', 'origin', cwd=ws).strip(), self.repo_url)
+
+    def test_mirror_is_refreshed_at_most_once_per_interval(self):
+        mirror = self.git.ensure_mirror(self.repo_url)
+        self._commit("updated")
+        self.git.ensure_mirror(self.repo_url)
+        self.assertNotIn('fetch', self.commands)
+
+        self.git.mirror_refresh_interval = 0
+        self.git.ensure_mirror(self.repo_url)
+        self.assertEqual(self.commands.count('fetch'), 1)
+        self.assertEqual(self._git('rev-parse', 'main', cwd=mirror), self._git('rev-parse', 'HEAD'))
+
+    def test_without_mirror_dir_clones_directly(self):
+        git = GitHandler(EventBus(), mirror_dir=None)
+        ws = self._workspace("ws")
+        git.clone_into(self.repo_url, ws)
+        self.assertIsNone(self._alternates(ws))
+        self.assertEqual((ws / "file.txt").read_text(), "base")
+        self.assertFalse(self.mirror_dir.exists())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import unittest
+import sys
+import os
+import shutil
+import subprocess
+import tempfile
+from pathlib import Path
+
+# Add src to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from utils.gitread import GitReader
+
+@unittest.skipIf(shutil.which("git") is None, "git not found in PATH")
+class TestGitReadUnit(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.repo = Path(self.test_dir) / "repo"
+        self.repo.mkdir()
+        self._git('init', '-q')
+        content = "".join(f"line {i} of a file that is large enough to be deltified\n" for i in range(2000))
+        for i in range(20):
+            (self.repo / "file.txt").write_text(content[:i * 3000] + f"change {i}\n")
+            self._git('add', '.')
+            self._git('commit', '-q', '-m', f"commit {i}\n\nbody of commit {i}")
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def _git(self, *args, cwd=None):
+        return subprocess.run(
+            ['git', '-c', 'user.name=test', '-c', 'user.email=test@example.com', *args],
+            cwd=cwd or self.repo, capture_output=True, text=True, check=True
+        ).stdout
+
+    def _assert_matches_cli(self, reader: GitReader):
+        self.assertEqual(reader.last_commit_message(), self._git('log', '-1', '--pretty=%B').strip())
+        self.assertEqual(reader.head(), self._git('rev-parse', 'HEAD').strip())
+        for sha in self._git('rev-list', 'HEAD').split():
+            blob = self._git('rev-parse', f"{sha}:file.txt").strip()
+            self.assertEqual(reader.read_object(blob)[1].decode('utf-8'), self._git('cat-file', '-p', blob))
+
+    def test_loose_objects(self):
+        self._assert_matches_cli(GitReader(self.repo))
+
+    def test_packed_objects_and_refs(self):
+        """Objects come from a deltified pack and refs from packed-refs after gc."""
+        self._git('gc', '-q', '--aggressive')
+        self.assertTrue((self.repo / ".git" / "packed-refs").exists())
+        self._assert_matches_cli(GitReader(self.repo))
+
+    def test_alternates(self):
+        """A --shared clone reads objects through objects/info/alternates."""
+        self._git('gc', '-q')
+        clone = Path(self.test_dir) / "clone"
+        self._git('clone', '-q', '--shared', str(self.repo), str(clone), cwd=self.test_dir)
+        reader = GitReader(clone)
+        self.assertEqual(reader.last_commit_message(), "commit 19\n\nbody of commit 19")
+
+    def test_has_commit_with_subject_since_base(self):
+        reader = GitReader(self.repo)
+        base = self._git('rev-parse', 'HEAD~5').strip()
+        self.assertTrue(reader.has_commit_with_subject("commit 17", since=base))
+        self.assertFalse(reader.has_commit_with_subject("commit 3\n", since=base))
+        self.assertTrue(reader.has_commit_with_subject("commit 3\n"))
+        self.assertEqual(reader.branch_tip(reader.head_ref()), reader.head())
+
+    def test_has_commit_with_subject_since_base_on_merge_history(self):
+        """Commits reachable from the base through a merged side branch are excluded too."""
+        base = self._git('rev-parse', 'HEAD').strip()
+        self._git('checkout', '-q', '-b', 'side', 'HEAD~10')
+        self._git('commit', '-q', '--allow-empty', '-m', 'side work')
+        self._git('checkout', '-q', '-')
+        self._git('commit', '-q', '--allow-empty', '-m', 'main work')
+        self._git('merge', '-q', '--no-ff', '-m', 'merge side', 'side')
+        reader = GitReader(self.repo)
+        self.assertTrue(reader.has_commit_with_subject("side work", since=base))
+        self.assertTrue(reader.has_commit_with_subject("main work", since=base))
+        self.assertFalse(reader.has_commit_with_subject("commit 3\n", since=base))
+        self.assertFalse(reader.has_commit_with_subject("commit 19", since=base))
+        self.assertFalse(reader.has_commit_with_subject("side work", since="side"))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+
+# Add src to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from bus import EventBus
+from events import (
+    TaskDetected, RequestWorkspace, RequestGitClone, RequestBranch,
+    RequestCommit, StartCoding, RequestPush
+)
+from ledger import TaskLedger, STAGES
+from pipeline import Pipeline
+
+class TestTaskLedgerUnit(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.ledger = TaskLedger(self.test_dir / "ledger.sqlite3")
+
+    def tearDown(self):
+        self.ledger.close()
+        shutil.rmtree(self.test_dir)
+
+    def test_stages_only_move_forward(self):
+        self.ledger.record("IRQ-1", "detected", source_path=Path("req.md"))
+        self.ledger.record("IRQ-1", "workspace", workspace_path=Path("ws"))
+        self.ledger.record("IRQ-1", "git")
+        self.ledger.record("IRQ-1", "workspace") # Late duplicate
+        entry = self.ledger.get("IRQ-1")
+        self.assertEqual((entry['stage'], entry['status']), ("git", "active"))
+        self.assertEqual((entry['source_path'], entry['workspace_path']), (Path("req.md"), Path("ws")))
+        self.assertEqual(self.ledger.history("IRQ-1"), ["detected", "workspace", "git"])
+        with self.assertRaises(ValueError):
+            self.ledger.record("IRQ-1", "unknown")
+
+    def test_outcome_is_kept(self):
+        self.ledger.record("IRQ-1", "reporting")
+        self.assertFalse(self.ledger.get("IRQ-1")['failed'])
+        self.ledger.record("IRQ-1", "pushed", failed=True)
+        self.ledger.record("IRQ-1", "pushed") # A later write without an outcome keeps it
+        self.assertTrue(self.ledger.get("IRQ-1")['failed'])
+
+    def test_survives_reopen(self):
+        self.ledger.record("IRQ-1", "coding", workspace_path=Path("ws"))
+        self.ledger.close()
+        self.ledger = TaskLedger(self.test_dir / "ledger.sqlite3")
+        self.assertEqual(self.ledger.get("IRQ-1")['stage'], "coding")
+        self.assertIsNone(self.ledger.get("IRQ-2"))
+
+    def test_failed_task_is_active_again_when_retried(self):
+        self.ledger.record("IRQ-1", "coding")
+        self.ledger.finish("IRQ-1", "failed")
+        self.assertEqual(self.ledger.get("IRQ-1")['status'], "failed")
+        self.ledger.record("IRQ-1", "coding")
+        self.assertEqual(self.ledger.get("IRQ-1")['status'], "active")
+
+class TestPipelineResumeUnit(unittest.TestCase):
+    """A restarted pipeline picks a task up right after the last stage in the ledger."""
+
+    FIRST_EVENT = {
+        "detected": RequestWorkspace,
+        "workspace": RequestGitClone,
+        "git": RequestBranch,
+        "branch": RequestCommit,
+        "bootstrap": StartCoding,
+        "coding": StartCoding,
+        "reporting": RequestPush,
+    }
+
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.workspace = self.test_dir / "Coder1"
+        self.workspace.mkdir()
+        self.request = self.test_dir / "request.md"
+        self.request.write_text("# Metadata\nID: IRQ-1\nRecipient: Coder1\nRepo: repo\nBase Commit: TBD\nFeature Branch: feat/irq-1\n")
+        self.ledger = TaskLedger(self.test_dir / "ledger.sqlite3")
+
+    def tearDown(self):
+        self.ledger.close()
+        shutil.rmtree(self.test_dir)
+
+    def _resume(self):
+        """Runs a fresh pipeline over the ledger; returns the first event it emits (None if it emits none)."""
+        bus = EventBus()
+        seen = []
+        emitted = threading.Event()
+        def record(event):
+            seen.append(event)
+            emitted.set()
+        for event_type in (RequestWorkspace, RequestGitClone, RequestBranch, RequestCommit, StartCoding, RequestPush):
+            bus.subscribe(event_type, record)
+        pipeline = Pipeline(bus, self.test_dir, push_on_finish=True, ledger=self.ledger)
+        bus.emit(TaskDetected(path=self.request))
+        for _ in range(200):
+            if emitted.is_set() or pipeline.join(0.01):
+                break
+        pipeline.shutdown()
+        return seen[0] if seen else None
+
+    def test_resumes_after_each_stage(self):
+        for stage, expected in self.FIRST_EVENT.items():
+            with self.subTest(stage=stage):
+                self.ledger.record("IRQ-1", stage, source_path=self.request, workspace_path=self.workspace)
+                event = self._resume()
+                self.assertIsInstance(event, expected)
+                if expected is not RequestWorkspace:
+                    self.assertEqual(Path(event.workspace_path), self.workspace)
+                if expected is StartCoding:
+                    self.assertEqual(event.skip_coding, stage == "coding")
+
+    def test_pushed_task_finishes_without_new_work(self):
+        self.ledger.record("IRQ-1", "pushed", workspace_path=self.workspace)
+        self.assertIsNone(self._resume())
+        self.assertEqual(self.ledger.get("IRQ-1")['status'], "done")
+
+    def test_failed_pushed_task_stays_failed(self):
+        # The run failed its final checks and was pushed; the restart happened before it was marked failed.
+        self.ledger.record("IRQ-1", "pushed", workspace_path=self.workspace, failed=True)
+        self.assertIsNone(self._resume())
+        self.assertEqual(self.ledger.get("IRQ-1")['status'], "failed")
+
+    def test_done_task_is_skipped(self):
+        self.ledger.record("IRQ-1", STAGES[-1])
+        self.ledger.finish("IRQ-1", "done")
+        self.assertIsNone(self._resume())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+import threading
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+# Add src to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+import monitor
+from bus import EventBus
+from events import TaskDetected
+from monitor import Monitor
+from utils.inotify import Inotify
+
+REQUEST = "# Metadata\nID: IRQ-1\nRecipient: Coder1\nRepo: repo\nBase Commit: TBD\nFeature Branch: feat/irq-1\n"
+
+class TestMonitorUnit(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.bus = EventBus()
+        self.detected = []
+        self.bus.subscribe(TaskDetected, lambda e: self.detected.append(e.path))
+        self.monitor = Monitor(self.bus, self.test_dir, debounce=0.3)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def _write(self, name, content, age=10.0):
+        path = self.test_dir / name
+        path.write_text(content)
+        if age:
+            past = time.time() - age
+            os.utime(path, (past, past))
+        return path
+
+    def test_detects_each_request_once(self):
+        path = self._write("request.md", REQUEST)
+        self._write("ignored.txt", REQUEST)
+        self.monitor.scan()
+        self.monitor.scan()
+        self.assertEqual(self.detected, [path.absolute()])
+
+    def test_debounces_files_still_being_written(self):
+        path = self._write("request.md", REQUEST, age=0)
+        self.monitor.scan()
+        self.assertEqual(self.detected, [])
+        self.assertIn(path, self.monitor._settling)
+        self.monitor._check_settled() # Not due yet
+        self.assertEqual(self.detected, [])
+        time.sleep(0.35)
+        self.monitor._check_settled()
+        self.assertEqual(self.detected, [path.absolute()])
+
+    def test_unchanged_files_are_not_reread(self):
+        notes = self._write("notes.md", "# Notes\n")
+        with patch.object(monitor, 'is_request', wraps=monitor.is_request) as parse:
+            self.monitor.scan()
+            self.monitor.scan()
+            self.assertEqual(parse.call_count, 1)
+            self._write("notes.md", REQUEST) # Turned into a request
+            self.monitor.scan()
+            self.assertEqual(parse.call_count, 2)
+        self.assertEqual(self.detected, [notes.absolute()])
+
+        notes.unlink()
+        self.monitor.scan()
+        self.assertNotIn(notes, self.monitor._index)
+
+def inotify_available():
+    probe = Inotify.create(Path(tempfile.gettempdir()))
+    if probe is None:
+        return False
+    probe.close()
+    return True
+
+@unittest.skipUnless(inotify_available(), "inotify not available")
+class TestInotifyUnit(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.watch_dir = self.test_dir / "watched"
+        self.watch_dir.mkdir()
+        self.inotify = Inotify.create(self.watch_dir)
+
+    def tearDown(self):
+        self.inotify.close()
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def test_reports_completed_writes_and_renames(self):
+        self.assertEqual(self.inotify.read(0), [])
+        (self.watch_dir / "a.md").write_text("a")
+        (self.test_dir / "b.md").write_text("b")
+        os.replace(self.test_dir / "b.md", self.watch_dir / "b.md")
+        names = []
+        deadline = time.monotonic() + 2
+        while len(names) < 2 and time.monotonic() < deadline:
+            names += self.inotify.read(0.1)
+        self.assertEqual(names, ["a.md", "b.md"])
+
+    def test_reports_removed_directory(self):
+        shutil.rmtree(self.watch_dir)
+        self.assertIn('*gone*', self.inotify.read(2))
+
+    def test_monitor_watch_picks_up_new_files_at_once(self):
+        bus = EventBus()
+        detected = threading.Event()
+        bus.subscribe(TaskDetected, lambda e: detected.set())
+        # A long debounce and poll interval: only inotify can report the file in time.
+        watcher = Monitor(bus, self.watch_dir, debounce=30)
+        threading.Thread(target=watcher.watch, kwargs={'interval': 30}, daemon=True).start()
+        time.sleep(0.2)
+        (self.watch_dir / "request.md").write_text(REQUEST)
+        self.assertTrue(detected.wait(2))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,130 @@
+import unittest
+import sys
+import os
+import io
+import shutil
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+# Add src to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from utils import parser
+from utils.parser import extract_metadata, is_request, MetadataError
+
+REPO_ROOT = Path(__file__).resolve().parents[3]
+
+FRONT_MATTER = """---
+id: IRQ-0042
+recipient: Coder-1
+repo: https://github.com/example/repo.git
+base_commit: 800dae7162d3b9d68ae9b109fb7a00209697f515
+---
+
+# Summary
+Mentions ID: IRQ-9999 and Base Commit: deadbeef in the body, which must not count.
+"""
+
+LEGACY = """# Metadata
+ID: IRQ-TEST-001
+Recipient: Coder0
+Repo: https://github.com/jarek108/testRepo
+Base Commit: TBD
+Feature Branch: feat/0x0001-0-automation
+
+# Summary
+Body.
+"""
+
+class TestParserUnit(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+        parser._cache.clear()
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def _write(self, content, name="request.md"):
+        path = self.test_dir / name
+        path.write_text(content, encoding='utf-8')
+        return path
+
+    def test_front_matter(self):
+        path = self._write(FRONT_MATTER)
+        self.assertTrue(is_request(path))
+        self.assertEqual(extract_metadata(path), {
+            'id': 'IRQ-0042',
+            'recipient': 'Coder-1',
+            'repo': 'https://github.com/example/repo.git',
+            'base_commit': '800dae7162d3b9d68ae9b109fb7a00209697f515',
+            'feature_branch': 'feat/irq-0042', # Derived when absent
+        })
+
+    def test_legacy_header(self):
+        path = self._write(LEGACY)
+        self.assertTrue(is_request(path))
+        metadata = extract_metadata(path)
+        self.assertEqual(metadata['id'], 'IRQ-TEST-001')
+        self.assertEqual(metadata['base_commit'], 'TBD')
+        self.assertEqual(metadata['feature_branch'], 'feat/0x0001-0-automation')
+
+    def test_mock_request_parses(self):
+        metadata = extract_metadata(REPO_ROOT / "mocked" / "mock_implementation_request.md")
+        self.assertEqual(metadata['recipient'], 'Coder0')
+
+    def test_precise_errors(self):
+        path = self._write(FRONT_MATTER.replace("recipient: Coder-1\n", ""))
+        with self.assertRaises(MetadataError) as ctx:
+            extract_metadata(path)
+        self.assertEqual(ctx.exception.field, 'recipient')
+        self.assertIn("required field 'recipient' is missing", str(ctx.exception))
+
+        # The unfilled template placeholder is reported with its line.
+        template = REPO_ROOT / "docs" / "artifact_templates" / "implementation_request.md"
+        with self.assertRaises(MetadataError) as ctx:
+            extract_metadata(template)
+        self.assertEqual((ctx.exception.field, ctx.exception.line), ('base_commit', 5))
+
+        path = self._write(FRONT_MATTER.split("---\n\n")[0], name="open.md")
+        with self.assertRaisesRegex(MetadataError, "not closed"):
+            extract_metadata(path)
+
+    def test_blocked_by(self):
+        path = self._write(FRONT_MATTER.replace("---\n\n", "blocked_by: [IRQ-0040, IRQ-0041]\n---\n\n"))
+        self.assertEqual(parser.blockers(extract_metadata(path)), ['IRQ-0040', 'IRQ-0041'])
+        path = self._write(LEGACY.replace("\n\n", "\nBlocked By: None\n\n", 1), name="legacy.md")
+        self.assertEqual(parser.blockers(extract_metadata(path)), [])
+        path = self._write(FRONT_MATTER.replace("---\n\n", "blocked_by: 12\n---\n\n"), name="bad.md")
+        with self.assertRaisesRegex(MetadataError, "invalid request id '12'"):
+            extract_metadata(path)
+
+    def test_non_requests(self):
+        notes = self._write("# Notes\nID: IRQ-1 mentioned in passing\n", name="notes.md")
+        self.assertFalse(is_request(notes))
+        with self.assertRaisesRegex(MetadataError, "no metadata header"):
+            extract_metadata(notes)
+        self.assertFalse(is_request(self.test_dir / "missing.md"))
+
+    def test_reads_header_only_and_caches(self):
+        path = self._write(FRONT_MATTER + "filler\n" * 100_000)
+        opened = []
+        class CountingFile(io.StringIO):
+            lines_read = 0
+            def __next__(self):
+                self.lines_read += 1
+                return super().__next__()
+        def fake_open(*args, **kwargs):
+            opened.append(CountingFile(path.read_text(encoding='utf-8')))
+            return opened[-1]
+        with patch('builtins.open', side_effect=fake_open):
+            self.assertTrue(is_request(path))
+            extract_metadata(path)
+            extract_metadata(path)
+        self.assertEqual(len(opened), 1) # Monitor and pipeline share one parse
+        self.assertEqual(opened[0].lines_read, 6) # Stopped at the closing '---'
+
+        path.write_text(FRONT_MATTER.replace("Coder-1", "Coder-22"), encoding='utf-8')
+        self.assertEqual(extract_metadata(path)['recipient'], 'Coder-22')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+
+# Add src to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from bus import EventBus
+from events import TaskDetected, RequestWorkspace, WorkCompleted
+from pipeline import Pipeline
+
+class FakeWorker:
+    """Stand-in for the handlers: each task runs for `duration` seconds after its workspace is requested."""
+    def __init__(self, bus, duration=0.05, fail=()):
+        self.bus = bus
+        self.duration = duration
+        self.fail = fail
+        self.lock = threading.Lock()
+        self.running = {} # Request id -> recipient
+        self.started = []
+        self.peak = 0
+        self.peak_per_recipient = 0
+        bus.subscribe(RequestWorkspace, self.on_request)
+
+    def on_request(self, event):
+        with self.lock:
+            self.running[event.request_id] = event.recipient
+            self.started.append(event.request_id)
+            self.peak = max(self.peak, len(self.running))
+            same = sum(1 for r in self.running.values() if r == event.recipient)
+            self.peak_per_recipient = max(self.peak_per_recipient, same)
+        threading.Timer(self.duration, self.finish, args=(event.request_id,)).start()
+
+    def finish(self, request_id):
+        with self.lock:
+            self.running.pop(request_id)
+        diff = "FAILED_NO_DONE_COMMIT" if request_id in self.fail else ""
+        self.bus.emit(WorkCompleted(request_id=request_id, diff=diff))
+
+class TestPipelineConcurrencyUnit(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.bus = EventBus()
+
+    def tearDown(self):
+        self.pipeline.shutdown()
+        shutil.rmtree(self.test_dir)
+
+    def _pipeline(self, concurrency):
+        self.pipeline = Pipeline(self.bus, self.test_dir, concurrency=concurrency)
+
+    def _request(self, request_id, recipient):
+        path = self.test_dir / f"{request_id}.md"
+        path.write_text(f"# Metadata\nID: {request_id}\nRecipient: {recipient}\nRepo: repo\nBase Commit: TBD\nFeature Branch: feat/{request_id}\n")
+        self.bus.emit(TaskDetected(path=path))
+
+    def test_runs_at_most_concurrency_tasks(self):
+        self._pipeline(concurrency=2)
+        worker = FakeWorker(self.bus)
+        for i in range(6):
+            self._request(f"IRQ-{i}", f"Coder{i}")
+        self.assertTrue(self.pipeline.join(5))
+        self.assertEqual(sorted(worker.started), [f"IRQ-{i}" for i in range(6)])
+        self.assertEqual(worker.peak, 2)
+
+    def test_same_recipient_runs_one_at_a_time(self):
+        self._pipeline(concurrency=4)
+        worker = FakeWorker(self.bus)
+        for i in range(3):
+            self._request(f"IRQ-{i}", "Coder0")
+        self._request("IRQ-9", "Coder9")
+        self.assertTrue(self.pipeline.join(5))
+        self.assertEqual(len(worker.started), 4)
+        self.assertEqual(worker.peak_per_recipient, 1)
+        self.assertEqual(worker.peak, 2)
+
+    def test_duplicate_detection_is_ignored(self):
+        self._pipeline(concurrency=2)
+        worker = FakeWorker(self.bus, duration=0.2)
+        self._request("IRQ-1", "Coder1")
+        self._request("IRQ-1", "Coder1") # e.g. the file was saved twice while running
+        self.assertTrue(self.pipeline.join(5))
+        self.assertEqual(worker.started, ["IRQ-1"])
+
+    def test_failed_task_frees_its_slot(self):
+        self._pipeline(concurrency=1)
+        worker = FakeWorker(self.bus, fail=("IRQ-1",))
+        self._request("IRQ-1", "Coder1")
+        self._request("IRQ-2", "Coder2")
+        self.assertTrue(self.pipeline.join(5))
+        self.assertEqual(worker.started, ["IRQ-1", "IRQ-2"])
+
+    def test_join_times_out_while_busy(self):
+        self._pipeline(concurrency=1)
+        FakeWorker(self.bus, duration=0.5)
+        self._request("IRQ-1", "Coder1")
+        self.assertFalse(self.pipeline.join(0.1))
+        self.assertTrue(self.pipeline.join(5))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import unittest
+import sys
+import os
+import shutil
+import subprocess
+import tempfile
+from pathlib import Path
+
+# Add src to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from handlers.push_scheduler import PushScheduler
+
+@unittest.skipIf(shutil.which("git") is None, "git not found in PATH")
+class TestPushSchedulerUnit(unittest.TestCase):
+    """Runs the scheduler against a local bare repository standing in for the remote."""
+
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.remote = self.test_dir / "remote.git"
+        self.workspace = self.test_dir / "workspace"
+        self.workspace.mkdir()
+        self._git('init', '-q', '--bare', str(self.remote), cwd=self.test_dir)
+        self._git('init', '-q')
+        self._git('remote', 'add', 'origin', str(self.remote))
+        self._git('commit', '-q', '--allow-empty', '-m', 'base')
+        self._git('branch', 'feat/a')
+        self._git('branch', 'feat/b')
+
+        self.pushes = []
+        self.scheduler = PushScheduler(window=0.2, backoff=0.05)
+        run_push = self.scheduler._run_push
+        def counting_push(cmd, cwd):
+            self.pushes.append(cmd)
+            run_push(cmd, cwd)
+        self.scheduler._run_push = counting_push
+
+    def tearDown(self):
+        self.scheduler.shutdown()
+        shutil.rmtree(self.test_dir)
+
+    def _git(self, *args, cwd=None):
+        return subprocess.run(
+            ['git', '-c', 'user.name=test', '-c', 'user.email=test@example.com', *args],
+            cwd=cwd or self.workspace, capture_output=True, text=True, check=True
+        ).stdout
+
+    def test_coalesces_branches_into_one_push(self):
+        futures = [
+            self.scheduler.schedule(self.workspace, 'feat/a', set_upstream=True),
+            self.scheduler.schedule(self.workspace, 'feat/a'),
+            self.scheduler.schedule(self.workspace, 'feat/b'),
+        ]
+        for future in futures:
+            self.assertTrue(future.result(timeout=10))
+
+        self.assertEqual(self.pushes, [['git', 'push', '-u', 'origin', 'feat/a', 'feat/b']])
+        remote_refs = self._git('for-each-ref', '--format=%(refname)', cwd=self.remote)
+        self.assertIn('refs/heads/feat/a', remote_refs)
+        self.assertIn('refs/heads/feat/b', remote_refs)
+
+    def test_retries_with_backoff(self):
+        """The first attempt fails because the remote is missing; a later retry succeeds."""
+        shutil.rmtree(self.remote)
+        original = self.scheduler._run_push
+        def recreate_remote_after_failure(cmd, cwd):
+            try:
+                original(cmd, cwd)
+            except subprocess.CalledProcessError:
+                self._git('init', '-q', '--bare', str(self.remote), cwd=self.test_dir)
+                raise
+        self.scheduler._run_push = recreate_remote_after_failure
+
+        self.assertTrue(self.scheduler.schedule(self.workspace, 'feat/a').result(timeout=10))
+        self.assertEqual(len(self.pushes), 2)
+
+    def test_gives_up_after_max_attempts(self):
+        self.scheduler.max_attempts = 2
+        future = self.scheduler.schedule(self.workspace, 'feat/a', remote='nowhere')
+        with self.assertRaises(subprocess.CalledProcessError):
+            future.result(timeout=10)
+        self.assertEqual(len(self.pushes), 2)
+
+    def test_removed_workspace_fails_futures(self):
+        gone = self.test_dir / "gone"
+        futures = [self.scheduler.schedule(gone, 'feat/a'), self.scheduler.schedule(gone, 'feat/b')]
+        for future in futures:
+            with self.assertRaises(OSError):
+                future.result(timeout=10)
+        self.assertEqual(len(self.pushes), 1) # Not retried
+        self.scheduler.flush(timeout=5)
+        self.assertEqual(self.scheduler._inflight, set())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,163 @@
+import unittest
+import sys
+import os
+import re
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+
+# Add src to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from scheduler import DagScheduler, CycleError
+from bus import EventBus
+from events import TaskDetected, RequestWorkspace, WorkCompleted
+from ledger import TaskLedger
+from pipeline import Pipeline
+
+SYNTHBOARD = Path(__file__).resolve().parents[3] / "docs" / "example_data" / "synthboard" / "tasks.md"
+
+def synthboard_tasks():
+    """Task number -> blocker numbers, from the '(Blocked by: ...)' annotations."""
+    tasks = {}
+    for m in re.finditer(r'^(\d+)\. .*\(Blocked by: ([^)]*)\)', SYNTHBOARD.read_text(encoding='utf-8'), re.M):
+        tasks[f"IRQ-{m.group(1)}"] = [f"IRQ-{n}" for n in re.findall(r'\d+', m.group(2))]
+    return tasks
+
+def simulate(order_fn, tasks, slots):
+    """Unit-length tasks on `slots` agents; returns the number of rounds needed."""
+    done, rounds = set(), 0
+    while len(done) < len(tasks):
+        ready = [t for t in tasks if t not in done and all(b in done for b in tasks[t])]
+        batch = order_fn(ready)[:slots]
+        done.update(batch)
+        rounds += 1
+    return rounds
+
+class TestDagSchedulerUnit(unittest.TestCase):
+    def test_releases_in_dependency_order(self):
+        s = DagScheduler()
+        self.assertFalse(s.add("b", ["a"]))
+        self.assertTrue(s.add("a"))
+        self.assertEqual(s.take(), "a")
+        self.assertIsNone(s.take()) # b still blocked
+        self.assertEqual(s.complete("a"), ["b"])
+        self.assertEqual(s.take(), "b")
+
+    def test_critical_path_first(self):
+        s = DagScheduler()
+        s.add("short")
+        s.add("long")
+        s.add("long-2", ["long"])
+        s.add("long-3", ["long-2"])
+        self.assertEqual((s.priority("long"), s.priority("short")), (3, 1))
+        self.assertEqual(s.take(), "long")
+        # A late arrival that lengthens a chain raises its ancestors' priority.
+        s.add("short-2", ["short"])
+        s.add("short-3", ["short-2"])
+        s.add("short-4", ["short-3"])
+        self.assertEqual(s.priority("short"), 4)
+
+    def test_take_skips_rejected_tasks(self):
+        s = DagScheduler()
+        s.add("a")
+        s.add("b")
+        s.add("c", ["a"])
+        self.assertEqual(s.take(lambda t: t != "a"), "b")
+        self.assertEqual(s.take(), "a")
+
+    def test_done_blockers_and_failures(self):
+        s = DagScheduler(is_done=lambda t: t == "old")
+        self.assertTrue(s.add("new", ["old"]))
+        s.take()
+        s.add("child", ["new"])
+        self.assertEqual(s.fail("new"), ["child"])
+        self.assertIsNone(s.take())
+        self.assertTrue(s.add("new", ["old"])) # Retried
+        s.take()
+        self.assertEqual(s.complete("new"), ["child"])
+
+    def test_cycles_are_rejected(self):
+        s = DagScheduler()
+        s.add("a", ["c"])
+        s.add("b", ["a"])
+        with self.assertRaises(CycleError):
+            s.add("c", ["b"])
+        self.assertEqual(s.waiting, ["a", "b"])
+
+    def test_synthboard_makespan(self):
+        tasks = synthboard_tasks()
+        self.assertEqual(len(tasks), 35)
+        s = DagScheduler()
+        for tid in reversed(list(tasks)): # Arrival order must not matter
+            s.add(tid, tasks[tid])
+        priority = {t: s.priority(t) for t in tasks}
+        by_priority = lambda ready: sorted(ready, key=lambda t: -priority[t])
+        fifo = lambda ready: sorted(ready, key=lambda t: -int(t.split('-')[1])) # Worst arbitrary order
+        for slots in (2, 3):
+            self.assertLessEqual(simulate(by_priority, tasks, slots), simulate(fifo, tasks, slots))
+        # With enough agents the critical path is the makespan.
+        self.assertEqual(simulate(by_priority, tasks, 35), max(priority.values()))
+
+        order = []
+        while len(order) < len(tasks):
+            batch = list(iter(s.take, None))
+            self.assertTrue(batch)
+            for t in batch:
+                s.complete(t)
+            order += batch
+        self.assertEqual(sorted(order), sorted(tasks))
+
+class TestPipelineAdmissionUnit(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.ledger = TaskLedger(self.test_dir / "ledger.sqlite3")
+        self.bus = EventBus()
+        self.started = []
+        self.bus.subscribe(RequestWorkspace, lambda e: self.started.append(e.request_id))
+        self.pipeline = Pipeline(self.bus, self.test_dir, concurrency=1, ledger=self.ledger)
+
+    def tearDown(self):
+        self.pipeline.shutdown()
+        self.ledger.close()
+        shutil.rmtree(self.test_dir)
+
+    def _request(self, request_id, blocked_by=None, recipient="Coder"):
+        path = self.test_dir / f"{request_id}.md"
+        extra = f"blocked_by: {blocked_by}\n" if blocked_by else ""
+        path.write_text(f"---\nid: {request_id}\nrecipient: {recipient}-{request_id}\nrepo: repo\nbase_commit: TBD\n{extra}---\n")
+        self.bus.emit(TaskDetected(path=path))
+
+    def _wait_started(self, n):
+        for _ in range(200):
+            if len(self.started) >= n:
+                return
+            threading.Event().wait(0.01)
+        self.fail(f"only {self.started} started")
+
+    def test_blocked_tasks_wait_for_their_blockers(self):
+        self.ledger.record("IRQ-0", "reporting")
+        self.ledger.finish("IRQ-0", "done")
+        self._request("IRQ-1")
+        self._wait_started(1)
+        self._request("IRQ-3", blocked_by="IRQ-2")
+        self._request("IRQ-2", blocked_by="IRQ-0, IRQ-1")
+        self._request("IRQ-4")
+        self.bus.emit(WorkCompleted(request_id="IRQ-1"))
+        self._wait_started(2)
+        # IRQ-2 heads a longer chain than IRQ-4, so it goes first.
+        self.assertEqual(self.started, ["IRQ-1", "IRQ-2"])
+        for n in (3, 4):
+            self.bus.emit(WorkCompleted(request_id=self.started[-1]))
+            self._wait_started(n)
+        self.bus.emit(WorkCompleted(request_id=self.started[-1]))
+        self.assertTrue(self.pipeline.join(5))
+        self.assertEqual(sorted(self.started[2:]), ["IRQ-3", "IRQ-4"])
+
+    def test_join_does_not_wait_for_unqueued_blockers(self):
+        self._request("IRQ-7", blocked_by="IRQ-6")
+        self.assertTrue(self.pipeline.join(1))
+        self.assertEqual(self.started, [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+import unittest
+import sys
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+
+# Add src to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from bus import EventBus
+from handlers.git_handler import GitHandler
+from handlers.workspace_pool import WorkspacePool, READY_MARKER
+
+@unittest.skipIf(shutil.which("git") is None, "git not found in PATH")
+class TestWorkspacePoolUnit(unittest.TestCase):
+    """A local repository stands in for the remote; workspaces borrow objects from a mirror of it."""
+
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.upstream = self.test_dir / "upstream"
+        self.upstream.mkdir()
+        self._git('init', '-q', '-b', 'main')
+        self._commit("base")
+        self.repo_url = str(self.upstream)
+        self.git = GitHandler(EventBus(), mirror_dir=self.test_dir / "mirrors", mirror_refresh_interval=0)
+        self.mirror_calls = []
+        def mirror(repo_url):
+            self.mirror_calls.append(repo_url)
+            return self.git.ensure_mirror(repo_url)
+        self.pool = WorkspacePool(self.test_dir / "pool", 2, clone=self.git.clone_into, refresh_interval=3600, mirror=mirror)
+
+    def tearDown(self):
+        self.git.pusher.shutdown()
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def _git(self, *args, cwd=None):
+        return subprocess.run(
+            ['git', '-c', 'user.name=test', '-c', 'user.email=test@example.com', *args],
+            cwd=cwd or self.upstream, capture_output=True, text=True, check=True
+        ).stdout
+
+    def _commit(self, content):
+        (self.upstream / "file.txt").write_text(content)
+        self._git('add', '.')
+        self._git('commit', '-q', '-m', content)
+
+    def _wait_ready(self, n):
+        deadline = time.monotonic() + 20
+        while time.monotonic() < deadline:
+            with self.pool._lock:
+                if len(self.pool._ready.get(self.repo_url, [])) >= n:
+                    return list(self.pool._ready[self.repo_url])
+            time.sleep(0.02)
+        self.fail("pool was not filled")
+
+    def test_warm_fills_from_the_mirror(self):
+        self.pool.warm(self.repo_url)
+        for path in self._wait_ready(2):
+            self.assertTrue((path / ".git" / READY_MARKER).exists())
+            self.assertEqual((path / "file.txt").read_text(), "base")
+            alternates = (path / ".git" / "objects" / "info" / "alternates").read_text()
+            self.assertIn(str(self.test_dir / "mirrors"), alternates)
+
+    def test_claim_hands_out_a_checkout_and_refills(self):
+        self.pool.warm(self.repo_url)
+        self._wait_ready(2)
+        claimed = self.pool.claim(self.repo_url)
+        self.assertFalse((claimed / ".git" / READY_MARKER).exists())
+        self.assertEqual((claimed / "file.txt").read_text(), "base")
+        self.assertNotIn(claimed, self._wait_ready(2))
+        self.assertIsNone(self.pool.claim("https://example.invalid/unknown.git"))
+
+    def test_adopts_ready_workspaces_and_drops_partial_ones(self):
+        self.pool.warm(self.repo_url)
+        ready = self._wait_ready(2)
+        partial = self.pool._repo_dir(self.repo_url) / "partial"
+        partial.mkdir()
+        restarted = WorkspacePool(self.test_dir / "pool", 0, clone=self.git.clone_into)
+        restarted.warm(self.repo_url)
+        self.assertEqual(sorted(restarted._ready[self.repo_url]), sorted(ready))
+        self.assertFalse(partial.exists())
+
+    def test_failed_fill_leaves_nothing_behind(self):
+        blocked = self.test_dir / "blocked"
+        blocked.write_text("not a directory")
+        pool = WorkspacePool(blocked / "pool", 0, clone=self.git.clone_into)
+        self.assertFalse(pool._fill_one(self.repo_url)) # mkdir fails: reported, not raised
+        def failing_clone(repo_url, path):
+            (path / "partial.txt").write_text("half a clone")
+            raise OSError("network down")
+        self.pool.clone = failing_clone
+        self.assertFalse(self.pool._fill_one(self.repo_url))
+        self.assertEqual(list(self.pool._repo_dir(self.repo_url).iterdir()), [])
+
+    def test_refresh_fetches_from_the_mirror_once(self):
+        self.pool.warm(self.repo_url)
+        stale = self._wait_ready(2)
+        for path in stale:
+            # A fetch from origin would now fail; the refresh must go through the mirror.
+            self._git('remote', 'set-url', 'origin', str(self.test_dir / "gone"), cwd=path)
+            (path / "scratch.txt").write_text("left behind")
+        self._commit("updated")
+        self.mirror_calls.clear()
+
+        self.pool.refresh_interval = 0
+        self.pool._refresh_stale(self.repo_url)
+        self.assertEqual(self.mirror_calls, [self.repo_url])
+        self.assertEqual(sorted(self.pool._ready[self.repo_url]), sorted(stale))
+        for path in stale:
+            self.assertEqual((path / "file.txt").read_text(), "updated")
+            self.assertFalse((path / "scratch.txt").exists())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,217 @@
+"""
+Validation of agent artifacts against docs/artifact_templates.
+
+Each template is compiled once into a Schema: the metadata fields of its
+header and the tree of its headings, with a digest of the guidance text under
+each heading. An artifact is checked in one streaming pass that hashes every
+section as it goes. A field or section is unfilled when it is missing, empty,
+or still identical to the template text.
+
+ArtifactValidator caches the report of every artifact it has seen: an
+unchanged file (same mtime, size and inode) costs one stat() and is not
+re-read. A changed file is scanned again in full; its report lists the
+sections whose digest changed since the previous validation.
+"""
+import hashlib
+import os
+import re
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+from utils.parser import normalize_key, clean_value
+
+TEMPLATE_DIR = Path(__file__).resolve().parent.parent.parent / "docs" / "artifact_templates"
+
+_HEADING = re.compile(r'(#{1,6})\s+(.*?)\s*#*\s*$')
+_SPACES = re.compile(r'\s+')
+
+SectionPath = Tuple[str, ...]
+
+def template_path(name: str) -> Path:
+    return TEMPLATE_DIR / f"{name}.md"
+
+def _title(text: str) -> str:
+    return _SPACES.sub(' ', text).strip().rstrip(':').lower()
+
+class _Scan:
+    """Header fields and per-section digests of one document."""
+    def __init__(self):
+        self.header_format: Optional[str] = None
+        self.fields: Dict[str, str] = {}
+        self.field_lines: Dict[str, int] = {}
+        self.sections: Dict[SectionPath, Tuple[str, bool]] = {} # Path -> (digest of body text, has text)
+        self.section_lines: Dict[SectionPath, int] = {}
+
+def _scan(lines: Iterable[str]) -> _Scan:
+    scan = _Scan()
+    state = 'start' # start -> front-matter | legacy -> body
+    stack: List[Tuple[int, str]] = [] # (level, title) of the enclosing headings
+    path: Optional[SectionPath] = None
+    digest = None
+    has_text = False
+    fence = None
+
+    def close_section():
+        if path is not None:
+            scan.sections[path] = (digest.hexdigest(), has_text)
+
+    for number, raw in enumerate(lines, 1):
+        line = raw.strip()
+        if state == 'start':
+            if not line:
+                continue
+            if line == '---':
+                state = scan.header_format = 'front-matter'
+                continue
+            m = _HEADING.fullmatch(line)
+            if m and _title(m.group(2)) == 'metadata':
+                state = scan.header_format = 'legacy'
+                continue
+            state = 'body'
+        elif state == 'front-matter' or state == 'legacy':
+            if (state == 'front-matter' and line == '---') or (state == 'legacy' and _HEADING.fullmatch(line)):
+                state = 'body'
+                if line == '---':
+                    continue
+            else:
+                if ':' in line and not line.startswith('#'):
+                    key, _, value = line.lstrip('-* ').partition(':')
+                    key = normalize_key(key)
+                    if key and key not in scan.fields:
+                        scan.fields[key] = clean_value(value)
+                        scan.field_lines[key] = number
+                continue
+
+        # Body
+        if line.startswith('```') or line.startswith('~~~'):
+            fence = None if fence and line.startswith(fence) else (fence or line[:3])
+        m = None if fence else _HEADING.fullmatch(line)
+        if m:
+            close_section()
+            level = len(m.group(1))
+            while stack and stack[-1][0] >= level:
+                stack.pop()
+            stack.append((level, _title(m.group(2))))
+            path = tuple(title for _, title in stack)
+            scan.section_lines.setdefault(path, number)
+            digest, has_text = hashlib.blake2b(digest_size=16), False
+        elif path is not None and line:
+            digest.update(_SPACES.sub(' ', line).encode('utf-8'))
+            digest.update(b'\n')
+            has_text = True
+    close_section()
+    return scan
+
+@dataclass(frozen=True)
+class Schema:
+    name: str
+    header_format: Optional[str]
+    fields: Dict[str, str] # Field -> template placeholder value
+    sections: Dict[SectionPath, Tuple[str, bool]] # Path -> (placeholder digest, needs text of its own)
+
+    @classmethod
+    def compile(cls, name: str, lines: Iterable[str]) -> 'Schema':
+        scan = _scan(lines)
+        sections = {}
+        for path, (digest, has_text) in scan.sections.items():
+            has_children = any(len(other) > len(path) and other[:len(path)] == path for other in scan.sections)
+            # A heading that only groups subsections in the template needs no text of its own.
+            sections[path] = (digest, has_text or not has_children)
+        return cls(name, scan.header_format, dict(scan.fields), sections)
+
+@dataclass
+class ValidationReport:
+    path: str
+    schema: str
+    missing_fields: List[str] = field(default_factory=list)
+    unfilled_fields: List[str] = field(default_factory=list) # Empty or still the template placeholder
+    missing_sections: List[str] = field(default_factory=list)
+    empty_sections: List[str] = field(default_factory=list) # No text, or only the template guidance
+    changed_sections: List[str] = field(default_factory=list) # Since the previous validation of this path
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return not (self.error or self.missing_fields or self.unfilled_fields or self.missing_sections or self.empty_sections)
+
+    def problems(self) -> List[str]:
+        if self.error:
+            return [self.error]
+        return ([f"missing field '{f}'" for f in self.missing_fields] +
+                [f"field '{f}' not filled in" for f in self.unfilled_fields] +
+                [f"missing section '{s}'" for s in self.missing_sections] +
+                [f"section '{s}' is empty or unchanged from the template" for s in self.empty_sections])
+
+    def __str__(self) -> str:
+        if self.ok:
+            return f"{self.path}: valid {self.schema}"
+        return f"{self.path}: invalid {self.schema}:\n" + "\n".join(f"  - {p}" for p in self.problems())
+
+class ArtifactValidator:
+    def __init__(self, template_dir: Path = TEMPLATE_DIR):
+        self.template_dir = Path(template_dir)
+        self._schemas: Dict[str, Schema] = {}
+        # Artifact path -> ((mtime_ns, size, inode), schema name, section digests, report)
+        self._seen: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+
+    def schema(self, name: str) -> Schema:
+        with self._lock:
+            schema = self._schemas.get(name)
+        if schema is None:
+            with open(self.template_dir / f"{name}.md", 'r', encoding='utf-8') as f:
+                schema = Schema.compile(name, f)
+            with self._lock:
+                schema = self._schemas.setdefault(name, schema)
+        return schema
+
+    def validate(self, path: Union[str, Path], name: str) -> ValidationReport:
+        """Checks the artifact at `path` against the template `name` (e.g. 'implementation_report')."""
+        schema = self.schema(name)
+        key = os.path.abspath(path)
+        try:
+            st = os.stat(key)
+        except OSError:
+            return ValidationReport(str(path), name, error="artifact not found")
+        stamp = (st.st_mtime_ns, st.st_size, st.st_ino)
+        with self._lock:
+            previous = self._seen.get(key)
+        if previous and previous[0] == stamp and previous[1] == name:
+            return previous[3]
+
+        with open(key, 'r', encoding='utf-8', errors='replace') as f:
+            scan = _scan(f)
+        old_digests = previous[2] if previous and previous[1] == name else {}
+        report = ValidationReport(str(path), name)
+
+        for fname, placeholder in schema.fields.items():
+            if fname not in scan.fields:
+                report.missing_fields.append(fname)
+            elif not scan.fields[fname] or (placeholder and scan.fields[fname] == placeholder):
+                report.unfilled_fields.append(fname)
+
+        digests = {path_: digest for path_, (digest, _) in scan.sections.items()}
+        for spath, (placeholder, needs_text) in schema.sections.items():
+            label = " / ".join(spath)
+            if spath not in scan.sections:
+                report.missing_sections.append(label)
+                continue
+            digest, has_text = scan.sections[spath]
+            if spath in old_digests and old_digests[spath] != digest:
+                report.changed_sections.append(label)
+            if needs_text and (not has_text or digest == placeholder):
+                report.empty_sections.append(label)
+
+        with self._lock:
+            self._seen[key] = (stamp, name, digests, report)
+        return report
+
+    def forget(self, path: Union[str, Path]):
+        with self._lock:
+            self._seen.pop(os.path.abspath(path), None)
+
+_validator = ArtifactValidator()
+
+def validate_artifact(path: Union[str, Path], name: str) -> ValidationReport:
+    return _validator.validate(path, name)
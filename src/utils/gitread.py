@@ -0,0 +1,442 @@
+"""
+Read-only git repository inspection without spawning `git`.
+
+Reads HEAD, loose and packed refs, loose objects and v2 packfiles (including
+OFS/REF deltas and alternates) directly from disk. Anything it does not
+understand (SHA-256 repositories, reftables, corrupt data) raises
+GitReadError so callers can fall back to the git CLI.
+"""
+
+import heapq
+import mmap
+import os
+import struct
+import threading
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+
+class GitReadError(Exception):
+    pass
+
+class Commit(NamedTuple):
+    sha: str
+    tree: str
+    parents: Tuple[str, ...]
+    message: str
+    time: int = 0 # Committer timestamp
+
+    @property
+    def subject(self) -> str:
+        return self.message.split("\n", 1)[0]
+
+_TYPES = {1: "commit", 2: "tree", 3: "blob", 4: "tag"}
+_OFS_DELTA = 6
+_REF_DELTA = 7
+
+def find_git_dir(workspace_path: Path) -> Path:
+    """Resolves the .git directory, following `gitdir:` files used by worktrees and submodules."""
+    dot_git = workspace_path / ".git"
+    if dot_git.is_dir():
+        return dot_git
+    if dot_git.is_file():
+        content = dot_git.read_text(encoding='utf-8').strip()
+        if content.startswith("gitdir:"):
+            target = Path(content[len("gitdir:"):].strip())
+            return target if target.is_absolute() else (workspace_path / target).resolve()
+    if (workspace_path / "HEAD").is_file() and (workspace_path / "objects").is_dir():
+        return workspace_path # Bare repository
+    raise GitReadError(f"Not a git repository: {workspace_path}")
+
+class _Pack:
+    """A v2 pack index plus its packfile, both memory-mapped."""
+
+    def __init__(self, idx_path: Path):
+        self.idx_path = idx_path
+        self.pack_path = idx_path.with_suffix(".pack")
+        with open(idx_path, 'rb') as f:
+            self._idx = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        with open(self.pack_path, 'rb') as f:
+            self._pack = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._idx[:8] != b"\377tOc\x00\x00\x00\x02":
+            raise GitReadError(f"Unsupported pack index version: {idx_path}")
+        self._fanout = struct.unpack_from(">256I", self._idx, 8)
+        self.count = self._fanout[255]
+        self._names = 8 + 256 * 4
+        self._offsets = self._names + self.count * 20 + self.count * 4
+        self._large = self._offsets + self.count * 4
+
+    def find(self, binsha: bytes) -> Optional[int]:
+        """Returns the pack offset of an object, or None."""
+        first = binsha[0]
+        lo = self._fanout[first - 1] if first else 0
+        hi = self._fanout[first]
+        idx = self._idx
+        while lo < hi:
+            mid = (lo + hi) // 2
+            pos = self._names + mid * 20
+            name = idx[pos:pos + 20]
+            if name < binsha:
+                lo = mid + 1
+            elif name > binsha:
+                hi = mid
+            else:
+                offset = struct.unpack_from(">I", idx, self._offsets + mid * 4)[0]
+                if offset & 0x80000000:
+                    offset = struct.unpack_from(">Q", idx, self._large + (offset & 0x7fffffff) * 8)[0]
+                return offset
+        return None
+
+    def read_raw(self, offset: int) -> Tuple[int, bytes, object]:
+        """Returns (type_num, inflated_data, delta_base) for the entry at offset."""
+        pack = self._pack
+        byte = pack[offset]
+        type_num = (byte >> 4) & 7
+        size = byte & 15
+        shift = 4
+        pos = offset + 1
+        while byte & 0x80:
+            byte = pack[pos]
+            size |= (byte & 0x7f) << shift
+            shift += 7
+            pos += 1
+
+        base = None
+        if type_num == _OFS_DELTA:
+            byte = pack[pos]
+            pos += 1
+            rel = byte & 0x7f
+            while byte & 0x80:
+                byte = pack[pos]
+                pos += 1
+                rel = ((rel + 1) << 7) | (byte & 0x7f)
+            base = offset - rel
+        elif type_num == _REF_DELTA:
+            base = pack[pos:pos + 20].hex()
+            pos += 20
+
+        # Inflate from a window slightly larger than the object; grow it for the
+        # rare entry whose compressed form is bigger than that.
+        window = size + 64
+        while True:
+            data = zlib.decompressobj().decompress(pack[pos:pos + window], size)
+            if len(data) == size or pos + window >= len(pack):
+                break
+            window *= 2
+        if len(data) != size:
+            raise GitReadError(f"Corrupt pack entry at {offset} in {self.pack_path}")
+        return type_num, data, base
+
+    def close(self):
+        self._idx.close()
+        self._pack.close()
+
+def _apply_delta(base: bytes, delta: bytes) -> bytes:
+    def varint(pos):
+        value = shift = 0
+        while True:
+            byte = delta[pos]
+            pos += 1
+            value |= (byte & 0x7f) << shift
+            shift += 7
+            if not byte & 0x80:
+                return value, pos
+
+    base_size, pos = varint(0)
+    result_size, pos = varint(pos)
+    if base_size != len(base):
+        raise GitReadError("Delta base size mismatch")
+    out = bytearray()
+    end = len(delta)
+    while pos < end:
+        op = delta[pos]
+        pos += 1
+        if op & 0x80:
+            offset = size = 0
+            for i in range(4):
+                if op & (1 << i):
+                    offset |= delta[pos] << (8 * i)
+                    pos += 1
+            for i in range(3):
+                if op & (1 << (4 + i)):
+                    size |= delta[pos] << (8 * i)
+                    pos += 1
+            out += base[offset:offset + (size or 0x10000)]
+        elif op:
+            out += delta[pos:pos + op]
+            pos += op
+        else:
+            raise GitReadError("Invalid delta opcode")
+    if len(out) != result_size:
+        raise GitReadError("Delta result size mismatch")
+    return bytes(out)
+
+class _ObjectStore:
+    """Loose objects and packs of one objects/ directory, plus its alternates."""
+
+    def __init__(self, objects_dir: Path, _seen: Optional[Set[Path]] = None):
+        self.objects_dir = objects_dir
+        self._packs: List[_Pack] = []
+        self._packs_mtime = None
+        self._lock = threading.Lock()
+        seen = _seen if _seen is not None else set()
+        seen.add(objects_dir.resolve())
+        self.alternates: List['_ObjectStore'] = []
+        alt_file = objects_dir / "info" / "alternates"
+        if alt_file.exists():
+            for line in alt_file.read_text(encoding='utf-8').splitlines():
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                alt = Path(line) if os.path.isabs(line) else (objects_dir / line)
+                if alt.is_dir() and alt.resolve() not in seen:
+                    self.alternates.append(_ObjectStore(alt, seen))
+
+    def _current_packs(self) -> List[_Pack]:
+        pack_dir = self.objects_dir / "pack"
+        try:
+            mtime = pack_dir.stat().st_mtime_ns
+        except FileNotFoundError:
+            return []
+        with self._lock:
+            if mtime != self._packs_mtime:
+                known = {p.idx_path: p for p in self._packs}
+                packs = []
+                for idx_path in sorted(pack_dir.glob("*.idx")):
+                    if idx_path in known:
+                        packs.append(known.pop(idx_path))
+                    elif idx_path.with_suffix(".pack").exists():
+                        packs.append(_Pack(idx_path))
+                for stale in known.values():
+                    stale.close()
+                self._packs = packs
+                self._packs_mtime = mtime
+            return self._packs
+
+    def read(self, sha: str, reader: 'GitReader') -> Optional[Tuple[str, bytes]]:
+        loose = self.objects_dir / sha[:2] / sha[2:]
+        try:
+            raw = zlib.decompress(loose.read_bytes())
+        except FileNotFoundError:
+            raw = None
+        if raw is not None:
+            header, _, body = raw.partition(b"\0")
+            return header.split(b" ", 1)[0].decode('ascii'), body
+
+        binsha = bytes.fromhex(sha)
+        for pack in self._current_packs():
+            offset = pack.find(binsha)
+            if offset is not None:
+                return self._read_packed(pack, offset, reader)
+
+        for alt in self.alternates:
+            found = alt.read(sha, reader)
+            if found:
+                return found
+        return None
+
+    def _read_packed(self, pack: _Pack, offset: int, reader: 'GitReader') -> Tuple[str, bytes]:
+        chain = []
+        while True:
+            type_num, data, base = pack.read_raw(offset)
+            if type_num == _OFS_DELTA:
+                chain.append(data)
+                offset = base
+            elif type_num == _REF_DELTA:
+                chain.append(data)
+                obj_type, data = reader.read_object(base)
+                break
+            elif type_num in _TYPES:
+                obj_type = _TYPES[type_num]
+                break
+            else:
+                raise GitReadError(f"Unknown pack object type {type_num}")
+        for delta in reversed(chain):
+            data = _apply_delta(data, delta)
+        return obj_type, data
+
+class GitReader:
+    """Read-only view of a repository's refs and objects."""
+
+    def __init__(self, workspace_path: Path, cache_size: int = 256):
+        self.git_dir = find_git_dir(workspace_path)
+        commondir = self.git_dir / "commondir"
+        if commondir.exists():
+            self.common_dir = (self.git_dir / commondir.read_text(encoding='utf-8').strip()).resolve()
+        else:
+            self.common_dir = self.git_dir
+        if (self.common_dir / "reftable").exists():
+            raise GitReadError("reftable repositories are not supported")
+        config = self.common_dir / "config"
+        if config.exists() and "objectformat" in config.read_text(encoding='utf-8', errors='replace').lower():
+            raise GitReadError("Non-SHA-1 repositories are not supported")
+        self._store = _ObjectStore(self.common_dir / "objects")
+        self._packed_refs: Dict[str, str] = {}
+        self._packed_mtime = None
+        self._cache: 'OrderedDict[str, Tuple[str, bytes]]' = OrderedDict()
+        self._cache_size = cache_size
+
+    # --- Refs ---
+
+    def _read_packed_refs(self) -> Dict[str, str]:
+        path = self.common_dir / "packed-refs"
+        try:
+            mtime = path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return {}
+        if mtime != self._packed_mtime:
+            refs = {}
+            for line in path.read_text(encoding='utf-8').splitlines():
+                if not line or line[0] in "#^":
+                    continue
+                sha, _, name = line.partition(" ")
+                refs[name.strip()] = sha
+            self._packed_refs = refs
+            self._packed_mtime = mtime
+        return self._packed_refs
+
+    def read_ref(self, name: str, depth: int = 0) -> Optional[str]:
+        """Resolves a ref name (e.g. 'HEAD', 'refs/heads/main') to a commit sha, or None."""
+        if depth > 5:
+            raise GitReadError(f"Symbolic ref loop at {name}")
+        # Per-worktree refs (HEAD, ...) live in git_dir, shared ones in common_dir.
+        for base in (self.git_dir, self.common_dir):
+            path = base / name
+            try:
+                content = path.read_text(encoding='utf-8').strip()
+            except (FileNotFoundError, IsADirectoryError, NotADirectoryError):
+                continue
+            if content.startswith("ref:"):
+                return self.read_ref(content[4:].strip(), depth + 1)
+            return content or None
+        return self._read_packed_refs().get(name)
+
+    def head_ref(self) -> Optional[str]:
+        """Returns the branch HEAD points to (e.g. 'refs/heads/main'), or None when detached."""
+        content = (self.git_dir / "HEAD").read_text(encoding='utf-8').strip()
+        return content[4:].strip() if content.startswith("ref:") else None
+
+    def head(self) -> Optional[str]:
+        return self.read_ref("HEAD")
+
+    def current_branch(self) -> Optional[str]:
+        """Short name of the checked-out branch, or None when detached."""
+        ref = self.head_ref()
+        return ref[len("refs/heads/"):] if ref and ref.startswith("refs/heads/") else None
+
+    def branch_tip(self, branch: str) -> Optional[str]:
+        name = branch if branch.startswith("refs/") else f"refs/heads/{branch}"
+        return self.read_ref(name)
+
+    # --- Objects ---
+
+    def read_object(self, sha: str) -> Tuple[str, bytes]:
+        cached = self._cache.get(sha)
+        if cached is not None:
+            self._cache.move_to_end(sha)
+            return cached
+        try:
+            found = self._store.read(sha, self)
+        except (zlib.error, IndexError, ValueError) as e:
+            raise GitReadError(f"Cannot read object {sha}: {e}")
+        if found is None:
+            raise GitReadError(f"Object {sha} not found")
+        self._cache[sha] = found
+        if len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+        return found
+
+    def commit(self, sha: str) -> Commit:
+        obj_type, data = self.read_object(sha)
+        if obj_type == "tag":
+            target = data.split(b"\n", 1)[0].split(b" ", 1)[1].decode('ascii')
+            return self.commit(target)
+        if obj_type != "commit":
+            raise GitReadError(f"{sha} is a {obj_type}, not a commit")
+        headers, _, message = data.partition(b"\n\n")
+        tree = ""
+        parents = []
+        when = 0
+        for line in headers.split(b"\n"):
+            if line.startswith(b"tree "):
+                tree = line[5:].decode('ascii')
+            elif line.startswith(b"parent "):
+                parents.append(line[7:].decode('ascii'))
+            elif line.startswith(b"committer "):
+                try:
+                    when = int(line.rsplit(b" ", 2)[1])
+                except (IndexError, ValueError):
+                    pass
+        return Commit(sha, tree, tuple(parents), message.decode('utf-8', errors='replace'), when)
+
+    # --- Probes ---
+
+    def last_commit_message(self) -> str:
+        """Equivalent of `git log -1 --pretty=%B` (stripped); empty for an unborn branch."""
+        sha = self.head()
+        return self.commit(sha).message.strip() if sha else ""
+
+    def is_ancestor(self, ancestor: str, descendant: str) -> bool:
+        """Equivalent of `git merge-base --is-ancestor`; commits older than `ancestor` are not walked (barring clock skew)."""
+        floor = self.commit(ancestor).time
+        seen = set()
+        stack = [descendant]
+        while stack:
+            sha = stack.pop()
+            if sha == ancestor:
+                return True
+            if sha in seen:
+                continue
+            seen.add(sha)
+            stack.extend(p for p in self.commit(sha).parents if p not in seen and self.commit(p).time >= floor)
+        return False
+
+    def has_commit_with_subject(self, subject: str, since: Optional[str] = None, start: str = "HEAD") -> bool:
+        """
+        True if a commit whose message contains `subject` is reachable from `start`
+        but not from `since` (a commit-ish, e.g. the base commit), like `git log start ^since`.
+        """
+        tip = self.read_ref(start) if not _is_sha(start) else start
+        if not tip:
+            return False
+        stop = None
+        if since and since not in ("HEAD", "TBD"):
+            stop = since if _is_sha(since) and len(since) == 40 else self._resolve_prefix_or_ref(since)
+
+        # Walk newest first from both ends, excluded commits first within a second, so
+        # every commit reachable from `stop` is excluded before it is looked at (barring
+        # clock skew). Once only excluded commits are queued, nothing else is left.
+        excluded = {stop} if stop else set()
+        seen = set()
+        queue = []
+        def push(sha):
+            heapq.heappush(queue, (-self.commit(sha).time, sha not in excluded, sha))
+        push(tip)
+        if stop:
+            push(stop)
+        while any(sha not in excluded for _, _, sha in queue):
+            _, _, sha = heapq.heappop(queue)
+            if sha in seen:
+                continue
+            seen.add(sha)
+            commit = self.commit(sha)
+            if sha in excluded:
+                excluded.update(commit.parents)
+            elif subject in commit.message:
+                return True
+            for parent in commit.parents:
+                if parent not in seen:
+                    push(parent)
+        return False
+
+    def _resolve_prefix_or_ref(self, name: str) -> Optional[str]:
+        sha = self.read_ref(name) or self.branch_tip(name)
+        if sha:
+            return sha
+        if _is_sha(name):
+            raise GitReadError(f"Abbreviated sha {name} needs the git CLI to resolve")
+        return None
+
+def _is_sha(value: str) -> bool:
+    return 4 <= len(value) <= 40 and all(c in "0123456789abcdef" for c in value)
@@ -0,0 +1,81 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+# Flags from <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_NONBLOCK = os.O_NONBLOCK if hasattr(os, 'O_NONBLOCK') else 0
+IN_CLOEXEC = getattr(os, 'O_CLOEXEC', 0)
+
+_EVENT_HEADER = struct.Struct("iIII")
+
+class Inotify:
+    """Minimal ctypes binding for watching a single directory with Linux inotify."""
+
+    def __init__(self, fd: int):
+        self.fd = fd
+
+    @classmethod
+    def create(cls, directory: Path, mask: int = IN_CLOSE_WRITE | IN_MOVED_TO) -> Optional['Inotify']:
+        """Returns a watcher for `directory`, or None when inotify is unavailable."""
+        if not sys.platform.startswith('linux'):
+            return None
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+            fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+            if fd < 0:
+                return None
+            mask |= IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR
+            if libc.inotify_add_watch(fd, os.fsencode(str(directory)), mask) < 0:
+                os.close(fd)
+                return None
+        except (OSError, AttributeError):
+            return None
+        return cls(fd)
+
+    def read(self, timeout: Optional[float] = None) -> List[str]:
+        """
+        Waits up to `timeout` seconds and returns the names of changed entries.
+        The special names '*overflow*' and '*gone*' signal a lost event queue
+        and a removed watch directory respectively.
+        """
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+
+        names = []
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            _wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b"\0").decode('utf-8', errors='surrogateescape')
+            offset += length
+            if mask & IN_Q_OVERFLOW:
+                names.append('*overflow*')
+            elif mask & (IN_DELETE_SELF | IN_MOVE_SELF | IN_IGNORED):
+                names.append('*gone*')
+            elif name:
+                names.append(name)
+        return names
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
@@ -1,25 +1,151 @@
+import os
 import re
+import threading
+from collections import OrderedDict
 from pathlib import Path
-from typing import Dict
+from typing import Dict, List, Optional, Tuple, Union
+
+REQUIRED_FIELDS = ('id', 'recipient', 'repo', 'base_commit')
+FIELD_PATTERNS = {
+    'id': re.compile(r'IRQ-[\w-]+'),
+    'recipient': re.compile(r'[\w\-]+'),
+    'repo': re.compile(r'[\w\-\./:@]+'),
+    'base_commit': re.compile(r'[a-fA-F0-9]{4,40}|(?i:tbd)'),
+    'feature_branch': re.compile(r'[\w\-/\.]+'),
+}
+FIELD_ALIASES = {'receipient': 'recipient', 'recepient': 'recipient', 'blocked': 'blocked_by', 'depends_on': 'blocked_by'}
+MAX_HEADER_LINES = 100 # A header longer than this is not a header
+CACHE_SIZE = 1024
+
+class MetadataError(ValueError):
+    """A request file whose header is missing or has an invalid field."""
+    def __init__(self, path: Union[str, Path], message: str, field: Optional[str] = None, line: Optional[int] = None):
+        self.path = str(path)
+        self.field = field
+        self.line = line
+        where = f"{self.path}:{line}" if line else self.path
+        super().__init__(f"{where}: {message}")
+
+class _Header:
+    __slots__ = ('fields', 'lines', 'format', 'error')
+    def __init__(self, fields: Dict[str, str], lines: Dict[str, int], format: Optional[str], error: Optional[str] = None):
+        self.fields = fields # Normalized key -> raw value
+        self.lines = lines # Normalized key -> line number
+        self.format = format # 'front-matter', 'legacy' or None
+        self.error = error # Structural problem, e.g. an unterminated front-matter block
+
+_cache: "OrderedDict[str, Tuple[Tuple[int, int], _Header]]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+def normalize_key(key: str) -> str:
+    key = re.sub(r'[\s\-]+', '_', key.strip().strip('*').strip().lower())
+    return FIELD_ALIASES.get(key, key)
+
+def clean_value(value: str) -> str:
+    value = value.strip()
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in '"\'`':
+        value = value[1:-1].strip()
+    return value
+
+def _read_header(path: str) -> _Header:
+    """
+    Reads only the header of a request file, in one pass:
+      * front-matter: `---` on the first line, `key: value` lines, closing `---`
+      * legacy: a `# Metadata` heading followed by `Key: value` lines up to the next heading
+    Anything else has no header; reading stops at the first line that rules one out.
+    """
+    fields: Dict[str, str] = {}
+    lines: Dict[str, int] = {}
+    fmt = None
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        for number, raw in enumerate(f, 1):
+            line = raw.strip()
+            if fmt is None:
+                if not line:
+                    continue
+                if line == '---':
+                    fmt = 'front-matter'
+                elif line.lstrip('#').strip().lower() == 'metadata' and line.startswith('#'):
+                    fmt = 'legacy'
+                else:
+                    return _Header(fields, lines, None)
+                continue
+            if number > MAX_HEADER_LINES:
+                break
+            if fmt == 'front-matter' and line == '---':
+                return _Header(fields, lines, fmt)
+            if fmt == 'legacy' and line.startswith('#'):
+                return _Header(fields, lines, fmt)
+            if not line or line.startswith('#') or ':' not in line:
+                continue
+            key, _, value = line.lstrip('-* ').partition(':')
+            key = normalize_key(key)
+            if key and key not in fields:
+                fields[key] = clean_value(value)
+                lines[key] = number
+    if fmt == 'front-matter':
+        return _Header(fields, lines, fmt, error="front-matter block is not closed with '---'")
+    return _Header(fields, lines, fmt)
+
+def _header(path: Union[str, Path], stat: Optional[os.stat_result] = None) -> _Header:
+    key = os.path.abspath(path)
+    st = stat or os.stat(key)
+    stamp = (st.st_mtime_ns, st.st_size)
+    with _cache_lock:
+        cached = _cache.get(key)
+        if cached and cached[0] == stamp:
+            _cache.move_to_end(key)
+            return cached[1]
+    header = _read_header(key)
+    with _cache_lock:
+        _cache[key] = (stamp, header)
+        _cache.move_to_end(key)
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return header
+
+def is_request(file_path: Union[str, Path], stat: Optional[os.stat_result] = None) -> bool:
+    """True if the file has a metadata header with an IRQ id. Malformed fields are left to extract_metadata."""
+    try:
+        header = _header(file_path, stat)
+    except OSError:
+        return False
+    return header.format is not None and header.fields.get('id', '').upper().startswith('IRQ-')
 
 def extract_metadata(file_path: Path) -> Dict[str, str]:
-    """Parses implementation_request.md for specific metadata fields."""
-    content = file_path.read_text(encoding='utf-8')
-    
+    """Parses the header of an implementation_request.md. Raises MetadataError naming the offending field."""
+    header = _header(file_path)
+    if header.format is None:
+        raise MetadataError(file_path, "no metadata header (expected '---' front-matter or a '# Metadata' section)")
+    if header.error:
+        raise MetadataError(file_path, header.error)
+
     metadata = {}
-    patterns = {
-        'id': r'ID:\s*(IRQ-[\w-]+)',
-        'recipient': r'Rec[ei]pient:\s*([\w\-]+)',
-        'repo': r'Repo:\s*([\w\-\./:]+)',
-        'base_commit': r'Base Commit:\s*([a-f0-9]+|TBD)',
-        'feature_branch': r'Feature Branch:\s*([\w\-/]+)'
-    }
-    
-    for key, pattern in patterns.items():
-        match = re.search(pattern, content, re.IGNORECASE)
-        if match:
-            metadata[key] = match.group(1).strip()
-        else:
-            raise ValueError(f"Missing required metadata: {key}")
-            
+    for key in REQUIRED_FIELDS + ('feature_branch',):
+        value = header.fields.get(key)
+        if not value:
+            if key == 'feature_branch':
+                continue
+            problem = "is empty" if key in header.fields else "is missing"
+            raise MetadataError(file_path, f"required field '{key}' {problem}", field=key, line=header.lines.get(key))
+        if not FIELD_PATTERNS[key].fullmatch(value):
+            raise MetadataError(file_path, f"field '{key}' has invalid value {value!r}", field=key, line=header.lines[key])
+        metadata[key] = value
+
+    if 'feature_branch' not in metadata:
+        metadata['feature_branch'] = f"feat/{metadata['id'].lower()}"
+
+    # Optional dependencies: "IRQ-0001, IRQ-0002", a YAML list, or "None".
+    blocked_by = header.fields.get('blocked_by', '').strip('[]').strip()
+    if blocked_by and blocked_by.lower() != 'none':
+        ids = [t.strip('"\'') for t in re.split(r'[\s,;]+', blocked_by) if t.strip('"\'')]
+        for t in ids:
+            if not FIELD_PATTERNS['id'].fullmatch(t):
+                raise MetadataError(file_path, f"field 'blocked_by' has invalid request id {t!r}", field='blocked_by', line=header.lines['blocked_by'])
+        metadata['blocked_by'] = ", ".join(ids)
     return metadata
+
+def blockers(metadata: Dict[str, str]) -> List[str]:
+    """Request ids listed in the metadata's blocked_by field."""
+    value = metadata.get('blocked_by', '')
+    return [t for t in value.split(', ') if t]